@@ -46,10 +46,16 @@ export function AdminApprovalsPage() {
 
   useEffect(() => {
     fetchData();
+    // Refresh the queues when anything is submitted or reviewed elsewhere
+    const source = api.subscribeToEvents(
+      ['timesheet_submitted', 'timesheet_reviewed', 'document_uploaded', 'document_reviewed', 'resync'],
+      () => fetchData(false)
+    );
+    return () => source.close();
   }, []);
 
-  async function fetchData() {
-    setLoading(true);
+  async function fetchData(showLoading = true) {
+    if (showLoading) setLoading(true);
 
     const [tsRes, docRes] = await Promise.all([
       api.getPendingTimesheets(),
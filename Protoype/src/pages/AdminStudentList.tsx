@@ -34,7 +34,7 @@ import {
   DropdownMenuLabel,
   DropdownMenuSeparator,
 } from '@/components/ui/dropdown-menu';
-import { api, User } from '@/services/api';
+import { api, User, UserSearchResult } from '@/services/api';
 
 type StatusFilter = 'all' | 'active' | 'inactive';
 type RoleFilter = 'all' | 'wble_participant' | 'ttw_participant' | 'contractor' | 'employee';
@@ -62,6 +62,7 @@ export function AdminStudentList() {
   const [searchQuery, setSearchQuery] = useState('');
   const [statusFilter, setStatusFilter] = useState<StatusFilter>('all');
   const [roleFilter, setRoleFilter] = useState<RoleFilter>('all');
+  const [searchResults, setSearchResults] = useState<UserSearchResult[] | null>(null);
 
   useEffect(() => {
     async function fetchStudents() {
@@ -75,12 +76,33 @@ export function AdminStudentList() {
     fetchStudents();
   }, []);
 
-  const getInitials = (user: User) => {
+  // Server-side typeahead, so matches are found beyond the loaded page
+  useEffect(() => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setSearchResults(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const { data } = await api.searchUsers(query, 50);
+      if (!cancelled && data) {
+        setSearchResults(data);
+      }
+    }, 200);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery]);
+
+  const getInitials = (user: UserSearchResult) => {
     return `${user.first_name?.[0] || ''}${user.last_name?.[0] || ''}`.toUpperCase();
   };
 
-  const filteredStudents = students.filter((student) => {
+  const filteredStudents = (searchResults ?? students).filter((student) => {
     const matchesSearch =
+      searchResults !== null ||
       student.first_name.toLowerCase().includes(searchQuery.toLowerCase()) ||
       student.last_name.toLowerCase().includes(searchQuery.toLowerCase()) ||
       student.email.toLowerCase().includes(searchQuery.toLowerCase());
@@ -155,7 +177,7 @@ export function AdminStudentList() {
   }
 
   // --- Render mobile card for a single student ---
-  function StudentMobileCard({ student }: { student: User }) {
+  function StudentMobileCard({ student }: { student: UserSearchResult }) {
     return (
       <Card
         className="cursor-pointer"
@@ -38,6 +38,7 @@ interface TTWDashboardData {
   program_status?: string;
   total_hours: number;
   hours_this_month: number;
+  earnings_this_month?: number;
   sga_monthly_limit: number;
   current_pay_period_start?: string;
   current_pay_period_end?: string;
@@ -63,7 +64,7 @@ const TTW_REQUIRED_DOCUMENTS = [
   { type: 'VR Referral Letter', label: 'VR Referral Letter' },
 ];
 
-// Assumed average hourly wage for SGA estimation
+// Assumed average hourly wage for SGA estimation when the API has no earnings figure
 const ASSUMED_HOURLY_WAGE = 15;
 
 export function TTWDashboard() {
@@ -99,7 +100,7 @@ export function TTWDashboard() {
   // SGA calculations
   const sgaLimit = dashboardData?.sga_monthly_limit ?? 1470;
   const hoursThisMonth = dashboardData?.hours_this_month ?? 0;
-  const estimatedEarnings = hoursThisMonth * ASSUMED_HOURLY_WAGE;
+  const estimatedEarnings = dashboardData?.earnings_this_month ?? hoursThisMonth * ASSUMED_HOURLY_WAGE;
   const sgaPercentage = Math.min((estimatedEarnings / sgaLimit) * 100, 100);
 
   const sgaStatus = useMemo(() => {
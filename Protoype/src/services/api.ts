@@ -57,6 +57,67 @@ class ApiService {
     }
   }
 
+  // Server-Sent Events. EventSource cannot send headers, so the stream opens with a
+  // short-lived stream token in the query, and a fresh one once that has expired
+  subscribeToEvents(types: AppEventType[], onEvent: (type: AppEventType, data: Record<string, unknown>) => void) {
+    let source: EventSource | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+
+    const open = async () => {
+      const { data } = await this.request<{ access_token: string }>('/events/token', { method: 'POST' });
+      if (closed) return;
+      if (!data) {
+        retry = setTimeout(open, 5000);
+        return;
+      }
+      source = new EventSource(`${API_BASE_URL}/events/stream?access_token=${encodeURIComponent(data.access_token)}`);
+      types.forEach(type => {
+        source?.addEventListener(type, (message) => {
+          onEvent(type, JSON.parse((message as MessageEvent).data || '{}'));
+        });
+      });
+      source.onerror = () => {
+        // The browser gives up once a reconnect is refused, usually for an expired token
+        if (source?.readyState === EventSource.CLOSED && !closed) {
+          retry = setTimeout(open, 5000);
+        }
+      };
+    };
+
+    open();
+    return {
+      close: () => {
+        closed = true;
+        clearTimeout(retry);
+        source?.close();
+      },
+    };
+  }
+
+  // Notifications
+  async getNotifications(cursor?: number, limit = 20) {
+    const cursorParam = cursor !== undefined ? `&cursor=${cursor}` : '';
+    return this.request<NotificationFeed>(`/notifications/?limit=${limit}${cursorParam}`);
+  }
+
+  async getUnreadNotificationCount() {
+    return this.request<{ unread_count: number }>('/notifications/unread-count');
+  }
+
+  async markNotificationRead(id: number) {
+    return this.request<AppNotification>(`/notifications/${id}/read`, { method: 'POST' });
+  }
+
+  async markAllNotificationsRead() {
+    return this.request<{ marked: number; unread_count: number }>('/notifications/read-all', { method: 'POST' });
+  }
+
+  // Audit log (admin)
+  async getAuditLog(filters: AuditLogFilters = {}) {
+    return this.request<AuditLogPage>(`/audit/${this.analyticsQuery({ ...filters })}`);
+  }
+
   // Auth endpoints
   async login(email: string, password: string) {
     const formData = new URLSearchParams();
@@ -128,6 +189,13 @@ class ApiService {
     });
   }
 
+  async patchTimesheetEntries(id: number, entries: TimesheetEntryPatch[]) {
+    return this.request<Timesheet>(`/timesheets/${id}/entries`, {
+      method: 'PATCH',
+      body: JSON.stringify({ entries }),
+    });
+  }
+
   async submitTimesheet(id: number, signature?: string) {
     return this.request<Timesheet>(`/timesheets/${id}/submit`, {
       method: 'POST',
@@ -169,6 +237,13 @@ class ApiService {
     });
   }
 
+  async reviewTimesheetsBulk(timesheetIds: number[], approved: boolean, rejectionReason?: string) {
+    return this.request<BulkReviewResponse>('/timesheets/review/bulk', {
+      method: 'POST',
+      body: JSON.stringify({ timesheet_ids: timesheetIds, approved, rejection_reason: rejectionReason }),
+    });
+  }
+
   // Programs
   async getPrograms() {
     return this.request<Program[]>('/programs/');
@@ -178,6 +253,10 @@ class ApiService {
     return this.request<Program[]>('/programs/available');
   }
 
+  async searchPrograms(q: string, limit = 20) {
+    return this.request<Program[]>(`/programs/search?q=${encodeURIComponent(q)}&limit=${limit}`);
+  }
+
   async getMyEnrollments() {
     return this.request<Enrollment[]>('/programs/enrollments/my');
   }
@@ -192,6 +271,32 @@ class ApiService {
     });
   }
 
+  async withdrawEnrollment(enrollmentId: number) {
+    return this.request<Enrollment>(`/programs/enrollments/${enrollmentId}/withdraw`, {
+      method: 'POST',
+    });
+  }
+
+  async joinWaitlist(programId: number) {
+    return this.request<WaitlistEntry>(`/programs/${programId}/waitlist`, {
+      method: 'POST',
+    });
+  }
+
+  async leaveWaitlist(programId: number) {
+    return this.request<{ message: string }>(`/programs/${programId}/waitlist`, {
+      method: 'DELETE',
+    });
+  }
+
+  async getMyWaitlistPositions() {
+    return this.request<WaitlistEntry[]>('/programs/waitlist/my');
+  }
+
+  async getProgramWaitlist(programId: number) {
+    return this.request<WaitlistEntry[]>(`/programs/${programId}/waitlist`);
+  }
+
   // Admin Program Management
   async getAllProgramsAdmin() {
     return this.request<Program[]>('/programs/admin/all');
@@ -241,6 +346,20 @@ class ApiService {
     });
   }
 
+  async reviewDocumentsBulk(
+    target: { documentIds: number[] } | { studentId: number },
+    approved: boolean,
+    rejectionReason?: string
+  ) {
+    const selector = 'documentIds' in target
+      ? { document_ids: target.documentIds }
+      : { student_id: target.studentId };
+    return this.request<DocumentBulkReviewResponse>('/documents/review/bulk', {
+      method: 'POST',
+      body: JSON.stringify({ ...selector, approved, rejection_reason: rejectionReason }),
+    });
+  }
+
   // Opportunities
   async getOpportunities(type?: string) {
     const query = type ? `?opportunity_type=${type}` : '';
@@ -251,6 +370,14 @@ class ApiService {
     return this.request<Opportunity[]>('/opportunities/featured');
   }
 
+  async getRecommendedOpportunities(limit = 10) {
+    return this.request<RecommendedOpportunity[]>(`/opportunities/recommended?limit=${limit}`);
+  }
+
+  async searchOpportunities(q: string, limit = 20) {
+    return this.request<Opportunity[]>(`/opportunities/search?q=${encodeURIComponent(q)}&limit=${limit}`);
+  }
+
   // Admin Opportunity Management
   async getAllOpportunitiesAdmin() {
     return this.request<Opportunity[]>('/opportunities/admin/all');
@@ -288,6 +415,41 @@ class ApiService {
     });
   }
 
+  async syncLearningProgress(lessons: LearningProgressSyncItem[]) {
+    return this.request<LearningProgress[]>('/learning/progress/sync', {
+      method: 'POST',
+      body: JSON.stringify({ lessons }),
+    });
+  }
+
+  async getLearningSummary() {
+    return this.request<LearningSummary>('/learning/summary');
+  }
+
+  async getLessonCatalog() {
+    return this.request<LessonCatalog>('/learning/lessons');
+  }
+
+  // Admin Learning Analytics
+  async getLessonFunnel(params: LearningAnalyticsFilters = {}) {
+    return this.request<LessonFunnelStep[]>(`/learning/analytics/funnel${this.analyticsQuery(params)}`);
+  }
+
+  async getCompletionRates(groupBy: 'lesson' | 'role' | 'program' | 'day' = 'lesson', params: LearningAnalyticsFilters = {}) {
+    return this.request<CompletionRateRow[]>(
+      `/learning/analytics/completion-rates${this.analyticsQuery({ ...params, group_by: groupBy })}`
+    );
+  }
+
+  private analyticsQuery(params: Record<string, string | number | undefined>) {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') query.set(key, String(value));
+    });
+    const text = query.toString();
+    return text ? `?${text}` : '';
+  }
+
   async getAnnouncements() {
     return this.request<Announcement[]>('/learning/announcements');
   }
@@ -329,12 +491,32 @@ class ApiService {
     return this.request<User[]>('/users/students');
   }
 
+  async searchUsers(q: string, limit = 10, role?: string) {
+    const roleParam = role ? `&role=${role}` : '';
+    return this.request<UserSearchResult[]>(
+      `/users/search?q=${encodeURIComponent(q)}&limit=${limit}${roleParam}`
+    );
+  }
+
   async getStudentProfile(studentId: number) {
     return this.request<StudentProfile>(`/users/students/${studentId}/profile`);
   }
+
+  // Batch
+  async batch(requests: BatchRequestItem[]) {
+    return this.request<BatchResponse>('/batch/', {
+      method: 'POST',
+      body: JSON.stringify({ requests }),
+    });
+  }
 }
 
 // Types
+export type UserSearchResult = Pick<
+  User,
+  'id' | 'first_name' | 'last_name' | 'email' | 'phone' | 'case_id' | 'role' | 'is_active' | 'created_at'
+>;
+
 export interface User {
   id: number;
   email: string;
@@ -387,6 +569,7 @@ export interface StudentDashboard {
   // TTW-specific
   sga_monthly_limit?: number;
   hours_this_month?: number;
+  earnings_this_month?: number;
   // Contractor-specific
   onboarding_status?: string;
   documents_complete?: boolean;
@@ -460,6 +643,18 @@ export interface Program {
   application_deadline?: string;
   status: string;
   created_at: string;
+  waitlist_length: number;
+}
+
+export interface WaitlistEntry {
+  program_id: number;
+  program_name: string;
+  student_id: number;
+  student_name?: string;
+  student_email?: string;
+  position: number;
+  waitlist_length: number;
+  joined_at: string;
 }
 
 export interface ProgramCreate {
@@ -536,6 +731,10 @@ export interface Opportunity {
   created_at: string;
 }
 
+export interface RecommendedOpportunity extends Opportunity {
+  score: number | null;
+}
+
 export interface OpportunityCreate {
   title: string;
   organization: string;
@@ -573,6 +772,116 @@ export interface LearningProgress {
   completed_at?: string;
 }
 
+export interface LearningProgressSyncItem {
+  lesson_id: number;
+  completed: boolean;
+  completed_at?: string;
+}
+
+export interface Lesson {
+  id: number;
+  title: string;
+  description?: string;
+  category?: string;
+  duration_minutes?: number;
+  sort_order: number;
+  assigned_roles: string[];
+  is_active: boolean;
+}
+
+export interface LessonCatalog {
+  version: string;
+  lessons: Lesson[];
+}
+
+export interface LearningSummary {
+  total_lessons: number;
+  completed_lessons: number;
+  percent_complete: number;
+  completed_lesson_ids: number[];
+  next_lesson?: Lesson;
+}
+
+export type AppEventType =
+  | 'timesheet_submitted'
+  | 'timesheet_reviewed'
+  | 'document_uploaded'
+  | 'document_reviewed'
+  | 'announcement_created'
+  | 'notification_created'
+  | 'ready'
+  | 'resync';
+
+export interface AppNotification {
+  id: number;
+  kind: string;
+  title: string;
+  message: string;
+  link?: string;
+  is_read: boolean;
+  created_at: string;
+  read_at?: string;
+}
+
+export interface NotificationFeed {
+  items: AppNotification[];
+  next_cursor?: number;
+  unread_count: number;
+}
+
+export interface AuditLogEntry {
+  id: number;
+  occurred_at: string;
+  actor_id?: number;
+  source?: string;  // "METHOD /path" of the request that made the change
+  action: 'create' | 'update' | 'delete';
+  entity_type: string;
+  entity_id?: number;
+  changes?: Record<string, unknown>;
+}
+
+export interface AuditLogPage {
+  items: AuditLogEntry[];
+  next_cursor?: number;
+}
+
+export interface AuditLogFilters {
+  actor_id?: number;
+  entity_type?: string;
+  entity_id?: number;
+  action?: string;
+  start?: string;
+  end?: string;
+  cursor?: number;
+  limit?: number;
+}
+
+export interface LearningAnalyticsFilters {
+  role?: string;
+  program_id?: number;
+  start_date?: string;
+  end_date?: string;
+}
+
+export interface LessonFunnelStep {
+  lesson_id: number;
+  title: string;
+  category: string;
+  active_learners: number;
+  completions: number;
+  completion_rate: number;
+  percent_of_first: number;
+  conversion_from_previous: number;
+}
+
+export interface CompletionRateRow {
+  key: string;
+  label: string;
+  active_learners: number;
+  completions: number;
+  completion_rate: number;
+}
+
 export interface Announcement {
   id: number;
   title: string;
@@ -659,5 +968,48 @@ export interface StudentDocument {
   rejection_reason?: string;
 }
 
+export interface TimesheetEntryPatch {
+  date: string;
+  start_time?: string;
+  end_time?: string;
+  lunch_out?: string;
+  lunch_in?: string;
+  break_minutes?: number;
+  hours?: number;
+  remove?: boolean;
+}
+
+export interface BulkReviewResponse {
+  results: { timesheet_id: number; outcome: 'done' | 'skipped' | 'not_found' }[];
+  reviewed: number;
+  skipped: number;
+  not_found: number;
+  total_hours: number;
+}
+
+export interface DocumentBulkReviewResponse {
+  results: { document_id: number; outcome: 'done' | 'skipped' | 'not_found' }[];
+  reviewed: number;
+  skipped: number;
+  not_found: number;
+}
+
+export interface BatchRequestItem {
+  method?: string;
+  path: string;
+  params?: Record<string, string | number | boolean>;
+  body?: unknown;
+}
+
+export interface BatchResponseItem {
+  path: string;
+  status: number;
+  body: unknown;
+}
+
+export interface BatchResponse {
+  responses: BatchResponseItem[];
+}
+
 // Export singleton instance
 export const api = new ApiService();
@@ -8,6 +8,12 @@ from app.api.documents import router as documents_router
 from app.api.opportunities import router as opportunities_router
 from app.api.learning import router as learning_router
 from app.api.dashboard import router as dashboard_router
+from app.api.batch import router as batch_router
+from app.api.payroll import router as payroll_router
+from app.api.export import router as export_router
+from app.api.events import router as events_router
+from app.api.notifications import router as notifications_router
+from app.api.audit import router as audit_router
 
 api_router = APIRouter()
 
@@ -19,3 +25,9 @@ api_router.include_router(documents_router)
 api_router.include_router(opportunities_router)
 api_router.include_router(learning_router)
 api_router.include_router(dashboard_router)
+api_router.include_router(batch_router)
+api_router.include_router(payroll_router)
+api_router.include_router(export_router)
+api_router.include_router(events_router)
+api_router.include_router(notifications_router)
+api_router.include_router(audit_router)
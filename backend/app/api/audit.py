@@ -0,0 +1,72 @@
+import json
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_admin_user
+from app.models.user import User
+from app.models.audit import AuditLog
+from app.schemas.audit import AuditLogPage
+
+router = APIRouter(prefix="/audit", tags=["Audit"])
+
+
+@router.get("/", response_model=AuditLogPage)
+def list_audit_log(
+    actor_id: Optional[int] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Search the audit log by actor, entity and time range, newest first
+    (admin only). Entries appear shortly after the change commits.
+    """
+    limit = max(1, min(limit, settings.AUDIT_PAGE_MAX))
+    statement = select(AuditLog)
+    if actor_id is not None:
+        statement = statement.where(AuditLog.actor_id == actor_id)
+    if entity_type:
+        statement = statement.where(AuditLog.entity_type == entity_type)
+    if entity_id is not None:
+        statement = statement.where(AuditLog.entity_id == entity_id)
+    if action:
+        statement = statement.where(AuditLog.action == action)
+    # Bounds on occurred_at let PostgreSQL skip other months' partitions
+    if start:
+        statement = statement.where(AuditLog.occurred_at >= start)
+    if end:
+        statement = statement.where(AuditLog.occurred_at < end)
+    if cursor is not None:
+        statement = statement.where(AuditLog.id < cursor)
+
+    # One extra row tells whether another page exists
+    rows = db.scalars(statement.order_by(AuditLog.id.desc()).limit(limit + 1)).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return {
+        "items": [
+            {
+                "id": row.id,
+                "occurred_at": row.occurred_at,
+                "actor_id": row.actor_id,
+                "source": row.source,
+                "action": row.action,
+                "entity_type": row.entity_type,
+                "entity_id": row.entity_id,
+                "changes": json.loads(row.changes) if row.changes else None,
+            }
+            for row in rows[:limit]
+        ],
+        "next_cursor": next_cursor,
+    }
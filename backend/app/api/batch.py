@@ -0,0 +1,175 @@
+import asyncio
+import json
+from typing import List
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.core.security import get_current_active_user
+from app.models.user import User
+from app.schemas.batch import (
+    BatchRequest, BatchRequestItem, BatchResponse, BatchResponseItem
+)
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+ALLOWED_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+
+
+def _full_path(path: str) -> str:
+    if not path.startswith("/"):
+        path = "/" + path
+    if not path.startswith(settings.API_V1_PREFIX):
+        path = settings.API_V1_PREFIX + path
+    return path
+
+
+async def _dispatch(
+    request: Request,
+    item: BatchRequestItem,
+    db: Session,
+    user: User
+) -> BatchResponseItem:
+    """Run one sub-request through the app in-process and capture the result"""
+    path, _, query = item.path.partition("?")
+    path = _full_path(path)
+    # A query string in the path and params both apply
+    query_string = "&".join(part for part in (query, urlencode(item.params or {}, doseq=True)) if part)
+    method = item.method.upper()
+    body = json.dumps(item.body).encode() if item.body is not None else b""
+
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers.append((b"authorization", authorization.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": request.url.scheme,
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string.encode(),
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "state": {"batch_db": db, "batch_user": user},
+    }
+
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    result = {"status": 500, "content_type": "", "chunks": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            for key, value in message.get("headers", []):
+                if key.lower() == b"content-type":
+                    result["content_type"] = value.decode()
+        elif message["type"] == "http.response.body":
+            result["chunks"].append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        # ServerErrorMiddleware has already sent its 500 and re-raises; keep
+        # the failure to this item and drop its half-done writes
+        print(f"Error in batch request {method} {path}: {e}")
+        db.rollback()
+        result["status"] = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    raw = b"".join(result["chunks"])
+    if not raw:
+        response_body = None
+    elif result["content_type"].startswith("application/json"):
+        response_body = json.loads(raw)
+    else:
+        response_body = raw.decode(errors="replace")
+
+    return BatchResponseItem(path=item.path, status=result["status"], body=response_body)
+
+
+async def _dispatch_read(request: Request, item: BatchRequestItem, user: User) -> BatchResponseItem:
+    """Run a GET sub-request on its own session so reads can overlap"""
+    db = SessionLocal()
+    try:
+        # Attach the already-authenticated user without re-selecting it
+        local_user = db.merge(user, load=False)
+        return await _dispatch(request, item, db, local_user)
+    finally:
+        db.close()
+
+
+@router.post("/", response_model=BatchResponse)
+async def batch(
+    batch_request: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Execute several API calls in one round trip.
+
+    Sub-requests share the caller's authentication. Consecutive GETs run
+    concurrently; any other method runs on its own, in order, on the
+    batch's database session.
+    """
+    items = batch_request.requests
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_REQUESTS} requests"
+        )
+
+    for item in items:
+        if item.method.upper() not in ALLOWED_METHODS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported method: {item.method}"
+            )
+        if _full_path(item.path).startswith(f"{settings.API_V1_PREFIX}/batch"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Batch requests cannot be nested"
+            )
+
+    responses: List[BatchResponseItem] = []
+    reads: List[BatchRequestItem] = []
+
+    async def flush_reads():
+        if reads:
+            # Reload the shared user if a preceding write expired it, so
+            # the copies handed to each read session are fully populated
+            if inspect(current_user).expired_attributes:
+                db.refresh(current_user)
+            responses.extend(await asyncio.gather(
+                *(_dispatch_read(request, item, current_user) for item in reads)
+            ))
+            reads.clear()
+
+    for item in items:
+        if item.method.upper() == "GET":
+            reads.append(item)
+            continue
+        await flush_reads()
+        responses.append(await _dispatch(request, item, db, current_user))
+    await flush_reads()
+
+    return BatchResponse(responses=responses)
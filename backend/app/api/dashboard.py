@@ -1,17 +1,20 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import Optional
+from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime, date
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import get_current_active_user, get_current_admin_user
 from app.models.user import User
 from app.models.program import Enrollment, EnrollmentStatus
 from app.models.timesheet import Timesheet, TimesheetStatus
 from app.models.document import Document, DocumentStatus
-from app.models.learning import LearningProgress, Announcement
+from app.models.learning import Announcement
+from app.models.earnings import MonthlyEarnings
+from app.services.lesson_service import completion_summary
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -31,6 +34,7 @@ class StudentDashboardResponse(BaseModel):
     # TTW-specific
     sga_monthly_limit: Optional[float] = None
     hours_this_month: Optional[float] = None
+    earnings_this_month: Optional[float] = None
     # Contractor-specific
     onboarding_status: Optional[str] = None
     documents_complete: Optional[bool] = None
@@ -48,6 +52,17 @@ class AdminDashboardResponse(BaseModel):
     total_hours_pending: float
 
 
+class SgaStatusResponse(BaseModel):
+    user_id: int
+    name: str
+    email: str
+    month: date
+    hours: float
+    earnings: float
+    sga_monthly_limit: float
+    percent_of_limit: float
+
+
 @router.get("/student", response_model=StudentDashboardResponse)
 def get_student_dashboard(
     db: Session = Depends(get_db),
@@ -99,26 +114,23 @@ def get_student_dashboard(
         Document.status == DocumentStatus.pending.value
     ).count()
 
-    # Get learning progress
-    completed_lessons = db.query(LearningProgress).filter(
-        LearningProgress.student_id == current_user.id,
-        LearningProgress.completed == True
-    ).count()
+    # Get learning progress from the completion bitmap
+    learning = completion_summary(db, current_user.id, current_user.role)
+    completed_lessons = learning["completed_lessons"]
+    total_lessons = learning["total_lessons"]
 
-    total_lessons = 8  # Hardcoded based on frontend lessons
-
-    # TTW-specific: hours this month for SGA tracking
+    # TTW-specific: this month's approved hours and earnings for SGA tracking
     hours_this_month = None
+    earnings_this_month = None
     sga_monthly_limit = None
     if current_user.role == "ttw_participant":
-        today = date.today()
-        first_of_month = today.replace(day=1)
-        hours_this_month = db.query(func.sum(Timesheet.total_hours)).filter(
-            Timesheet.student_id == current_user.id,
-            Timesheet.status == TimesheetStatus.approved.value,
-            Timesheet.week_start >= first_of_month
-        ).scalar() or 0
-        sga_monthly_limit = float(current_user.sga_monthly_limit) if current_user.sga_monthly_limit else 1470.0
+        rollup = db.query(MonthlyEarnings.hours, MonthlyEarnings.earnings).filter(
+            MonthlyEarnings.user_id == current_user.id,
+            MonthlyEarnings.month == date.today().replace(day=1)
+        ).first()
+        hours_this_month = rollup.hours if rollup else 0
+        earnings_this_month = float(rollup.earnings) if rollup else 0
+        sga_monthly_limit = float(current_user.sga_monthly_limit) if current_user.sga_monthly_limit else settings.SGA_DEFAULT_MONTHLY_LIMIT
 
     # Contractor-specific: onboarding status
     onboarding_status = None
@@ -141,6 +153,7 @@ def get_student_dashboard(
         total_lessons=total_lessons,
         sga_monthly_limit=sga_monthly_limit,
         hours_this_month=hours_this_month,
+        earnings_this_month=earnings_this_month,
         onboarding_status=onboarding_status,
         documents_complete=documents_complete,
     )
@@ -190,3 +203,38 @@ def get_admin_dashboard(
         pending_documents=pending_documents,
         total_hours_pending=total_hours_pending
     )
+
+
+@router.get("/admin/sga", response_model=List[SgaStatusResponse])
+def list_sga_alerts(
+    threshold: float = 0.8,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """TTW participants whose earnings this month are at or above threshold x their SGA limit (admin only)"""
+    month = date.today().replace(day=1)
+    limit = func.coalesce(User.sga_monthly_limit, settings.SGA_DEFAULT_MONTHLY_LIMIT)
+
+    rows = db.query(
+        MonthlyEarnings.hours, MonthlyEarnings.earnings, User.id, User.first_name,
+        User.last_name, User.email, limit.label("sga_limit")
+    ).join(User, User.id == MonthlyEarnings.user_id).filter(
+        MonthlyEarnings.month == month,
+        MonthlyEarnings.earnings > 0,
+        User.role == "ttw_participant",
+        MonthlyEarnings.earnings >= limit * threshold
+    ).order_by(MonthlyEarnings.earnings.desc()).all()
+
+    return [
+        SgaStatusResponse(
+            user_id=row.id,
+            name=f"{row.first_name} {row.last_name}",
+            email=row.email,
+            month=month,
+            hours=row.hours,
+            earnings=float(row.earnings),
+            sga_monthly_limit=float(row.sga_limit),
+            percent_of_limit=round(float(row.earnings) / float(row.sga_limit) * 100, 1),
+        )
+        for row in rows
+    ]
@@ -1,20 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
 from typing import List
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.query_budget import query_budget
 from app.core.security import get_current_active_user, get_current_admin_user
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.models.document import Document, DocumentStatus
 from app.schemas.document import (
     DocumentCreate, DocumentReview, DocumentResponse, DocumentListResponse,
-    DocumentWithStudentResponse
+    DocumentWithStudentResponse, DocumentBulkReview, DocumentBulkReviewResponse
 )
+from app.services.onboarding_service import refresh_documents_complete
+from app.services.event_service import EventType, event, publish
+from app.services.notification_service import enqueue
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
 
+def _document_event(event_type: EventType, document_id: int, student_id: int, document_status: str) -> dict:
+    """A document change, for its owner and the admin approval queue"""
+    return event(
+        event_type,
+        {"document_id": document_id, "student_id": student_id, "status": document_status},
+        user_ids=[student_id],
+        roles=[UserRole.admin.value]
+    )
+
+
 @router.get("/", response_model=List[DocumentListResponse])
 def list_documents(
     skip: int = 0,
@@ -37,19 +52,20 @@ def list_documents(
 
 
 @router.get("/pending", response_model=List[DocumentWithStudentResponse])
+@query_budget(2)
 def list_pending_documents(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """List pending documents for review (admin only)"""
-    documents = db.query(Document).filter(
+    documents = db.query(Document).options(joinedload(Document.student)).filter(
         Document.status == DocumentStatus.pending.value
     ).order_by(Document.uploaded_at.asc()).all()
 
     # Add student info to each document
     result = []
     for doc in documents:
-        student = db.query(User).filter(User.id == doc.student_id).first()
+        student = doc.student
         doc_dict = {
             "id": doc.id,
             "student_id": doc.student_id,
@@ -88,6 +104,7 @@ def upload_document(
     db.add(db_document)
     db.commit()
     db.refresh(db_document)
+    publish(_document_event(EventType.document_uploaded, db_document.id, db_document.student_id, db_document.status))
     return db_document
 
 
@@ -180,6 +197,100 @@ def review_document(
         document.status = DocumentStatus.rejected.value
         document.rejection_reason = review.rejection_reason
 
+    db.flush()
+    refresh_documents_complete(db, [document.student_id])
+
+    enqueue(db, "document_reviewed", [{
+        "user_id": document.student_id,
+        "document_id": document.id,
+        "file_name": document.file_name,
+        "status": document.status,
+        "rejection_reason": document.rejection_reason,
+    }])
     db.commit()
     db.refresh(document)
+    publish(_document_event(EventType.document_reviewed, document.id, document.student_id, document.status))
     return document
+
+
+@router.post("/review/bulk", response_model=DocumentBulkReviewResponse)
+def bulk_review_documents(
+    review: DocumentBulkReview,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Approve or reject many pending documents at once (admin only)"""
+    if (review.document_ids is None) == (review.student_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either document_ids or student_id"
+        )
+
+    values = {
+        "reviewed_at": datetime.utcnow(),
+        "reviewed_by": current_user.id,
+    }
+    if review.approved:
+        values["status"] = DocumentStatus.approved.value
+    else:
+        values["status"] = DocumentStatus.rejected.value
+        values["rejection_reason"] = review.rejection_reason
+
+    statement = update(Document).where(Document.status == DocumentStatus.pending.value)
+    if review.document_ids is not None:
+        document_ids = list(dict.fromkeys(review.document_ids))
+        statement = statement.where(Document.id.in_(document_ids))
+    else:
+        statement = statement.where(Document.student_id == review.student_id)
+
+    # Single guarded UPDATE; anything not pending review is left untouched
+    reviewed = db.execute(
+        statement.values(**values)
+        .returning(Document.id, Document.student_id, Document.file_name)
+        .execution_options(synchronize_session=False)
+    ).all()
+    reviewed_ids = {row.id for row in reviewed}
+
+    if review.document_ids is None:
+        document_ids = sorted(reviewed_ids)
+
+    # Tell "not pending" apart from "does not exist" for the rest
+    remaining = [doc_id for doc_id in document_ids if doc_id not in reviewed_ids]
+    existing = set()
+    if remaining:
+        existing = {
+            row.id for row in db.query(Document.id).filter(Document.id.in_(remaining))
+        }
+
+    # Onboarding completeness is recomputed once per affected user
+    refresh_documents_complete(db, {row.student_id for row in reviewed})
+
+    enqueue(db, "document_reviewed", (
+        {
+            "user_id": row.student_id, "document_id": row.id, "file_name": row.file_name,
+            "status": values["status"], "rejection_reason": values.get("rejection_reason"),
+        }
+        for row in reviewed
+    ))
+    db.commit()
+    publish(*(
+        _document_event(EventType.document_reviewed, row.id, row.student_id, values["status"])
+        for row in reviewed
+    ))
+
+    results = []
+    for doc_id in document_ids:
+        if doc_id in reviewed_ids:
+            outcome = "done"
+        elif doc_id in existing:
+            outcome = "skipped"
+        else:
+            outcome = "not_found"
+        results.append({"document_id": doc_id, "outcome": outcome})
+
+    return DocumentBulkReviewResponse(
+        results=results,
+        reviewed=len(reviewed_ids),
+        skipped=len(existing),
+        not_found=len(remaining) - len(existing),
+    )
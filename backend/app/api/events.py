@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import re
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import create_access_token, decode_token, get_current_active_user
+from app.models.user import User
+from app.schemas.user import Token
+from app.services.event_service import broker, format_event, EventType
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+# Scope of the short-lived tokens that may be passed as ?access_token=
+STREAM_TOKEN_SCOPE = "events"
+
+ACCESS_TOKEN_PARAM = re.compile(r"(access_token=)[^&\s]*")
+
+
+class RedactAccessTokenFilter(logging.Filter):
+    """Keeps ?access_token= values out of the uvicorn access log"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                ACCESS_TOKEN_PARAM.sub(r"\1[redacted]", arg) if isinstance(arg, str) else arg
+                for arg in record.args
+            )
+        return True
+
+
+def get_stream_user(
+    request: Request,
+    access_token: Optional[str] = None
+) -> Tuple[int, str]:
+    """
+    (id, role) of the signed-in user from the Authorization header, or from
+    ?access_token= since browsers cannot set headers on an EventSource. The
+    query parameter only accepts a stream token from POST /events/token, so
+    a URL that ends up in a log is no good for anything else and soon expires.
+    Uses its own short-lived session: a get_db session would stay open, with
+    its pooled connection, for as long as the stream does.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = decode_token(authorization[7:])
+        scope = None
+    else:
+        payload = decode_token(access_token) if access_token else None
+        scope = STREAM_TOKEN_SCOPE
+    if payload is None or payload.get("sub") is None or payload.get("scope") != scope:
+        raise credentials_exception
+
+    db = SessionLocal()
+    try:
+        user = db.query(User.id, User.role, User.is_active).filter(User.id == int(payload["sub"])).first()
+    finally:
+        db.close()
+    if user is None or not user.is_active:
+        raise credentials_exception
+    return user.id, user.role
+
+
+@router.post("/token", response_model=Token)
+def create_stream_token(current_user: User = Depends(get_current_active_user)):
+    """
+    Short-lived token for opening the event stream with ?access_token=.
+    It is checked once, when the stream opens; fetch a new one to reconnect.
+    """
+    access_token = create_access_token(
+        data={"sub": str(current_user.id), "scope": STREAM_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=settings.EVENTS_TOKEN_EXPIRE_SECONDS)
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    current_user: Tuple[int, str] = Depends(get_stream_user)
+):
+    """
+    Server-Sent Events stream of changes relevant to the current user.
+    Admins receive queue events for every participant; participants receive
+    events about their own timesheets and documents. Everyone receives new
+    announcements. A comment line is sent every EVENTS_HEARTBEAT_SECONDS.
+    """
+    user_id, role = current_user
+    subscriber = broker.subscribe(user_id, role)
+
+    async def messages():
+        try:
+            yield f"retry: {settings.EVENTS_RETRY_MILLISECONDS}\n\n"
+            yield format_event({"type": EventType.ready.value, "data": {}})
+            while not await request.is_disconnected():
+                try:
+                    item = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if item is None:
+                    break
+                yield format_event(item)
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.types import DateTime
+
+from app.core.database import SessionLocal
+from app.core.security import get_current_admin_user
+from app.models.user import User
+from app.models.timesheet import Timesheet, TimesheetEntry
+from app.models.document import Document
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# Rows fetched from the server-side cursor per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _users_query():
+    return select(
+        User.id, User.email, User.first_name, User.last_name, User.phone, User.role,
+        User.employment_type, User.case_id, User.job_title, User.department,
+        User.is_active, User.created_at
+    ).order_by(User.id)
+
+
+def _timesheets_query():
+    return select(
+        Timesheet.id, Timesheet.student_id, User.email.label("student_email"),
+        Timesheet.week_start, Timesheet.week_end, Timesheet.total_hours, Timesheet.status,
+        Timesheet.submitted_at, Timesheet.reviewed_at, Timesheet.reviewed_by
+    ).join(User, User.id == Timesheet.student_id).order_by(Timesheet.id)
+
+
+def _entries_query():
+    return select(
+        TimesheetEntry.id, TimesheetEntry.timesheet_id, Timesheet.student_id,
+        TimesheetEntry.date, TimesheetEntry.start_time, TimesheetEntry.end_time,
+        TimesheetEntry.lunch_out, TimesheetEntry.lunch_in, TimesheetEntry.break_minutes,
+        TimesheetEntry.hours
+    ).join(Timesheet, Timesheet.id == TimesheetEntry.timesheet_id).join(
+        User, User.id == Timesheet.student_id
+    ).order_by(TimesheetEntry.id)
+
+
+def _documents_query():
+    return select(
+        Document.id, Document.student_id, User.email.label("student_email"),
+        Document.document_type, Document.file_name, Document.status, Document.uploaded_at,
+        Document.reviewed_at, Document.reviewed_by, Document.expires_at
+    ).join(User, User.id == Document.student_id).order_by(Document.id)
+
+
+# entity -> (column projection, date column, status column); each filter maps
+# onto an indexed column
+EXPORTS = {
+    "users": (_users_query, User.created_at, None),
+    "timesheets": (_timesheets_query, Timesheet.week_start, Timesheet.status),
+    "entries": (_entries_query, TimesheetEntry.date, Timesheet.status),
+    "documents": (_documents_query, Document.uploaded_at, Document.status),
+}
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return str(value)  # Decimal
+
+
+def _stream(statement, export_format: str) -> Iterator[str]:
+    """Fetch through a server-side cursor and emit each chunk as soon as it arrives"""
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+
+        if export_format == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for chunk in result.partitions():
+                writer.writerows(chunk)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for chunk in result.partitions():
+                for row in chunk:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default))
+                    buffer.write("\n")
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+    finally:
+        db.close()
+
+
+@router.get("/{entity}")
+def export_entity(
+    entity: str,
+    export_format: str = Query("csv", alias="format"),
+    role: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Stream users, timesheets, entries or documents as CSV or NDJSON (admin only).
+    Rows are written as they are read, so memory use does not grow with table size.
+    """
+    if entity not in EXPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export: {entity}. Choose from {', '.join(EXPORTS)}"
+        )
+    if export_format not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format: {export_format}. Choose from {', '.join(FORMATS)}"
+        )
+
+    build_query, date_column, status_column = EXPORTS[entity]
+    statement = build_query()
+
+    if role:
+        statement = statement.where(User.role == role)
+
+    if status_filter:
+        if status_column is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{entity} cannot be filtered by status"
+            )
+        statement = statement.where(status_column == status_filter)
+
+    # Timestamp columns compare against whole days
+    is_timestamp = isinstance(date_column.type, DateTime)
+    if start_date:
+        start = datetime.combine(start_date, time.min) if is_timestamp else start_date
+        statement = statement.where(date_column >= start)
+    if end_date:
+        if is_timestamp:
+            statement = statement.where(date_column < datetime.combine(end_date + timedelta(days=1), time.min))
+        else:
+            statement = statement.where(date_column <= end_date)
+
+    filename = f"{entity}_{date.today().strftime('%Y%m%d')}.{export_format}"
+    return StreamingResponse(
+        _stream(statement, export_format),
+        media_type=FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
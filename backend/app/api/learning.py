@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import case, func, or_
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime, timezone
 
-from app.core.database import get_db
+from app.core.database import get_db, upsert
 from app.core.security import get_current_active_user, get_current_admin_user
-from app.models.user import User
-from app.models.learning import LearningProgress, Announcement
+from app.models.user import User, UserRole
+from app.models.learning import LearningProgress, Announcement, Lesson
 from app.schemas.learning import (
-    LearningProgressCreate, LearningProgressUpdate, LearningProgressResponse,
+    LearningProgressCreate, LearningProgressUpdate, LearningProgressResponse, LearningProgressSync,
+    LessonCreate, LessonUpdate, LessonResponse, LessonCatalogResponse, LearningSummaryResponse,
+    LessonFunnelStep, CompletionRateRow,
     AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse
 )
+from app.services.lesson_service import (
+    get_catalog, invalidate_catalog, lessons_for_role, apply_completion_changes, completion_summary
+)
+from app.services.event_service import EventType, ALL_ROLES, event, publish
+from app.services.learning_analytics_service import (
+    GROUP_COLUMNS, record_learning_activity, lesson_funnel, completion_rates
+)
 
 router = APIRouter(prefix="/learning", tags=["Learning Hub"])
 
@@ -28,6 +40,62 @@ def get_learning_progress(
     return progress
 
 
+# Lessons accepted per sync request
+SYNC_MAX_LESSONS = 500
+
+
+def _upsert_progress(db: Session, student_id: int, lessons: dict, keep_completed: bool = False):
+    """
+    Apply {lesson_id: (completed, completed_at)} with one INSERT ... ON CONFLICT
+    DO UPDATE. A lesson that is already complete keeps its original
+    completed_at; marking it incomplete clears it, unless keep_completed.
+    """
+    now = datetime.utcnow()
+    values = []
+    for lesson_id, (completed, completed_at) in lessons.items():
+        if completed_at and completed_at.tzinfo:
+            completed_at = completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+        values.append({
+            "student_id": student_id,
+            "lesson_id": lesson_id,
+            "completed": completed,
+            "completed_at": min(completed_at or now, now) if completed else None,
+        })
+
+    statement = upsert(db, LearningProgress).values(values)
+    completed = statement.excluded.completed == True
+    if keep_completed:
+        completed = or_(completed, LearningProgress.completed == True)
+    return statement.on_conflict_do_update(
+        index_elements=[LearningProgress.student_id, LearningProgress.lesson_id],
+        set_={
+            "completed": completed,
+            "completed_at": case(
+                (completed, func.coalesce(
+                    LearningProgress.completed_at, statement.excluded.completed_at
+                )),
+                else_=None
+            ),
+        }
+    ).returning(LearningProgress).execution_options(populate_existing=True)
+
+
+def _check_lessons(db: Session, lesson_ids) -> None:
+    known = {lesson["id"] for lesson in get_catalog(db)[1]}
+    unknown = sorted(set(lesson_ids) - known)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown lesson(s): {', '.join(str(lesson_id) for lesson_id in unknown)}"
+        )
+
+
+def _record_completion(db: Session, user: User, lessons: dict) -> None:
+    """Update the completion bitmap and today's analytics rollups"""
+    changes = apply_completion_changes(db, user.id, lessons)
+    record_learning_activity(db, user, lessons, changes)
+
+
 @router.post("/progress", response_model=LearningProgressResponse)
 def create_or_update_progress(
     progress_data: LearningProgressCreate,
@@ -35,33 +103,48 @@ def create_or_update_progress(
     current_user: User = Depends(get_current_active_user)
 ):
     """Mark a lesson as complete or incomplete"""
-    # Check for existing progress
-    existing = db.query(LearningProgress).filter(
-        LearningProgress.student_id == current_user.id,
-        LearningProgress.lesson_id == progress_data.lesson_id
-    ).first()
+    _check_lessons(db, [progress_data.lesson_id])
+    progress = db.scalars(_upsert_progress(
+        db, current_user.id, {progress_data.lesson_id: (progress_data.completed, None)}
+    )).one()
+    _record_completion(db, current_user, {progress_data.lesson_id: progress_data.completed})
+    db.commit()
+    return progress
+
+
+@router.post("/progress/sync", response_model=List[LearningProgressResponse])
+def sync_learning_progress(
+    sync_data: LearningProgressSync,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Apply the client's progress for many lessons in one statement and return
+    the merged progress for every lesson. Lessons not sent are left as they
+    are, and completion only moves forward: a stale client reporting a lesson
+    incomplete does not undo a completion made elsewhere.
+    """
+    if len(sync_data.lessons) > SYNC_MAX_LESSONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {SYNC_MAX_LESSONS} lessons per sync"
+        )
 
-    if existing:
-        existing.completed = progress_data.completed
-        if progress_data.completed:
-            existing.completed_at = datetime.utcnow()
-        else:
-            existing.completed_at = None
+    # One row per lesson; a statement cannot update the same row twice
+    lessons = {item.lesson_id: (item.completed, item.completed_at) for item in sync_data.lessons}
+    if lessons:
+        _check_lessons(db, lessons)
+        db.execute(_upsert_progress(db, current_user.id, lessons, keep_completed=True))
+        changes = apply_completion_changes(
+            db, current_user.id, {lesson_id: True for lesson_id, (completed, _) in lessons.items() if completed}
+        )
+        record_learning_activity(db, current_user, lessons, changes)
         db.commit()
-        db.refresh(existing)
-        return existing
-
-    # Create new progress entry
-    db_progress = LearningProgress(
-        student_id=current_user.id,
-        lesson_id=progress_data.lesson_id,
-        completed=progress_data.completed,
-        completed_at=datetime.utcnow() if progress_data.completed else None
-    )
-    db.add(db_progress)
-    db.commit()
-    db.refresh(db_progress)
-    return db_progress
+
+    progress = db.query(LearningProgress).filter(
+        LearningProgress.student_id == current_user.id
+    ).order_by(LearningProgress.lesson_id).all()
+    return progress
 
 
 @router.put("/progress/{lesson_id}", response_model=LearningProgressResponse)
@@ -72,30 +155,169 @@ def update_lesson_progress(
     current_user: User = Depends(get_current_active_user)
 ):
     """Update progress for a specific lesson"""
-    progress = db.query(LearningProgress).filter(
-        LearningProgress.student_id == current_user.id,
-        LearningProgress.lesson_id == lesson_id
-    ).first()
+    _check_lessons(db, [lesson_id])
+    progress = db.scalars(_upsert_progress(
+        db, current_user.id, {lesson_id: (progress_update.completed, None)}
+    )).one()
+    _record_completion(db, current_user, {lesson_id: progress_update.completed})
+    db.commit()
+    return progress
 
-    if not progress:
-        # Create new progress entry
-        progress = LearningProgress(
-            student_id=current_user.id,
-            lesson_id=lesson_id,
-            completed=progress_update.completed,
-            completed_at=datetime.utcnow() if progress_update.completed else None
-        )
-        db.add(progress)
+
+@router.get("/summary", response_model=LearningSummaryResponse)
+def get_learning_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get completion counts, percentage and next lesson for the current user"""
+    return completion_summary(db, current_user.id, current_user.role)
+
+
+# Lesson catalog endpoints
+@router.get("/lessons", response_model=LessonCatalogResponse)
+def get_lesson_catalog(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get the lessons assigned to the current user's role. Responses carry an
+    ETag for the catalog version, so clients can revalidate cheaply.
+    """
+    version, catalog = get_catalog(db)
+    etag = f'W/"{version}-{current_user.role}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    if current_user.role == UserRole.admin.value:
+        lessons = [lesson for lesson in catalog if lesson["is_active"]]
     else:
-        progress.completed = progress_update.completed
-        if progress_update.completed:
-            progress.completed_at = datetime.utcnow()
-        else:
-            progress.completed_at = None
+        lessons = lessons_for_role(catalog, current_user.role)
+    return {"version": version, "lessons": lessons}
+
+
+@router.get("/lessons/admin", response_model=LessonCatalogResponse)
+def list_all_lessons(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """List all lessons including inactive (admin only)"""
+    version, catalog = get_catalog(db)
+    return {"version": version, "lessons": catalog}
 
+
+def _lesson_values(data: dict) -> dict:
+    roles = data.get("assigned_roles")
+    if roles is not None:
+        invalid = sorted(set(roles) - {role.value for role in UserRole})
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid role(s): {', '.join(invalid)}"
+            )
+        data["assigned_roles"] = json.dumps(sorted(set(roles))) if roles else None
+    return data
+
+
+def _lesson_response(lesson: Lesson) -> dict:
+    return {
+        "id": lesson.id,
+        "title": lesson.title,
+        "description": lesson.description,
+        "category": lesson.category,
+        "duration_minutes": lesson.duration_minutes,
+        "sort_order": lesson.sort_order,
+        "assigned_roles": json.loads(lesson.assigned_roles) if lesson.assigned_roles else [],
+        "is_active": lesson.is_active,
+    }
+
+
+@router.post("/lessons", response_model=LessonResponse)
+def create_lesson(
+    lesson_data: LessonCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Add a lesson to the catalog (admin only)"""
+    lesson = Lesson(**_lesson_values(lesson_data.model_dump()), is_active=True)
+    db.add(lesson)
     db.commit()
-    db.refresh(progress)
-    return progress
+    db.refresh(lesson)
+    invalidate_catalog()
+    return _lesson_response(lesson)
+
+
+@router.put("/lessons/{lesson_id}", response_model=LessonResponse)
+def update_lesson(
+    lesson_id: int,
+    lesson_update: LessonUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Update or retire a lesson (admin only)"""
+    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    if not lesson:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lesson not found"
+        )
+
+    update_data = _lesson_values(lesson_update.model_dump(exclude_unset=True))
+    for field, value in update_data.items():
+        setattr(lesson, field, value)
+
+    db.commit()
+    db.refresh(lesson)
+    invalidate_catalog()
+    return _lesson_response(lesson)
+
+
+# Analytics endpoints
+def _check_role(role: Optional[str]) -> None:
+    if role and role not in {user_role.value for user_role in UserRole}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid role: {role}"
+        )
+
+
+@router.get("/analytics/funnel", response_model=List[LessonFunnelStep])
+def get_lesson_funnel(
+    role: Optional[str] = None,
+    program_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get the lesson-by-lesson completion funnel from the daily rollups (admin only)"""
+    _check_role(role)
+    return lesson_funnel(db, role=role, program_id=program_id, start=start_date, end=end_date)
+
+
+@router.get("/analytics/completion-rates", response_model=List[CompletionRateRow])
+def get_completion_rates(
+    group_by: str = "lesson",
+    role: Optional[str] = None,
+    program_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get completion rates grouped by lesson, role, program or day (admin only)"""
+    if group_by not in GROUP_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported grouping: {group_by}. Choose from {', '.join(GROUP_COLUMNS)}"
+        )
+    _check_role(role)
+    return completion_rates(
+        db, group_by=group_by, role=role, program_id=program_id, start=start_date, end=end_date
+    )
 
 
 # Announcements endpoints
@@ -136,6 +358,11 @@ def create_announcement(
     db.add(db_announcement)
     db.commit()
     db.refresh(db_announcement)
+    publish(event(
+        EventType.announcement_created,
+        {"announcement_id": db_announcement.id, "title": db_announcement.title},
+        roles=[ALL_ROLES]
+    ))
     return db_announcement
 
 
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_active_user
+from app.models.user import User
+from app.models.notification import Notification
+from app.schemas.notification import NotificationResponse, NotificationFeedResponse, NotificationReadResponse
+from app.services.notification_service import mark_read, unread_count
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+
+@router.get("/", response_model=NotificationFeedResponse)
+def list_notifications(
+    cursor: Optional[int] = None,
+    limit: int = 20,
+    unread_only: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get the current user's notifications, newest first. Pass next_cursor
+    back as cursor to get the following page.
+    """
+    limit = max(1, min(limit, settings.NOTIFICATIONS_PAGE_MAX))
+    query = db.query(Notification).filter(Notification.user_id == current_user.id)
+    if cursor is not None:
+        query = query.filter(Notification.id < cursor)
+    if unread_only:
+        query = query.filter(Notification.is_read == False)
+
+    # One extra row tells whether another page exists
+    items = query.order_by(Notification.id.desc()).limit(limit + 1).all()
+    next_cursor = items[limit - 1].id if len(items) > limit else None
+    return {
+        "items": items[:limit],
+        "next_cursor": next_cursor,
+        "unread_count": unread_count(db, current_user.id),
+    }
+
+
+@router.get("/unread-count")
+def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the number of unread notifications"""
+    return {"unread_count": unread_count(db, current_user.id)}
+
+
+@router.post("/read-all", response_model=NotificationReadResponse)
+def mark_all_read(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Mark every notification read"""
+    marked = mark_read(db, current_user.id)
+    db.commit()
+    return {"marked": marked, "unread_count": unread_count(db, current_user.id)}
+
+
+@router.post("/{notification_id}/read", response_model=NotificationResponse)
+def mark_notification_read(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Mark one notification read"""
+    notification = db.query(Notification).filter(
+        Notification.id == notification_id,
+        Notification.user_id == current_user.id
+    ).first()
+
+    if not notification:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+
+    mark_read(db, current_user.id, [notification_id])
+    db.commit()
+    db.refresh(notification)
+    return notification
@@ -5,10 +5,12 @@ from typing import List
 from app.core.database import get_db
 from app.core.security import get_current_active_user, get_current_admin_user
 from app.models.user import User
-from app.models.opportunity import Opportunity
+from app.models.opportunity import Opportunity, OpportunityRecommendation
 from app.schemas.opportunity import (
-    OpportunityCreate, OpportunityUpdate, OpportunityResponse
+    OpportunityCreate, OpportunityUpdate, OpportunityResponse, RecommendedOpportunityResponse
 )
+from app.services.search_service import search_rank_subquery
+from app.services.recommendation_service import refresh_all_recommendations
 
 router = APIRouter(prefix="/opportunities", tags=["Opportunities"])
 
@@ -51,6 +53,80 @@ def list_featured_opportunities(
     return opportunities
 
 
+def _recommended(db: Session, user_id: int, limit: int) -> list:
+    return db.query(Opportunity, OpportunityRecommendation.score).join(
+        OpportunityRecommendation, OpportunityRecommendation.opportunity_id == Opportunity.id
+    ).filter(
+        OpportunityRecommendation.user_id == user_id,
+        Opportunity.is_active == True
+    ).order_by(OpportunityRecommendation.score.desc()).limit(limit).all()
+
+
+@router.get("/recommended", response_model=List[RecommendedOpportunityResponse])
+def list_recommended_opportunities(
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    List opportunities ranked for the current user, best match first.
+    Read-only: users the last refresh did not score (new accounts) get
+    featured and newest opportunities until the next one.
+    """
+    limit = min(limit, 50)
+    rows = _recommended(db, current_user.id, limit)
+
+    if not rows:
+        rows = [(opportunity, None) for opportunity in db.query(Opportunity).filter(
+            Opportunity.is_active == True
+        ).order_by(
+            Opportunity.is_featured.desc(),
+            Opportunity.created_at.desc()
+        ).limit(limit)]
+
+    return [
+        RecommendedOpportunityResponse(
+            **OpportunityResponse.model_validate(opportunity).model_dump(), score=score
+        )
+        for opportunity, score in rows
+    ]
+
+
+@router.post("/recommended/refresh")
+def refresh_recommendations_now(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Recompute recommendations for every user now (admin only)"""
+    written = refresh_all_recommendations(db)
+    if written is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A recommendations refresh is already running"
+        )
+    return {"message": "Recommendations refreshed", "recommendations": written}
+
+
+@router.get("/search", response_model=List[OpportunityResponse])
+def search_opportunities(
+    q: str,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Search active opportunities by title, organization, description and requirements"""
+    ranked = search_rank_subquery(db, "opportunities", q)
+    if ranked is None:
+        return []
+
+    opportunities = db.query(Opportunity).join(
+        ranked, ranked.c.id == Opportunity.id
+    ).filter(
+        Opportunity.is_active == True
+    ).order_by(ranked.c.rank.desc()).limit(min(limit, 100)).all()
+    return opportunities
+
+
 @router.get("/admin/all", response_model=List[OpportunityResponse])
 def list_all_opportunities_admin(
     skip: int = 0,
@@ -133,6 +209,10 @@ def delete_opportunity(
             detail="Opportunity not found"
         )
 
+    db.query(OpportunityRecommendation).filter(
+        OpportunityRecommendation.opportunity_id == opportunity_id
+    ).delete(synchronize_session=False)
     db.delete(opportunity)
     db.commit()
+    # Other opportunities move up into the freed slots at the next scheduled refresh
     return {"message": "Opportunity deleted"}
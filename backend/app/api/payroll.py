@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from datetime import date
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_admin_user
+from app.models.user import User
+from app.schemas.payroll import PayrollResponse
+from app.services.payroll import run_payroll, payroll_csv_rows
+
+router = APIRouter(prefix="/payroll", tags=["Payroll"])
+
+
+def _validate_period(period_start: date, period_end: date):
+    if period_end < period_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="period_end must be on or after period_start"
+        )
+    if (period_end - period_start).days + 1 > settings.PAYROLL_MAX_PERIOD_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Pay periods are limited to {settings.PAYROLL_MAX_PERIOD_DAYS} days"
+        )
+
+
+@router.get("/", response_model=PayrollResponse)
+def get_payroll(
+    period_start: date,
+    period_end: date,
+    include_days: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Hours, overtime and gross pay per person for a pay period (admin only)"""
+    _validate_period(period_start, period_end)
+    return run_payroll(db, period_start, period_end, include_days=include_days)
+
+
+@router.get("/export")
+def export_payroll_csv(
+    period_start: date,
+    period_end: date,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Download the pay-period totals as CSV (admin only)"""
+    _validate_period(period_start, period_end)
+    payroll = run_payroll(db, period_start, period_end)
+
+    filename = f"payroll_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}.csv"
+    return StreamingResponse(
+        payroll_csv_rows(payroll),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
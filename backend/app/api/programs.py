@@ -1,15 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import update, insert, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 from typing import List
 
 from app.core.database import get_db
+from app.core.query_budget import query_budget
 from app.core.security import get_current_active_user, get_current_admin_user
 from app.models.user import User
-from app.models.program import Program, Enrollment, ProgramStatus, EnrollmentStatus
+from app.models.program import Program, Enrollment, WaitlistEntry, ProgramStatus, EnrollmentStatus
 from app.schemas.program import (
     ProgramCreate, ProgramUpdate, ProgramResponse,
-    EnrollmentCreate, EnrollmentResponse
+    EnrollmentCreate, EnrollmentResponse, WaitlistEntryResponse
 )
+from app.services.search_service import search_rank_subquery
+from app.services.waitlist_service import join_waitlist, leave_waitlist, promote_waitlist
 
 router = APIRouter(prefix="/programs", tags=["Programs"])
 
@@ -51,6 +56,34 @@ def list_available_programs(
     return programs
 
 
+@router.get("/search", response_model=List[ProgramResponse])
+def search_programs(
+    q: str,
+    limit: int = 20,
+    status: str = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Search programs by name, organization, location and description"""
+    ranked = search_rank_subquery(db, "programs", q)
+    if ranked is None:
+        return []
+
+    query = db.query(Program).join(ranked, ranked.c.id == Program.id)
+
+    if status:
+        query = query.filter(Program.status == status)
+    else:
+        # By default, search open and in_progress programs
+        query = query.filter(Program.status.in_([
+            ProgramStatus.open.value,
+            ProgramStatus.in_progress.value
+        ]))
+
+    programs = query.order_by(ranked.c.rank.desc()).limit(min(limit, 100)).all()
+    return programs
+
+
 @router.post("/", response_model=ProgramResponse)
 def create_program(
     program_data: ProgramCreate,
@@ -99,6 +132,10 @@ def update_program(
     update_data = program_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(program, field, value)
+    db.flush()
+
+    # Added spots (or reopening) go to the waitlist first
+    promote_waitlist(db, program_id)
 
     db.commit()
     db.refresh(program)
@@ -130,6 +167,9 @@ def delete_program(
             detail=f"Cannot delete program with {enrollment_count} enrolled student(s)"
         )
 
+    db.query(WaitlistEntry).filter(
+        WaitlistEntry.program_id == program_id
+    ).delete(synchronize_session=False)
     db.delete(program)
     db.commit()
     return {"message": "Program deleted successfully"}
@@ -149,12 +189,13 @@ def list_all_programs_admin(
 
 # Enrollment endpoints
 @router.get("/enrollments/my", response_model=List[EnrollmentResponse])
+@query_budget(2)
 def my_enrollments(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get current user's program enrollments"""
-    enrollments = db.query(Enrollment).filter(
+    enrollments = db.query(Enrollment).options(joinedload(Enrollment.program)).filter(
         Enrollment.student_id == current_user.id
     ).all()
     return enrollments
@@ -185,7 +226,153 @@ def enroll_in_program(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Enroll in a program"""
+    """Enroll in a program; a withdrawn enrollment is reactivated"""
+    # Cheap early exit; the unique constraint below is what actually guarantees it
+    existing = db.query(Enrollment.status).filter(
+        Enrollment.student_id == current_user.id,
+        Enrollment.program_id == program_id
+    ).scalar()
+
+    if existing and existing != EnrollmentStatus.withdrawn.value:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already enrolled in this program"
+        )
+
+    # Claim a seat with one conditional UPDATE: the row lock serializes
+    # concurrent enrollments and the WHERE clause makes overselling impossible
+    claimed = db.execute(
+        update(Program).where(
+            Program.id == program_id,
+            Program.status == ProgramStatus.open.value,
+            Program.spots_available > 0
+        ).values(
+            spots_available=Program.spots_available - 1
+        ).returning(Program.id).execution_options(synchronize_session=False)
+    ).first()
+
+    if not claimed:
+        db.rollback()
+        program = db.query(Program).filter(Program.id == program_id).first()
+        if not program:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Program not found"
+            )
+        if program.status != ProgramStatus.open.value:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Program is not open for enrollment"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No spots available"
+        )
+
+    try:
+        if existing is None:
+            enrollment = db.scalars(
+                insert(Enrollment).values(
+                    student_id=current_user.id,
+                    program_id=program_id,
+                    status=EnrollmentStatus.pending.value
+                ).returning(Enrollment)
+            ).one()
+        else:
+            # Reactivate the way promote_waitlist does; the status guard
+            # lets only one concurrent re-enrollment through
+            enrollment = db.scalars(
+                update(Enrollment).where(
+                    Enrollment.student_id == current_user.id,
+                    Enrollment.program_id == program_id,
+                    Enrollment.status == EnrollmentStatus.withdrawn.value
+                ).values(
+                    status=EnrollmentStatus.pending.value,
+                    enrolled_at=func.now(),
+                    completed_at=None
+                ).returning(Enrollment).execution_options(synchronize_session=False)
+            ).first()
+        if enrollment is None:
+            # A concurrent request reactivated it first; rolling back returns the seat
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already enrolled in this program"
+            )
+        leave_waitlist(db, program_id, current_user.id)
+        db.commit()
+    except IntegrityError:
+        # A concurrent request enrolled this user first; rolling back returns the seat
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already enrolled in this program"
+        )
+
+    return enrollment
+
+
+@router.post("/enrollments/{enrollment_id}/withdraw", response_model=EnrollmentResponse)
+def withdraw_enrollment(
+    enrollment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Withdraw from a program; the freed seat goes to the waitlist"""
+    enrollment = db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Enrollment not found"
+        )
+
+    if current_user.role != "admin" and enrollment.student_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to withdraw this enrollment"
+        )
+
+    if enrollment.status not in (EnrollmentStatus.pending.value, EnrollmentStatus.active.value):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot withdraw a {enrollment.status} enrollment"
+        )
+
+    # Program row first, matching the lock order of enrollment
+    db.execute(
+        update(Program).where(Program.id == enrollment.program_id).values(
+            spots_available=Program.spots_available + 1
+        ).execution_options(synchronize_session=False)
+    )
+    enrollment.status = EnrollmentStatus.withdrawn.value
+    db.flush()
+    promote_waitlist(db, enrollment.program_id)
+
+    db.commit()
+    db.refresh(enrollment)
+    return enrollment
+
+
+def _waitlist_response(entry: WaitlistEntry, program: Program, student: User = None) -> WaitlistEntryResponse:
+    return WaitlistEntryResponse(
+        program_id=program.id,
+        program_name=program.name,
+        student_id=entry.student_id,
+        student_name=f"{student.first_name} {student.last_name}" if student else None,
+        student_email=student.email if student else None,
+        position=entry.sequence - program.waitlist_head + 1,
+        waitlist_length=program.waitlist_length,
+        joined_at=entry.created_at
+    )
+
+
+@router.post("/{program_id}/waitlist", response_model=WaitlistEntryResponse)
+def join_program_waitlist(
+    program_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Join the waitlist of a full program"""
     program = db.query(Program).filter(Program.id == program_id).first()
     if not program:
         raise HTTPException(
@@ -193,40 +380,94 @@ def enroll_in_program(
             detail="Program not found"
         )
 
-    if program.status != ProgramStatus.open.value:
+    existing = db.query(Enrollment.status).filter(
+        Enrollment.student_id == current_user.id,
+        Enrollment.program_id == program_id
+    ).scalar()
+    if existing and existing != EnrollmentStatus.withdrawn.value:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Program is not open for enrollment"
+            detail="Already enrolled in this program"
         )
 
-    if program.spots_available <= 0:
+    if program.status == ProgramStatus.open.value and program.spots_available > 0 and not program.waitlist_length:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No spots available"
+            detail="Spots are available; enroll instead"
         )
 
-    # Check for existing enrollment
-    existing = db.query(Enrollment).filter(
-        Enrollment.student_id == current_user.id,
-        Enrollment.program_id == program_id
-    ).first()
-
-    if existing:
+    try:
+        sequence = join_waitlist(db, program_id, current_user.id)
+        if sequence is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Program is not open for enrollment"
+            )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Already enrolled in this program"
+            detail="Already on the waitlist"
         )
 
-    enrollment = Enrollment(
-        student_id=current_user.id,
-        program_id=program_id,
-        status=EnrollmentStatus.pending.value
-    )
-    db.add(enrollment)
+    entry = db.query(WaitlistEntry).filter(
+        WaitlistEntry.program_id == program_id,
+        WaitlistEntry.student_id == current_user.id
+    ).first()
+    db.refresh(program)
+    return _waitlist_response(entry, program)
 
-    # Decrement available spots
-    program.spots_available -= 1
 
+@router.delete("/{program_id}/waitlist")
+def leave_program_waitlist(
+    program_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Leave a program's waitlist"""
+    if not leave_waitlist(db, program_id, current_user.id):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not on the waitlist"
+        )
     db.commit()
-    db.refresh(enrollment)
-    return enrollment
+    return {"message": "Left the waitlist"}
+
+
+@router.get("/waitlist/my", response_model=List[WaitlistEntryResponse])
+def get_my_waitlist_positions(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the current user's waitlist positions"""
+    rows = db.query(WaitlistEntry, Program).join(
+        Program, Program.id == WaitlistEntry.program_id
+    ).filter(
+        WaitlistEntry.student_id == current_user.id
+    ).order_by(WaitlistEntry.created_at).all()
+    return [_waitlist_response(entry, program) for entry, program in rows]
+
+
+@router.get("/{program_id}/waitlist", response_model=List[WaitlistEntryResponse])
+def list_program_waitlist(
+    program_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """List a program's waitlist in order (admin only)"""
+    program = db.query(Program).filter(Program.id == program_id).first()
+    if not program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Program not found"
+        )
+
+    rows = db.query(WaitlistEntry, User).join(
+        User, User.id == WaitlistEntry.student_id
+    ).filter(
+        WaitlistEntry.program_id == program_id
+    ).order_by(WaitlistEntry.sequence).all()
+    return [_waitlist_response(entry, program, student) for entry, student in rows]
@@ -1,24 +1,146 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import update, insert, delete, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
 from datetime import datetime, date
 from io import BytesIO
 
 from app.core.database import get_db
+from app.core.query_budget import query_budget
 from app.core.security import get_current_active_user, get_current_admin_user
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.models.timesheet import Timesheet, TimesheetEntry, TimesheetStatus
 from app.models.program import Enrollment
 from app.schemas.timesheet import (
     TimesheetCreate, TimesheetUpdate, TimesheetResponse,
     TimesheetListResponse, TimesheetReview, TimesheetWithStudentResponse,
-    TimesheetSubmit
+    TimesheetSubmit, TimesheetBulkReview, TimesheetBulkReviewResponse,
+    TimesheetEntriesPatch
 )
 from app.services.pdf_service import doc_generator
+from app.services.earnings_service import apply_timesheet_earnings
+from app.services.event_service import EventType, event, publish
+from app.services.notification_service import enqueue
 
 router = APIRouter(prefix="/timesheets", tags=["Timesheets"])
 
+ENTRY_FIELDS = ("start_time", "end_time", "lunch_out", "lunch_in", "break_minutes", "hours")
+
+
+def _apply_entry_changes(
+    db: Session,
+    timesheet_id: int,
+    changes: dict,
+    removed_dates=(),
+    replace: bool = False
+):
+    """
+    Reconcile a timesheet's entries by date.
+    changes maps date -> {field: value}; days already present are updated only
+    if a value differs, new days are inserted, removed_dates are deleted. With
+    replace, every day not in changes is deleted.
+    Each kind of change is a single bulk statement, and total_hours is
+    recomputed in SQL.
+    """
+    existing = {
+        row.date: row for row in db.query(
+            TimesheetEntry.id, TimesheetEntry.date, *(getattr(TimesheetEntry, f) for f in ENTRY_FIELDS)
+        ).filter(TimesheetEntry.timesheet_id == timesheet_id)
+    }
+
+    to_insert = []
+    to_update = []
+    for entry_date, values in changes.items():
+        current = existing.get(entry_date)
+        if current is None:
+            to_insert.append({"timesheet_id": timesheet_id, "date": entry_date, **values})
+            continue
+        changed = {
+            field: value for field, value in values.items()
+            if getattr(current, field) != value
+        }
+        if changed:
+            to_update.append({"id": current.id, **changed})
+
+    if replace:
+        removed_dates = existing.keys() - changes.keys()
+    to_delete = [existing[d].id for d in removed_dates if d in existing]
+
+    if to_delete:
+        db.execute(
+            delete(TimesheetEntry)
+            .where(TimesheetEntry.id.in_(to_delete))
+            .execution_options(synchronize_session=False)
+        )
+    if to_update:
+        db.execute(update(TimesheetEntry), to_update)
+    if to_insert:
+        db.execute(insert(TimesheetEntry), to_insert)
+
+    if to_delete or to_update or to_insert:
+        db.execute(
+            update(Timesheet)
+            .where(Timesheet.id == timesheet_id)
+            .values(total_hours=select(func.coalesce(func.sum(TimesheetEntry.hours), 0))
+                    .where(TimesheetEntry.timesheet_id == timesheet_id)
+                    .scalar_subquery())
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _get_editable_timesheet(db: Session, timesheet_id: int, current_user: User) -> Timesheet:
+    timesheet = db.query(Timesheet).filter(
+        Timesheet.id == timesheet_id,
+        Timesheet.student_id == current_user.id
+    ).first()
+
+    if not timesheet:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Timesheet not found"
+        )
+
+    if timesheet.status not in [TimesheetStatus.draft.value, TimesheetStatus.rejected.value]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot update submitted or approved timesheet"
+        )
+
+    return timesheet
+
+
+def _reject_duplicate_dates(entries):
+    dates = [entry.date for entry in entries]
+    if len(dates) != len(set(dates)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each day may only appear once"
+        )
+
+
+def _timesheet_event(event_type: EventType, timesheet_id: int, student_id: int, timesheet_status: str) -> dict:
+    """A timesheet change, for its owner and the admin approval queue"""
+    return event(
+        event_type,
+        {"timesheet_id": timesheet_id, "student_id": student_id, "status": timesheet_status},
+        user_ids=[student_id],
+        roles=[UserRole.admin.value]
+    )
+
+
+def _review_notice(timesheet: Timesheet) -> dict:
+    """Outbox payload telling the owner about a review decision"""
+    return {
+        "user_id": timesheet.student_id,
+        "timesheet_id": timesheet.id,
+        "week_start": timesheet.week_start,
+        "status": timesheet.status,
+        "rejection_reason": timesheet.rejection_reason,
+    }
+
 
 @router.get("/", response_model=List[TimesheetListResponse])
 def list_timesheets(
@@ -42,19 +164,22 @@ def list_timesheets(
 
 
 @router.get("/pending", response_model=List[TimesheetWithStudentResponse])
+@query_budget(3)
 def list_pending_timesheets(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """List pending timesheets for approval (admin only)"""
-    timesheets = db.query(Timesheet).filter(
+    timesheets = db.query(Timesheet).options(
+        joinedload(Timesheet.student), selectinload(Timesheet.entries)
+    ).filter(
         Timesheet.status == TimesheetStatus.submitted.value
     ).order_by(Timesheet.submitted_at.asc()).all()
 
     # Add student info to each timesheet
     result = []
     for ts in timesheets:
-        student = db.query(User).filter(User.id == ts.student_id).first()
+        student = ts.student
         ts_dict = {
             "id": ts.id,
             "student_id": ts.student_id,
@@ -82,49 +207,43 @@ def create_timesheet(
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new timesheet"""
-    # Check for existing timesheet for this week
-    existing = db.query(Timesheet).filter(
-        Timesheet.student_id == current_user.id,
-        Timesheet.week_start == timesheet_data.week_start
-    ).first()
+    # Calculate total hours from entries
+    total_hours = sum(entry.hours for entry in timesheet_data.entries)
 
-    if existing:
+    # Create timesheet; uq_timesheet_student_week rejects a second one for the week
+    try:
+        db_timesheet = db.scalars(
+            insert(Timesheet).values(
+                student_id=current_user.id,
+                week_start=timesheet_data.week_start,
+                week_end=timesheet_data.week_end,
+                notes=timesheet_data.notes,
+                total_hours=total_hours
+            ).returning(Timesheet)
+        ).one()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Timesheet already exists for this week"
         )
 
-    # Calculate total hours from entries
-    total_hours = sum(entry.hours for entry in timesheet_data.entries)
-
-    # Create timesheet
-    db_timesheet = Timesheet(
-        student_id=current_user.id,
-        week_start=timesheet_data.week_start,
-        week_end=timesheet_data.week_end,
-        notes=timesheet_data.notes,
-        total_hours=total_hours
-    )
-    db.add(db_timesheet)
-    db.flush()
-
-    # Create entries
-    for entry_data in timesheet_data.entries:
-        db_entry = TimesheetEntry(
-            timesheet_id=db_timesheet.id,
-            date=entry_data.date,
-            start_time=entry_data.start_time,
-            end_time=entry_data.end_time,
-            lunch_out=entry_data.lunch_out,
-            lunch_in=entry_data.lunch_in,
-            break_minutes=entry_data.break_minutes,
-            hours=entry_data.hours
-        )
-        db.add(db_entry)
-
+    # Create entries in one multi-row INSERT ... RETURNING
+    entries = []
+    if timesheet_data.entries:
+        entries = db.scalars(
+            insert(TimesheetEntry).returning(TimesheetEntry, sort_by_parameter_order=True),
+            [
+                {"timesheet_id": db_timesheet.id, **entry_data.model_dump()}
+                for entry_data in timesheet_data.entries
+            ]
+        ).all()
+    set_committed_value(db_timesheet, "entries", entries)
+
+    # Build the response before commit expires the loaded rows
+    response = TimesheetResponse.model_validate(db_timesheet)
     db.commit()
-    db.refresh(db_timesheet)
-    return db_timesheet
+    return response
 
 
 @router.get("/{timesheet_id}", response_model=TimesheetResponse)
@@ -160,51 +279,43 @@ def update_timesheet(
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a timesheet (only if draft or rejected)"""
-    timesheet = db.query(Timesheet).filter(
-        Timesheet.id == timesheet_id,
-        Timesheet.student_id == current_user.id
-    ).first()
-
-    if not timesheet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Timesheet not found"
-        )
-
-    if timesheet.status not in [TimesheetStatus.draft.value, TimesheetStatus.rejected.value]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot update submitted or approved timesheet"
-        )
+    timesheet = _get_editable_timesheet(db, timesheet_id, current_user)
 
     # Update notes
     if timesheet_update.notes is not None:
         timesheet.notes = timesheet_update.notes
 
-    # Update entries if provided
+    # Replace entries if provided, touching only the days that changed
     if timesheet_update.entries is not None:
-        # Delete existing entries
-        db.query(TimesheetEntry).filter(
-            TimesheetEntry.timesheet_id == timesheet_id
-        ).delete()
-
-        # Add new entries
-        total_hours = 0
-        for entry_data in timesheet_update.entries:
-            db_entry = TimesheetEntry(
-                timesheet_id=timesheet_id,
-                date=entry_data.date,
-                start_time=entry_data.start_time,
-                end_time=entry_data.end_time,
-                lunch_out=entry_data.lunch_out,
-                lunch_in=entry_data.lunch_in,
-                break_minutes=entry_data.break_minutes,
-                hours=entry_data.hours
-            )
-            db.add(db_entry)
-            total_hours += entry_data.hours
-
-        timesheet.total_hours = total_hours
+        _reject_duplicate_dates(timesheet_update.entries)
+        changes = {
+            entry.date: entry.model_dump(include=set(ENTRY_FIELDS))
+            for entry in timesheet_update.entries
+        }
+        _apply_entry_changes(db, timesheet_id, changes, replace=True)
+
+    db.commit()
+    db.refresh(timesheet)
+    return timesheet
+
+
+@router.patch("/{timesheet_id}/entries", response_model=TimesheetResponse)
+def patch_timesheet_entries(
+    timesheet_id: int,
+    patch: TimesheetEntriesPatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Change individual days of a timesheet (only if draft or rejected)"""
+    timesheet = _get_editable_timesheet(db, timesheet_id, current_user)
+    _reject_duplicate_dates(patch.entries)
+
+    changes = {
+        entry.date: entry.model_dump(include=set(ENTRY_FIELDS), exclude_unset=True)
+        for entry in patch.entries if not entry.remove
+    }
+    removed_dates = [entry.date for entry in patch.entries if entry.remove]
+    _apply_entry_changes(db, timesheet_id, changes, removed_dates)
 
     db.commit()
     db.refresh(timesheet)
@@ -245,9 +356,36 @@ def submit_timesheet(
     timesheet.submitted_at = datetime.utcnow()
     db.commit()
     db.refresh(timesheet)
+    publish(_timesheet_event(EventType.timesheet_submitted, timesheet.id, timesheet.student_id, timesheet.status))
     return timesheet
 
 
+def _transition(db: Session, timesheet_id: int, expected_status: str, values: dict, wrong_status_detail: str) -> None:
+    """
+    Change a timesheet's status with one guarded UPDATE, so of two concurrent
+    requests only the first still finds it in expected_status
+    """
+    changed = db.execute(
+        update(Timesheet)
+        .where(Timesheet.id == timesheet_id, Timesheet.status == expected_status)
+        .values(**values)
+        .returning(Timesheet.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if changed is not None:
+        return
+
+    if db.query(Timesheet.id).filter(Timesheet.id == timesheet_id).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Timesheet not found"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=wrong_status_detail
+    )
+
+
 @router.post("/{timesheet_id}/review", response_model=TimesheetResponse)
 def review_timesheet(
     timesheet_id: int,
@@ -256,32 +394,125 @@ def review_timesheet(
     current_user: User = Depends(get_current_admin_user)
 ):
     """Approve or reject a timesheet (admin only)"""
-    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
+    values = {
+        "reviewed_at": datetime.utcnow(),
+        "reviewed_by": current_user.id,
+    }
+    if review.approved:
+        values["status"] = TimesheetStatus.approved.value
+    else:
+        values["status"] = TimesheetStatus.rejected.value
+        values["rejection_reason"] = review.rejection_reason
 
-    if not timesheet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Timesheet not found"
-        )
+    _transition(db, timesheet_id, TimesheetStatus.submitted.value, values, "Timesheet is not pending review")
+    if review.approved:
+        apply_timesheet_earnings(db, [timesheet_id])
 
-    if timesheet.status != TimesheetStatus.submitted.value:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Timesheet is not pending review"
-        )
+    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).one()
+    enqueue(db, "timesheet_reviewed", [_review_notice(timesheet)])
+    db.commit()
+    db.refresh(timesheet)
+    publish(_timesheet_event(EventType.timesheet_reviewed, timesheet.id, timesheet.student_id, timesheet.status))
+    return timesheet
+
+
+@router.post("/{timesheet_id}/reopen", response_model=TimesheetResponse)
+def reopen_timesheet(
+    timesheet_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Send an approved timesheet back to draft so it can be corrected (admin only)"""
+    _transition(db, timesheet_id, TimesheetStatus.approved.value, {
+        "status": TimesheetStatus.draft.value,
+        "submitted_at": None,
+        "reviewed_at": None,
+        "reviewed_by": None,
+    }, "Only approved timesheets can be reopened")
+
+    # Approved hours come back out of the monthly earnings rollup, at the rate they went in
+    apply_timesheet_earnings(db, [timesheet_id], sign=-1)
+
+    timesheet = db.query(Timesheet).filter(Timesheet.id == timesheet_id).one()
+    enqueue(db, "timesheet_reviewed", [_review_notice(timesheet)])
+    db.commit()
+    db.refresh(timesheet)
+    publish(_timesheet_event(EventType.timesheet_reviewed, timesheet.id, timesheet.student_id, timesheet.status))
+    return timesheet
 
-    timesheet.reviewed_at = datetime.utcnow()
-    timesheet.reviewed_by = current_user.id
 
+@router.post("/review/bulk", response_model=TimesheetBulkReviewResponse)
+def bulk_review_timesheets(
+    review: TimesheetBulkReview,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Approve or reject many submitted timesheets at once (admin only)"""
+    timesheet_ids = list(dict.fromkeys(review.timesheet_ids))
+
+    values = {
+        "reviewed_at": datetime.utcnow(),
+        "reviewed_by": current_user.id,
+    }
     if review.approved:
-        timesheet.status = TimesheetStatus.approved.value
+        values["status"] = TimesheetStatus.approved.value
     else:
-        timesheet.status = TimesheetStatus.rejected.value
-        timesheet.rejection_reason = review.rejection_reason
+        values["status"] = TimesheetStatus.rejected.value
+        values["rejection_reason"] = review.rejection_reason
+
+    # Single guarded UPDATE; anything not pending review is left untouched
+    reviewed = db.execute(
+        update(Timesheet)
+        .where(
+            Timesheet.id.in_(timesheet_ids),
+            Timesheet.status == TimesheetStatus.submitted.value
+        )
+        .values(**values)
+        .returning(Timesheet.id, Timesheet.student_id, Timesheet.week_start, Timesheet.total_hours)
+        .execution_options(synchronize_session=False)
+    ).all()
+    reviewed_hours = {row.id: row.total_hours or 0 for row in reviewed}
+    if review.approved:
+        apply_timesheet_earnings(db, reviewed_hours)
+
+    # Tell "not pending" apart from "does not exist" for the rest
+    remaining = [ts_id for ts_id in timesheet_ids if ts_id not in reviewed_hours]
+    existing = set()
+    if remaining:
+        existing = {
+            row.id for row in db.query(Timesheet.id).filter(Timesheet.id.in_(remaining))
+        }
 
+    enqueue(db, "timesheet_reviewed", (
+        {
+            "user_id": row.student_id, "timesheet_id": row.id, "week_start": row.week_start,
+            "status": values["status"], "rejection_reason": values.get("rejection_reason"),
+        }
+        for row in reviewed
+    ))
     db.commit()
-    db.refresh(timesheet)
-    return timesheet
+    publish(*(
+        _timesheet_event(EventType.timesheet_reviewed, row.id, row.student_id, values["status"])
+        for row in reviewed
+    ))
+
+    results = []
+    for ts_id in timesheet_ids:
+        if ts_id in reviewed_hours:
+            outcome = "done"
+        elif ts_id in existing:
+            outcome = "skipped"
+        else:
+            outcome = "not_found"
+        results.append({"timesheet_id": ts_id, "outcome": outcome})
+
+    return TimesheetBulkReviewResponse(
+        results=results,
+        reviewed=len(reviewed_hours),
+        skipped=len(existing),
+        not_found=len(remaining) - len(existing),
+        total_hours=sum(reviewed_hours.values()),
+    )
 
 
 @router.get("/{timesheet_id}/pdf")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -8,7 +8,11 @@ from app.models.user import User
 from app.models.timesheet import Timesheet, TimesheetStatus
 from app.models.document import Document, DocumentStatus
 from app.models.program import Enrollment
-from app.schemas.user import UserResponse, UserUpdate, StudentProfileResponse
+from app.schemas.user import (
+    UserResponse, UserUpdate, StudentProfileResponse, UserImportResponse, UserSearchResult
+)
+from app.services.user_import import ImportFileError, read_rows, import_users
+from app.services.search_service import search_users
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -41,6 +45,49 @@ def list_students(
     return users
 
 
+@router.get("/search", response_model=List[UserSearchResult])
+def search_students(
+    q: str,
+    limit: int = 10,
+    role: str = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Typeahead search by name, email, case ID or phone (admin only)"""
+    return search_users(db, q, limit=min(limit, 50), role=role)
+
+
+@router.post("/import", response_model=UserImportResponse)
+def import_users_from_file(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Bulk-create users from a CSV or XLSX file (admin only).
+    All rows are validated before anything is written; rows with errors are
+    reported and skipped. Rows with a program_id take that program's open
+    seats in file order; the rest join its waitlist. Use dry_run to validate
+    without creating users.
+    """
+    try:
+        rows = read_rows(file.filename or "", file.file.read())
+    except ImportFileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No rows found in file"
+        )
+
+    return import_users(db, rows, dry_run=dry_run)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: int,
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -20,6 +20,67 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
 
+    # Batch requests
+    BATCH_MAX_REQUESTS: int = 20
+
+    # Bulk user import
+    IMPORT_HASH_WORKERS: Optional[int] = None  # Defaults to one per CPU, at most 4
+
+    # Payroll
+    PAYROLL_OVERTIME_WEEKLY_HOURS: float = 40.0
+    PAYROLL_OVERTIME_MULTIPLIER: float = 1.5
+    PAYROLL_MAX_PERIOD_DAYS: int = 62
+    PAYROLL_WORKWEEK_START: int = 0  # Weekday overtime weeks begin on; 0 = Monday, like timesheet weeks
+
+    # Ticket to Work SGA tracking
+    SGA_DEFAULT_MONTHLY_LIMIT: float = 1470.0  # Used when a participant has no limit set
+    SGA_ASSUMED_HOURLY_WAGE: float = 15.0  # Used when a participant has no hourly rate
+
+    # Opportunity recommendations
+    RECOMMENDATIONS_PER_USER: int = 20
+    RECOMMENDATIONS_REFRESH_MINUTES: int = 60  # 0 disables the scheduled refresh
+    RECOMMENDATIONS_POLL_SECONDS: float = 30.0  # How soon opportunity changes are picked up
+
+    # Server-Sent Events
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+    EVENTS_QUEUE_SIZE: int = 100  # Per stream; a client further behind is told to resync
+    EVENTS_RETRY_MILLISECONDS: int = 5000  # Client reconnect delay
+    EVENTS_RECONNECT_SECONDS: int = 5  # LISTEN connection retry delay
+    EVENTS_TOKEN_EXPIRE_SECONDS: int = 60  # Stream tokens passed as ?access_token=
+
+    # Notifications outbox
+    NOTIFICATIONS_DISPATCH_IN_APP: bool = True  # False when dispatch_notifications.py runs separately
+    NOTIFICATIONS_POLL_SECONDS: float = 5.0
+    NOTIFICATIONS_BATCH_SIZE: int = 200
+    NOTIFICATIONS_MAX_ATTEMPTS: int = 5  # Per email
+    NOTIFICATIONS_RETRY_SECONDS: int = 60  # Doubles after each failed attempt
+    NOTIFICATIONS_EMAIL_LEASE_SECONDS: int = 600  # Claimed emails are retried after this if never settled
+    NOTIFICATIONS_PAGE_MAX: int = 100
+
+    # Email (SMTP); leave SMTP_HOST empty to send in-app notifications only
+    SMTP_HOST: str = ""
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_USE_TLS: bool = True
+    EMAIL_FROM: str = "Career Focus <no-reply@careerfocus.org>"
+
+    # Audit log
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 0.5  # Longest an entry waits for its batch to fill
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 1.0  # Then the committing thread writes the entry itself
+    AUDIT_PARTITIONS_AHEAD: int = 3  # Monthly partitions created in advance (PostgreSQL)
+    AUDIT_PAGE_MAX: int = 200
+
+    # Metrics; set PROMETHEUS_MULTIPROC_DIR in the environment when running several workers
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # When set, /metrics requires it as a Bearer token
+
+    # Query budgets (app/core/query_budget.py): "off", "warn" (development) or "raise" (tests)
+    QUERY_BUDGET_MODE: str = "off"
+    QUERY_REPEAT_LIMIT: int = 5  # Runs of one statement per request before it is reported as N+1
+
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:5173",  # Vite dev server
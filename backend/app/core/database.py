@@ -1,8 +1,10 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import mark_threadpool_start
 
 # Handle Render's postgres:// vs postgresql:// URL format
 database_url = settings.DATABASE_URL
@@ -15,7 +17,16 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
+def get_db(request: Request):
+    # Runs in the threadpool ahead of nearly every endpoint, so its start
+    # marks when the request got a worker thread
+    mark_threadpool_start()
+    # Sub-requests dispatched by /batch reuse the batch's session
+    shared_db = getattr(request.state, "batch_db", None)
+    if shared_db is not None:
+        yield shared_db
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -23,5 +34,17 @@ def get_db():
         db.close()
 
 
+def upsert(db, model):
+    """
+    INSERT that supports on_conflict_do_update / on_conflict_do_nothing
+    on both PostgreSQL and SQLite
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
+
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,205 @@
+"""
+Prometheus metrics per route template: latency, DB queries and DB time,
+response bytes and threadpool wait. Alongside them, the two shared
+resources a request can queue for outside the threadpool: database pool
+connections and bcrypt password hashing.
+
+MetricsMiddleware is plain ASGI so streamed responses pass straight through
+while their bytes are counted. Each request carries one RequestMetrics in a
+context variable; the SQLAlchemy cursor hooks and get_db add to it from
+worker threads, which inherit the context. Requests are labelled with their
+route template ("/api/v1/documents/{document_id}"), never the raw path, so
+label sets stay bounded.
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before the server starts: each worker then writes its samples
+there and /metrics aggregates all of them.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Requests that matched no route share one label
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, including streaming the body",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries issued per request",
+    ["method", "route"], buckets=QUERY_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing database queries per request",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+RESPONSE_BYTES = Histogram(
+    "http_response_size_bytes", "Response body bytes",
+    ["method", "route"], buckets=SIZE_BUCKETS
+)
+THREADPOOL_WAIT_SECONDS = Histogram(
+    "http_request_threadpool_wait_seconds",
+    "Time from arrival until the request's first threadpool task (the database session) starts",
+    ["method", "route"], buckets=WAIT_BUCKETS
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds", "Time to hash or verify a password with bcrypt",
+    ["operation"], buckets=LATENCY_BUCKETS
+)
+PASSWORD_HASHES_IN_PROGRESS = Gauge(
+    "password_hashes_in_progress", "bcrypt hashes and verifications running now",
+    multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out", "Database connections checked out of the pool",
+    multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_connections_capacity", "Connections the pool can hand out at once: pool size plus overflow",
+    multiprocess_mode="livesum"
+)
+
+
+class RequestMetrics:
+    """What one request has used so far"""
+    __slots__ = ("started", "queries", "db_seconds", "threadpool_wait")
+
+    def __init__(self, started: float):
+        self.started = started
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.threadpool_wait: Optional[float] = None
+
+
+_current: ContextVar = ContextVar("request_metrics", default=None)
+
+
+def mark_threadpool_start() -> None:
+    """Call from the request's first threadpool work to record how long it queued"""
+    metrics = _current.get()
+    if metrics is not None and metrics.threadpool_wait is None:
+        metrics.threadpool_wait = time.perf_counter() - metrics.started
+
+
+def route_label(scope) -> str:
+    """The matched route template, with the API prefix, or UNMATCHED_ROUTE"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return UNMATCHED_ROUTE
+    # Some FastAPI versions report routes of included routers without the include prefix
+    if scope["path"].startswith(settings.API_V1_PREFIX) and not path.startswith(settings.API_V1_PREFIX):
+        path = settings.API_V1_PREFIX + path
+    return path
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(time.perf_counter())
+        token = _current.set(metrics)
+        status_code = 500
+        size = 0
+
+        async def send_counting(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            _current.reset(token)
+            labels = (scope["method"], route_label(scope))
+            REQUEST_SECONDS.labels(*labels, str(status_code)).observe(time.perf_counter() - metrics.started)
+            REQUEST_QUERIES.labels(*labels).observe(metrics.queries)
+            REQUEST_DB_SECONDS.labels(*labels).observe(metrics.db_seconds)
+            RESPONSE_BYTES.labels(*labels).observe(size)
+            if metrics.threadpool_wait is not None:
+                THREADPOOL_WAIT_SECONDS.labels(*labels).observe(metrics.threadpool_wait)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    started = getattr(context, "_metrics_started", None)
+    if metrics is not None and started is not None:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def install_query_hooks(engine) -> None:
+    """Count and time every query the engine runs on behalf of a request"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def install_pool_hooks(engine) -> None:
+    """Track the engine's pool usage against its capacity"""
+    if event.contains(engine, "checkout", _pool_checkout):
+        return
+    pool = engine.pool
+    max_overflow = getattr(pool, "_max_overflow", None)
+    # Pools without a fixed size (SQLite in memory, NullPool) have no capacity to report
+    if callable(getattr(pool, "size", None)) and max_overflow is not None and max_overflow >= 0:
+        DB_POOL_CAPACITY.set(pool.size() + max_overflow)
+    event.listen(engine, "checkout", _pool_checkout)
+    event.listen(engine, "checkin", _pool_checkin)
+
+
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _pool_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+@contextmanager
+def password_hashing(operation: str):
+    """Time a bcrypt hash or verify ("hash", "verify") and count it while it runs"""
+    started = time.perf_counter()
+    with PASSWORD_HASHES_IN_PROGRESS.track_inprogress():
+        try:
+            yield
+        finally:
+            PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition text for /metrics, aggregated across workers when multiprocess"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
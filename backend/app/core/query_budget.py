@@ -0,0 +1,243 @@
+"""
+Query budgets: catch endpoints that issue more queries than they should,
+and N+1 patterns where one statement runs again and again with different
+parameters (a per-row lookup or lazy load inside a loop).
+
+Declare a budget on an endpoint with @query_budget(n). With
+QUERY_BUDGET_MODE set to "warn" or "raise", QueryBudgetMiddleware records
+every request's statements. After the response it reports any request that
+went over its endpoint's budget, or that ran one statement more than
+QUERY_REPEAT_LIMIT times. Each report includes the application call stack
+that issued the offending query. "warn" prints the report, which suits
+development. "raise" raises QueryBudgetExceeded so the test that made the
+request fails.
+
+QueryBudget can also be used directly as a context manager around any code:
+
+    with QueryBudget(max_queries=3, all_threads=True):
+        client.get("/api/v1/timesheets/pending", headers=admin)
+
+all_threads=True counts queries from every thread, which test clients that
+run the app on another thread need; the default counts only the current
+context, as requests do.
+"""
+import os
+import threading
+import traceback
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import route_label
+
+BUDGET_ATTRIBUTE = "__query_budget__"
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets open in the current context, innermost last
+_context_budgets: ContextVar = ContextVar("query_budgets", default=())
+# Budgets counting queries from every thread
+_global_budgets: List["QueryBudget"] = []
+_global_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block of code issued more queries than its budget, or an N+1 pattern"""
+
+
+def _app_stack() -> str:
+    """
+    The application frames of the current call stack, outermost first, or
+    the innermost frames when no application code is on it (a lazy load
+    during response serialization)
+    """
+    stack = [frame for frame in traceback.extract_stack()[:-2] if frame.filename != __file__]
+    frames = [frame for frame in stack if frame.filename.startswith(_APP_DIR)]
+    if frames:
+        return "".join(traceback.format_list(frames))
+    frames = [frame for frame in stack if "sqlalchemy" not in frame.filename][-4:]
+    return "  (no application frames; likely a lazy load while serializing the response)\n" + "".join(
+        traceback.format_list(frames)
+    )
+
+
+class _Statement:
+    __slots__ = ("count", "parameters", "stack")
+
+    def __init__(self):
+        self.count = 0
+        self.parameters = set()
+        self.stack: Optional[str] = None
+
+
+class QueryBudget:
+    """Counts the queries run while open and checks them on exit"""
+
+    def __init__(
+        self,
+        max_queries: Optional[int] = None,
+        max_repeats: Optional[int] = None,
+        label: str = "block",
+        all_threads: bool = False,
+        mode: Optional[str] = None
+    ):
+        self.max_queries = max_queries
+        self.max_repeats = settings.QUERY_REPEAT_LIMIT if max_repeats is None else max_repeats
+        self.label = label
+        self.all_threads = all_threads
+        self.mode = mode or settings.QUERY_BUDGET_MODE
+        self.count = 0
+        self.statements: Dict[str, _Statement] = {}
+        self.over_budget_stack: Optional[str] = None
+        self._lock = threading.Lock()
+        self._token = None
+
+    def record(self, statement: str, parameters) -> None:
+        with self._lock:
+            self.count += 1
+            seen = self.statements.get(statement)
+            if seen is None:
+                seen = self.statements[statement] = _Statement()
+            seen.count += 1
+            if len(seen.parameters) <= self.max_repeats:
+                seen.parameters.add(repr(parameters))
+            # Stacks are costly, so capture one only when a limit is first crossed
+            over_repeats = self.max_repeats and seen.count == self.max_repeats + 1
+            over_budget = self.max_queries is not None and self.count == self.max_queries + 1
+        if over_repeats:
+            seen.stack = _app_stack()
+        if over_budget:
+            self.over_budget_stack = _app_stack()
+
+    def problems(self) -> List[str]:
+        problems = []
+        if self.max_queries is not None and self.count > self.max_queries:
+            problems.append(
+                f"{self.count} queries, budget is {self.max_queries}. "
+                f"Query {self.max_queries + 1} was issued from:\n{self.over_budget_stack}"
+            )
+        if self.max_repeats:
+            for statement, seen in self.statements.items():
+                if seen.count > self.max_repeats:
+                    kind = "N+1: with different parameters" if len(seen.parameters) > 1 else "repeated with the same parameters"
+                    problems.append(
+                        f"Statement ran {seen.count} times ({kind}):\n  {' '.join(statement.split())}\n"
+                        f"Repeat {self.max_repeats + 1} was issued from:\n{seen.stack}"
+                    )
+        return problems
+
+    def check(self) -> None:
+        """Report problems according to mode: "raise", "warn" or "off" """
+        problems = self.problems() if self.mode != "off" else []
+        if not problems:
+            return
+        report = f"Query budget exceeded in {self.label}:\n" + "\n".join(problems)
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(report)
+        print(report)
+
+    def __enter__(self) -> "QueryBudget":
+        install_query_counter()
+        if self.all_threads:
+            with _global_lock:
+                _global_budgets.append(self)
+        else:
+            self._token = _context_budgets.set(_context_budgets.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.all_threads:
+            with _global_lock:
+                _global_budgets.remove(self)
+        else:
+            _context_budgets.reset(self._token)
+        if exc_type is None:
+            self.check()
+
+
+def query_budget(max_queries: Optional[int], max_repeats: Optional[int] = None) -> Callable:
+    """
+    Declare how many queries a request to this endpoint may issue, counting
+    its dependencies and response serialization. Enforced by
+    QueryBudgetMiddleware. Place it below the @router decorator.
+    """
+    def decorate(endpoint: Callable) -> Callable:
+        setattr(endpoint, BUDGET_ATTRIBUTE, (max_queries, max_repeats))
+        return endpoint
+    return decorate
+
+
+class QueryBudgetMiddleware:
+    """Checks every request against its endpoint's declared budget"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or settings.QUERY_BUDGET_MODE == "off":
+            await self.app(scope, receive, send)
+            return
+
+        install_query_counter()
+        budget = _RequestBudget(scope)
+        # A request's queries are its own, even when it runs inside another (/batch)
+        token = _context_budgets.set((budget,))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _context_budgets.reset(token)
+
+        budget.apply_declared()
+        budget.label = f"{scope['method']} {route_label(scope)}"
+        budget.check()
+
+
+class _RequestBudget(QueryBudget):
+    """
+    A request's budget. Routing happens before any query runs, so the first
+    query looks up the endpoint's declared budget, in time to capture the
+    stack of the query that exceeds it.
+    """
+
+    def __init__(self, scope):
+        super().__init__()
+        self.scope = scope
+        self.declared = False
+
+    def apply_declared(self) -> None:
+        if self.declared:
+            return
+        self.declared = True
+        endpoint = getattr(self.scope.get("route"), "endpoint", None)
+        declared = getattr(endpoint, BUDGET_ATTRIBUTE, None)
+        if declared is not None:
+            self.max_queries = declared[0]
+            if declared[1] is not None:
+                self.max_repeats = declared[1]
+
+    def record(self, statement: str, parameters) -> None:
+        self.apply_declared()
+        super().record(statement, parameters)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    budgets = _context_budgets.get()
+    if _global_budgets:
+        with _global_lock:
+            budgets = budgets + tuple(_global_budgets)
+    for budget in budgets:
+        budget.record(statement, parameters)
+
+
+_installed = False
+
+
+def install_query_counter() -> None:
+    """Feed the engine's statements to open budgets; safe to call more than once"""
+    global _installed
+    if not _installed:
+        from app.core.database import engine
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        _installed = True
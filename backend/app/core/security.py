@@ -2,12 +2,13 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.metrics import password_hashing
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
@@ -23,11 +24,13 @@ NON_ADMIN_ROLES = {"employee", "contractor", "wble_participant", "ttw_participan
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with password_hashing("verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with password_hashing("hash"):
+        return pwd_context.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -50,10 +53,20 @@ def decode_token(token: str) -> Optional[dict]:
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ):
     from app.models.user import User
+    from app.services.audit_service import set_audit_context
+
+    source = f"{request.method} {request.url.path}"
+
+    # Sub-requests dispatched by /batch are already authenticated
+    batch_user = getattr(request.state, "batch_user", None)
+    if batch_user is not None:
+        set_audit_context(batch_user.id, source)
+        return batch_user
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,14 +78,17 @@ async def get_current_user(
     if payload is None:
         raise credentials_exception
 
+    # Scoped tokens (the event stream's) are not valid for the rest of the API
     user_id: str = payload.get("sub")
-    if user_id is None:
+    if user_id is None or payload.get("scope") is not None:
         raise credentials_exception
 
     user = db.query(User).filter(User.id == int(user_id)).first()
     if user is None:
         raise credentials_exception
 
+    set_audit_context(user.id, source)
+
     return user
 
 
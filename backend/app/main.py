@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+import logging
+
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.database import create_tables, SessionLocal, Base, engine
+from app.core.metrics import MetricsMiddleware, install_pool_hooks, install_query_hooks, render_metrics
+from app.core.query_budget import QueryBudgetMiddleware
 from app.api import api_router
+from app.api.events import RedactAccessTokenFilter
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -21,9 +26,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, query and payload metrics, served at /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    install_query_hooks(engine)
+    install_pool_hooks(engine)
+
+# Query budget and N+1 reports; inactive unless QUERY_BUDGET_MODE is set
+app.add_middleware(QueryBudgetMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
+# Event stream tokens travel in the query string; keep them out of access logs
+logging.getLogger("uvicorn.access").addFilter(RedactAccessTokenFilter())
+
 
 def seed_database_if_empty():
     """Seed database with initial data if empty"""
@@ -445,20 +462,40 @@ def seed_database_if_empty():
         db.close()
 
 
+def seed_lesson_catalog_if_empty():
+    """The Learning Hub catalog is reference data, seeded independently of demo data"""
+    from app.services.lesson_service import seed_lesson_catalog
+
+    db = SessionLocal()
+    try:
+        seed_lesson_catalog(db)
+    finally:
+        db.close()
+
+
 def reseed_database():
     """Force reseed the database - clears existing data"""
-    from app.models import User, Program, Enrollment, Opportunity, Announcement, Timesheet, Document, LearningProgress, ContractorOnboarding
+    from app.models import User, Program, Enrollment, Opportunity, Announcement, Timesheet, Document, LearningProgress, ContractorOnboarding, MonthlyEarnings, OpportunityRecommendation, LessonCompletion, LearningActivity, LearningDailyRollup, OutboxMessage, Notification, NotificationCounter, WaitlistEntry
     from app.models.timesheet import TimesheetEntry
 
     db = SessionLocal()
     try:
         print("Clearing existing data...")
         # Delete in order respecting foreign key constraints
+        db.query(MonthlyEarnings).delete()
+        db.query(OutboxMessage).delete()
+        db.query(Notification).delete()
+        db.query(NotificationCounter).delete()
+        db.query(OpportunityRecommendation).delete()
         db.query(TimesheetEntry).delete()
         db.query(LearningProgress).delete()
+        db.query(LessonCompletion).delete()
+        db.query(LearningActivity).delete()
+        db.query(LearningDailyRollup).delete()
         db.query(Document).delete()
         db.query(Timesheet).delete()
         db.query(ContractorOnboarding).delete()
+        db.query(WaitlistEntry).delete()
         db.query(Enrollment).delete()
         db.query(Program).delete()
         db.query(Opportunity).delete()
@@ -479,6 +516,7 @@ def reseed_database():
 
 @app.on_event("startup")
 async def startup_event():
+    import asyncio
     import os
     # One-time schema migration: drop old tables and recreate with new schema
     if os.getenv("RESET_DB", "false").lower() == "true":
@@ -486,8 +524,40 @@ async def startup_event():
         Base.metadata.drop_all(bind=engine)
     # Create database tables
     create_tables()
+    # Audit log partitions and append-only triggers, then start capturing changes
+    from app.services.audit_service import ensure_audit_log, install_audit_hooks
+    ensure_audit_log(engine)
+    install_audit_hooks()
+    # Full-text search indexes live outside the ORM metadata
+    from app.services.search_service import ensure_search_indexes
+    ensure_search_indexes(engine)
     # Seed if empty
     seed_database_if_empty()
+    seed_lesson_catalog_if_empty()
+    # Keep opportunity recommendations fresh
+    if settings.RECOMMENDATIONS_REFRESH_MINUTES > 0:
+        from app.services.recommendation_service import run_scheduled_refresh
+        app.state.recommendation_refresh = asyncio.create_task(run_scheduled_refresh())
+    # Relay events published by other workers to this worker's streams
+    from app.services.event_service import start_listener
+    app.state.event_listener = start_listener()
+    # Deliver notifications from the outbox
+    if settings.NOTIFICATIONS_DISPATCH_IN_APP:
+        from app.services.notification_service import run_dispatcher
+        app.state.notification_dispatcher = asyncio.create_task(run_dispatcher())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.services.event_service import broker
+    from app.services.audit_service import audit_writer
+    from app.services.user_import import shutdown_hash_pool
+    # Open event streams would otherwise hold shutdown until clients leave
+    broker.close()
+    audit_writer.close()
+    shutdown_hash_pool()
+    if getattr(app.state, "event_listener", None):
+        app.state.event_listener.set()
 
 
 @app.get("/")
@@ -502,3 +572,14 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Prometheus metrics; requires METRICS_TOKEN as a Bearer token when it is set"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
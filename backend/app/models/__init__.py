@@ -1,7 +1,12 @@
 from app.models.user import User, UserRole, EmploymentType
-from app.models.program import Program, Enrollment, ProgramStatus, EnrollmentStatus
+from app.models.program import Program, Enrollment, ProgramStatus, EnrollmentStatus, WaitlistEntry
 from app.models.timesheet import Timesheet, TimesheetEntry, TimesheetStatus
 from app.models.document import Document, DocumentStatus, DocumentType, REQUIRED_DOCUMENTS
-from app.models.opportunity import Opportunity, OpportunityType
-from app.models.learning import LearningProgress, Announcement
+from app.models.opportunity import Opportunity, OpportunityType, OpportunityRecommendation
+from app.models.learning import (
+    LearningProgress, Announcement, Lesson, LessonCompletion, LearningDailyRollup, LearningActivity
+)
 from app.models.contractor import ContractorOnboarding
+from app.models.earnings import MonthlyEarnings
+from app.models.notification import OutboxMessage, Notification, NotificationCounter
+from app.models.audit import AuditLog
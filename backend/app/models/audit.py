@@ -0,0 +1,34 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Index, Identity, PrimaryKeyConstraint
+from sqlalchemy.ext.compiler import compiles
+
+from app.core.database import Base
+
+
+class AuditLog(Base):
+    """
+    Append-only record of changes to audited tables. On PostgreSQL the table
+    is range-partitioned by month on occurred_at; see audit_service.
+    """
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        Index("ix_audit_log_entity", "entity_type", "entity_id", "occurred_at"),
+        Index("ix_audit_log_actor", "actor_id", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), Identity(), primary_key=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    actor_id = Column(Integer, nullable=True)  # No foreign key: entries outlive users
+    source = Column(String, nullable=True)  # "METHOD /path" of the request, if any
+    action = Column(String, nullable=False)  # create, update, delete
+    entity_type = Column(String, nullable=False)  # Table name
+    entity_id = Column(Integer, nullable=True)  # None for statements that touched many rows
+    changes = Column(Text, nullable=True)  # JSON: {field: [old, new]} or the statement and its parameters
+
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _audit_log_primary_key(constraint, compiler, **kw):
+    # A partitioned table's primary key has to include the partition key
+    if constraint.table is not None and constraint.table.name == AuditLog.__tablename__:
+        return "PRIMARY KEY (id, occurred_at)"
+    return compiler.visit_primary_key_constraint(constraint, **kw)
@@ -84,14 +84,14 @@ class Document(Base):
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     document_type = Column(String, nullable=False)
     file_name = Column(String, nullable=False)
     file_url = Column(String, nullable=False)  # S3 or storage URL
     file_size = Column(Integer, nullable=True)  # in bytes
     mime_type = Column(String, nullable=True)
-    status = Column(String, default=DocumentStatus.pending.value)
-    uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    status = Column(String, default=DocumentStatus.pending.value, index=True)
+    uploaded_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     rejection_reason = Column(Text, nullable=True)
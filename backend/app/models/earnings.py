@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Float, Numeric, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class MonthlyEarnings(Base):
+    """Approved hours and earnings per user per calendar month, kept up to date on review"""
+    __tablename__ = "monthly_earnings"
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", name="uq_monthly_earnings_user_month"),
+        # Serves "who is nearing their SGA limit this month"
+        Index("ix_monthly_earnings_month_earnings", "month", "earnings"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    month = Column(Date, nullable=False)  # First day of the month
+    hours = Column(Float, default=0, nullable=False)
+    earnings = Column(Numeric(10, 2), default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    user = relationship("User")
@@ -1,16 +1,46 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import (
+    Column, Integer, String, Text, Date, DateTime, ForeignKey, Boolean, LargeBinary, UniqueConstraint, Index
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
 
 
+class Lesson(Base):
+    """A Learning Hub lesson; content is rendered by the frontend"""
+    __tablename__ = "lessons"
+
+    id = Column(Integer, primary_key=True, index=True)  # Also the lesson's bit in completion bitmaps
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    category = Column(String, nullable=False)
+    duration_minutes = Column(Integer, nullable=True)
+    sort_order = Column(Integer, default=0, nullable=False)
+    assigned_roles = Column(Text, nullable=True)  # JSON array of roles; empty means every role
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class LessonCompletion(Base):
+    """Completed lessons per user as a bitmap: bit n is set when lesson n is complete"""
+    __tablename__ = "lesson_completions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    completed_bits = Column(LargeBinary, nullable=False, default=b"")  # Little-endian
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class LearningProgress(Base):
     __tablename__ = "learning_progress"
+    __table_args__ = (
+        UniqueConstraint("student_id", "lesson_id", name="uq_learning_progress_student_lesson"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    lesson_id = Column(Integer, nullable=False)  # Maps to frontend lesson IDs
+    lesson_id = Column(Integer, nullable=False)  # Maps to lessons.id
     completed = Column(Boolean, default=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -19,6 +49,34 @@ class LearningProgress(Base):
     student = relationship("User", back_populates="learning_progress")
 
 
+class LearningDailyRollup(Base):
+    """Learning activity per lesson, role, program and day, kept current by progress writes"""
+    __tablename__ = "learning_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "lesson_id", "role", "program_id", name="uq_learning_rollup_key"),
+        Index("ix_learning_rollup_lesson_day", "lesson_id", "day"),
+        Index("ix_learning_rollup_role_day", "role", "day"),
+        Index("ix_learning_rollup_program_day", "program_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)  # UTC
+    lesson_id = Column(Integer, nullable=False)
+    role = Column(String, nullable=False)
+    program_id = Column(Integer, nullable=False, default=0)  # Learner's current program; 0 for none
+    completions = Column(Integer, nullable=False, default=0)  # Completed minus marked incomplete
+    active_learners = Column(Integer, nullable=False, default=0)  # Distinct learners with progress that day
+
+
+class LearningActivity(Base):
+    """One row per learner, lesson and day with progress; keeps active learner counts distinct"""
+    __tablename__ = "learning_daily_activity"
+
+    day = Column(Date, primary_key=True)
+    student_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    lesson_id = Column(Integer, primary_key=True)
+
+
 class Announcement(Base):
     __tablename__ = "announcements"
 
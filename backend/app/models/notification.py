@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class OutboxMessage(Base):
+    """
+    A side effect recorded in the same transaction as the change that caused
+    it, delivered later by the notification dispatcher
+    """
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        Index("ix_outbox_pending", "dispatched_at", "available_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic = Column(String, nullable=False)  # timesheet_reviewed, document_reviewed, email
+    payload = Column(Text, nullable=False)  # JSON
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)  # Also set when retries run out
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Notification(Base):
+    """An in-app notification shown in a user's feed"""
+    __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String, nullable=False)  # Outbox topic that produced it
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    link = Column(String, nullable=True)  # Frontend route to open
+    is_read = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    read_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class NotificationCounter(Base):
+    """Unread notifications per user, kept in step with the notifications table"""
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread = Column(Integer, default=0, nullable=False)
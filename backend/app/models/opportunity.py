@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Boolean
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, Date, Boolean, Float, ForeignKey, UniqueConstraint, Index
+)
 from sqlalchemy.sql import func
 import enum
 
@@ -30,3 +32,19 @@ class Opportunity(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class OpportunityRecommendation(Base):
+    """Precomputed score of an opportunity for a user, written by the recommendation service"""
+    __tablename__ = "opportunity_recommendations"
+    __table_args__ = (
+        UniqueConstraint("user_id", "opportunity_id", name="uq_recommendation_user_opportunity"),
+        # Serves "this user's best recommendations" as one index range scan
+        Index("ix_recommendation_user_score", "user_id", "score"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    opportunity_id = Column(Integer, ForeignKey("opportunities.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, Float, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -38,12 +38,23 @@ class Program(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Waitlist bounds: entries hold the contiguous sequences [head, tail)
+    waitlist_head = Column(Integer, default=0, server_default="0", nullable=False)  # Next to be promoted
+    waitlist_tail = Column(Integer, default=0, server_default="0", nullable=False)  # Given to the next joiner
+
     # Relationships
     enrollments = relationship("Enrollment", back_populates="program")
 
+    @property
+    def waitlist_length(self) -> int:
+        return self.waitlist_tail - self.waitlist_head
+
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        UniqueConstraint("student_id", "program_id", name="uq_enrollment_student_program"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -60,3 +71,22 @@ class Enrollment(Base):
     # Relationships
     student = relationship("User", back_populates="enrollments")
     program = relationship("Program", back_populates="enrollments")
+
+
+class WaitlistEntry(Base):
+    """A place in a full program's queue; position is sequence - program.waitlist_head + 1"""
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        UniqueConstraint("program_id", "student_id", name="uq_waitlist_program_student"),
+        Index("ix_waitlist_program_sequence", "program_id", "sequence"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    program_id = Column(Integer, ForeignKey("programs.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    sequence = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    program = relationship("Program")
+    student = relationship("User")
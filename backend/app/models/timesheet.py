@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, Float, Time
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, Float, Numeric, Time, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -15,18 +15,24 @@ class TimesheetStatus(str, enum.Enum):
 
 class Timesheet(Base):
     __tablename__ = "timesheets"
+    __table_args__ = (
+        # One timesheet per person per week, enforced by the database
+        UniqueConstraint("student_id", "week_start", name="uq_timesheet_student_week"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    week_start = Column(Date, nullable=False)
+    week_start = Column(Date, nullable=False, index=True)
     week_end = Column(Date, nullable=False)
     total_hours = Column(Float, default=0)
     notes = Column(Text, nullable=True)
-    status = Column(String, default=TimesheetStatus.draft.value)
+    status = Column(String, default=TimesheetStatus.draft.value, index=True)
     submitted_at = Column(DateTime(timezone=True), nullable=True)
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     rejection_reason = Column(Text, nullable=True)
+    # Rate the hours were rolled into monthly_earnings at, set while approved
+    approved_hourly_rate = Column(Numeric(10, 2), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -43,8 +49,8 @@ class TimesheetEntry(Base):
     __tablename__ = "timesheet_entries"
 
     id = Column(Integer, primary_key=True, index=True)
-    timesheet_id = Column(Integer, ForeignKey("timesheets.id"), nullable=False)
-    date = Column(Date, nullable=False)
+    timesheet_id = Column(Integer, ForeignKey("timesheets.id"), nullable=False, index=True)
+    date = Column(Date, nullable=False, index=True)
     start_time = Column(Time, nullable=True)
     end_time = Column(Time, nullable=True)
     lunch_out = Column(Time, nullable=True)  # Lunch start time
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional, List, Any
+from datetime import datetime
+
+
+class AuditLogResponse(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor_id: Optional[int] = None
+    source: Optional[str] = None
+    action: str
+    entity_type: str
+    entity_id: Optional[int] = None
+    changes: Optional[Any] = None
+
+    class Config:
+        from_attributes = True
+
+
+class AuditLogPage(BaseModel):
+    items: List[AuditLogResponse]
+    next_cursor: Optional[int] = None  # Pass back as cursor for the next page
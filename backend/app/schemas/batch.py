@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional, List, Any, Dict
+
+
+class BatchRequestItem(BaseModel):
+    method: str = "GET"
+    path: str  # Relative to the API prefix, e.g. "/dashboard/student"
+    params: Optional[Dict[str, Any]] = None
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+
+class BatchResponseItem(BaseModel):
+    path: str
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -19,6 +19,26 @@ class DocumentReview(BaseModel):
     rejection_reason: Optional[str] = None
 
 
+class DocumentBulkReview(BaseModel):
+    # Either explicit ids, or every pending document for one student
+    document_ids: Optional[List[int]] = None
+    student_id: Optional[int] = None
+    approved: bool
+    rejection_reason: Optional[str] = None
+
+
+class DocumentBulkReviewResult(BaseModel):
+    document_id: int
+    outcome: str  # done, skipped (not pending review), not_found
+
+
+class DocumentBulkReviewResponse(BaseModel):
+    results: List[DocumentBulkReviewResult]
+    reviewed: int
+    skipped: int
+    not_found: int
+
+
 class DocumentResponse(DocumentBase):
     id: int
     student_id: int
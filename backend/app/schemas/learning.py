@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -25,6 +25,74 @@ class LearningProgressResponse(LearningProgressBase):
         from_attributes = True
 
 
+class LearningProgressSyncItem(LearningProgressBase):
+    completed_at: Optional[datetime] = None  # When completed offline; defaults to now
+
+
+class LearningProgressSync(BaseModel):
+    lessons: List[LearningProgressSyncItem]
+
+
+class LessonBase(BaseModel):
+    title: str
+    description: Optional[str] = None
+    category: str
+    duration_minutes: Optional[int] = None
+    sort_order: int = 0
+    assigned_roles: List[str] = []  # Empty means every role
+
+
+class LessonCreate(LessonBase):
+    pass
+
+
+class LessonUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    sort_order: Optional[int] = None
+    assigned_roles: Optional[List[str]] = None
+    is_active: Optional[bool] = None
+
+
+class LessonResponse(LessonBase):
+    id: int
+    is_active: bool
+
+
+class LessonCatalogResponse(BaseModel):
+    version: str
+    lessons: List[LessonResponse]
+
+
+class LearningSummaryResponse(BaseModel):
+    total_lessons: int
+    completed_lessons: int
+    percent_complete: float
+    completed_lesson_ids: List[int]
+    next_lesson: Optional[LessonResponse] = None
+
+
+class LessonFunnelStep(BaseModel):
+    lesson_id: int
+    title: str
+    category: str
+    active_learners: int  # Learner-days: once per learner, lesson and day
+    completions: int
+    completion_rate: float  # Net completions per 100 learner-days
+    percent_of_first: float
+    conversion_from_previous: float
+
+
+class CompletionRateRow(BaseModel):
+    key: str
+    label: str
+    active_learners: int  # Learner-days: once per learner, lesson and day
+    completions: int
+    completion_rate: float  # Net completions per 100 learner-days
+
+
 class AnnouncementBase(BaseModel):
     title: str
     message: str
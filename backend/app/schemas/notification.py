@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class NotificationResponse(BaseModel):
+    id: int
+    kind: str
+    title: str
+    message: str
+    link: Optional[str] = None
+    is_read: bool
+    created_at: datetime
+    read_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationFeedResponse(BaseModel):
+    items: List[NotificationResponse]
+    next_cursor: Optional[int] = None  # Pass back as cursor for the next page
+    unread_count: int
+
+
+class NotificationReadResponse(BaseModel):
+    marked: int
+    unread_count: int
@@ -43,3 +43,7 @@ class OpportunityResponse(OpportunityBase):
 
     class Config:
         from_attributes = True
+
+
+class RecommendedOpportunityResponse(OpportunityResponse):
+    score: Optional[float] = None  # None when falling back to the default ordering
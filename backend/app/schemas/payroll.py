@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from datetime import date
+
+
+class PayrollWeek(BaseModel):
+    week_start: date
+    hours: float
+    overtime_hours: float
+
+
+class PayrollLine(BaseModel):
+    user_id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    employment_type: Optional[str] = None
+    hourly_rate: Optional[float] = None
+    total_hours: float
+    regular_hours: float
+    overtime_hours: float
+    gross_pay: Optional[float] = None  # None when the person has no hourly rate
+    weeks: List[PayrollWeek] = []
+    days: Optional[Dict[date, float]] = None
+
+
+class PayrollResponse(BaseModel):
+    period_start: date
+    period_end: date
+    people: int
+    total_hours: float
+    total_overtime_hours: float
+    total_gross_pay: float
+    lines: List[PayrollLine]
@@ -36,6 +36,7 @@ class ProgramResponse(ProgramBase):
     id: int
     status: str
     created_at: datetime
+    waitlist_length: int = 0
 
     class Config:
         from_attributes = True
@@ -63,3 +64,14 @@ class EnrollmentResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class WaitlistEntryResponse(BaseModel):
+    program_id: int
+    program_name: str
+    student_id: int
+    student_name: Optional[str] = None
+    student_email: Optional[str] = None
+    position: int  # 1 is next in line
+    waitlist_length: int
+    joined_at: datetime
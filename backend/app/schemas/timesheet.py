@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, List
 from datetime import date, time, datetime
 
@@ -39,6 +39,30 @@ class TimesheetUpdate(BaseModel):
     entries: Optional[List[TimesheetEntryCreate]] = None
 
 
+class TimesheetEntryPatch(BaseModel):
+    """Change to a single day; fields left out keep their current value"""
+    date: date
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    lunch_out: Optional[time] = None
+    lunch_in: Optional[time] = None
+    break_minutes: Optional[int] = None
+    hours: Optional[float] = None
+    remove: bool = False  # Delete this day's entry
+
+    @field_validator("break_minutes", "hours")
+    @classmethod
+    def not_null(cls, value):
+        # Leave these out to keep the current value; the times may be cleared with null
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class TimesheetEntriesPatch(BaseModel):
+    entries: List[TimesheetEntryPatch]
+
+
 class TimesheetSubmit(BaseModel):
     signature: Optional[str] = None  # Base64-encoded signature image
 
@@ -48,6 +72,25 @@ class TimesheetReview(BaseModel):
     rejection_reason: Optional[str] = None
 
 
+class TimesheetBulkReview(BaseModel):
+    timesheet_ids: List[int]
+    approved: bool
+    rejection_reason: Optional[str] = None
+
+
+class TimesheetBulkReviewResult(BaseModel):
+    timesheet_id: int
+    outcome: str  # done, skipped (not pending review), not_found
+
+
+class TimesheetBulkReviewResponse(BaseModel):
+    results: List[TimesheetBulkReviewResult]
+    reviewed: int
+    skipped: int
+    not_found: int
+    total_hours: float  # Hours covered by the timesheets reviewed in this call
+
+
 class TimesheetResponse(TimesheetBase):
     id: int
     student_id: int
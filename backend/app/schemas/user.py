@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, date
 
 
@@ -37,6 +37,38 @@ class UserUpdate(BaseModel):
     vr_counselor_phone: Optional[str] = None
 
 
+class UserImportRow(UserBase):
+    """One spreadsheet row of a bulk user import"""
+    role: str = "wble_participant"
+    employment_type: Optional[str] = None
+    department: Optional[str] = None
+    hourly_rate: Optional[float] = None
+    sga_monthly_limit: Optional[float] = None
+    password: Optional[str] = None  # A temporary password is generated when blank
+    program_id: Optional[int] = None  # Enroll the new user in this program
+
+    class Config:
+        coerce_numbers_to_str = True  # Spreadsheet cells like case_id may arrive as numbers
+
+
+class UserImportRowResult(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: str  # created, valid (dry run), error
+    user_id: Optional[int] = None
+    temporary_password: Optional[str] = None
+    # For rows with a program_id: active, waitlisted (program full), or full (full and not open)
+    enrollment: Optional[str] = None
+    errors: List[str] = []
+
+
+class UserImportResponse(BaseModel):
+    total_rows: int
+    created: int
+    failed: int
+    rows: List[UserImportRowResult]
+
+
 class UserResponse(UserBase):
     id: int
     role: str
@@ -59,6 +91,21 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserSearchResult(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+    phone: Optional[str] = None
+    case_id: Optional[str] = None
+    role: str
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -0,0 +1,341 @@
+"""
+Audit Service
+Who changed what: captures changes to audited models and appends them to
+audit_log in batches, off the request path.
+
+Session hooks collect entries while a transaction runs. before_flush diffs
+updated and deleted objects, after_flush picks up new objects once they have
+ids, and do_orm_execute records the UPDATE/INSERT/DELETE statements that
+bypass the unit of work, one entry per row when they use RETURNING. Entries
+reach the writer only after_commit, so rolled-back work is never logged.
+
+The writer drains a bounded queue on its own thread, one INSERT per batch.
+When the queue is full the committing thread waits briefly and then writes
+its entries itself, so entries are delayed rather than dropped.
+
+On PostgreSQL audit_log is partitioned by month, so a time-range query only
+reads the months it covers and old months can be detached for archiving.
+Triggers reject UPDATE and DELETE on both databases.
+"""
+import enum
+import json
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import event, insert, inspect, text
+from sqlalchemy.exc import ResourceClosedError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.user import User
+from app.models.timesheet import Timesheet
+from app.models.document import Document
+from app.models.program import Program, Enrollment
+from app.models.audit import AuditLog
+
+AUDITED_MODELS = {User, Timesheet, Document, Enrollment, Program}
+
+# Recorded as changed without their values
+REDACTED_FIELDS = {"hashed_password", "signature"}
+REDACTED = "[redacted]"
+
+# (actor id, "METHOD /path") of the request being handled
+_audit_context: ContextVar = ContextVar("audit_context", default=(None, None))
+
+
+def set_audit_context(actor_id: Optional[int], source: Optional[str]) -> None:
+    """Attribute changes made in the current request to this actor"""
+    _audit_context.set((actor_id, source))
+
+
+def _value(key: str, value):
+    if key in REDACTED_FIELDS and value is not None:
+        return REDACTED
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _entry(action: str, entity_type: str, entity_id: Optional[int], changes: dict) -> dict:
+    actor_id, source = _audit_context.get()
+    return {
+        "occurred_at": datetime.utcnow(),
+        "actor_id": actor_id,
+        "source": source,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "changes": json.dumps(changes),
+    }
+
+
+def _snapshot(obj) -> dict:
+    """Loaded column values of an object"""
+    state = inspect(obj)
+    return {
+        attr.key: _value(attr.key, state.dict[attr.key])
+        for attr in state.mapper.column_attrs if attr.key in state.dict
+    }
+
+
+def _diff(obj) -> dict:
+    """{field: [old, new]} for changed columns"""
+    state = inspect(obj)
+    changes = {}
+    for attr in state.mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        if history.has_changes():
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            changes[attr.key] = [_value(attr.key, old), _value(attr.key, new)]
+    return changes
+
+
+def _pending(session: Session) -> list:
+    return session.info.setdefault("audit_entries", [])
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    for obj in session.dirty:
+        if type(obj) in AUDITED_MODELS and session.is_modified(obj, include_collections=False):
+            changes = _diff(obj)
+            if changes:
+                _pending(session).append(_entry("update", obj.__tablename__, obj.id, changes))
+    for obj in session.deleted:
+        if type(obj) in AUDITED_MODELS:
+            _pending(session).append(_entry("delete", obj.__tablename__, obj.id, _snapshot(obj)))
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    for obj in session.new:
+        if type(obj) in AUDITED_MODELS:
+            _pending(session).append(_entry("create", obj.__tablename__, obj.id, _snapshot(obj)))
+
+
+STATEMENT_ACTIONS = (("is_insert", "create"), ("is_update", "update"), ("is_delete", "delete"))
+
+
+def _returned(result, mapper) -> Optional[list]:
+    """(id, snapshot or None) per row of a RETURNING result, or None without ids"""
+    returned = []
+    for row in result:
+        if isinstance(row[0], mapper.class_):
+            returned.append((row[0].id, _snapshot(row[0])))
+        elif "id" in row._mapping:
+            returned.append((row._mapping["id"], None))
+        else:
+            return None
+    return returned
+
+
+def _do_orm_execute(state):
+    """Statement-level entries for bulk and conditional writes"""
+    action = next((action for flag, action in STATEMENT_ACTIONS if getattr(state, flag)), None)
+    mapper = state.bind_mapper
+    if action is None or mapper is None or mapper.class_ not in AUDITED_MODELS:
+        return None
+
+    table = mapper.class_.__tablename__
+    result = state.invoke_statement()
+
+    # With RETURNING the rows written are known: one entry per returned id.
+    # The result is frozen so the caller still gets every row.
+    returned = None
+    try:
+        result.keys()
+    except ResourceClosedError:
+        pass  # no RETURNING
+    else:
+        frozen = result.freeze()
+        result = frozen()
+        returned = _returned(frozen(), mapper)
+
+    if isinstance(state.parameters, list):
+        # executemany: one entry per row
+        ids = [entity_id for entity_id, _ in returned] if returned is not None else []
+        if len(ids) != len(state.parameters):
+            ids = [parameters.get("id") for parameters in state.parameters]
+        for entity_id, parameters in zip(ids, state.parameters):
+            _pending(state.session).append(_entry(
+                action, table, entity_id,
+                {key: _value(key, value) for key, value in parameters.items()}
+            ))
+        return result
+
+    compiled = state.statement.compile(dialect=state.session.get_bind().dialect)
+    parameters = {**compiled.params, **(state.parameters or {})}
+    changes = {
+        "statement": str(compiled),
+        "parameters": {key: _value(key, value) for key, value in parameters.items()},
+    }
+    if returned is None:
+        _pending(state.session).append(_entry(action, table, None, changes))
+    for entity_id, snapshot in returned or ():
+        _pending(state.session).append(_entry(action, table, entity_id, snapshot or changes))
+    return result
+
+
+def _after_commit(session: Session) -> None:
+    entries = session.info.pop("audit_entries", None)
+    if entries:
+        audit_writer.submit(entries)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("audit_entries", None)
+
+
+_hooks_installed = False
+
+
+def install_audit_hooks() -> None:
+    """Start auditing every Session; safe to call more than once"""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _hooks_installed = True
+
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Batches entries from a bounded queue into audit_log on a background thread"""
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=settings.AUDIT_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._months = set()
+
+    def submit(self, entries: List[dict]) -> None:
+        self._start()
+        for index, entry in enumerate(entries):
+            try:
+                self._queue.put(entry, timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS)
+            except queue.Full:
+                # Writer cannot keep up; write the rest inline in one batch rather than lose them
+                self._write(entries[index:])
+                return
+
+    def flush(self) -> None:
+        """Block until everything submitted so far is written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write what is queued and stop the thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+            batch = [first]
+            deadline = time.monotonic() + settings.AUDIT_FLUSH_SECONDS
+            while len(batch) < settings.AUDIT_BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch: List[dict]) -> None:
+        for attempt in range(3):
+            try:
+                with engine.begin() as conn:
+                    if conn.dialect.name == "postgresql":
+                        for month in {_month(entry["occurred_at"]) for entry in batch} - self._months:
+                            _create_partition(conn, month)
+                            self._months.add(month)
+                    conn.execute(insert(AuditLog), batch)
+                return
+            except Exception as e:
+                print(f"Error writing audit log (attempt {attempt + 1}): {e}")
+                time.sleep(0.5 * (attempt + 1))
+        print(f"Audit log lost {len(batch)} entries")
+
+
+audit_writer = AuditWriter()
+
+
+def _month(moment: datetime) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _create_partition(conn, month: date) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS audit_log_y{month.year}m{month.month:02d} "
+        f"PARTITION OF audit_log FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+    ))
+
+
+def ensure_audit_log(bind) -> None:
+    """Monthly partitions and the append-only triggers; run after create_tables()"""
+    with bind.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            month = _month(datetime.utcnow())
+            for _ in range(settings.AUDIT_PARTITIONS_AHEAD + 1):
+                _create_partition(conn, month)
+                audit_writer._months.add(month)
+                month = _next_month(month)
+            conn.execute(text("CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT"))
+            conn.execute(text(
+                "CREATE OR REPLACE FUNCTION audit_log_append_only() RETURNS trigger AS $$ "
+                "BEGIN RAISE EXCEPTION 'audit_log is append-only'; END $$ LANGUAGE plpgsql"
+            ))
+            conn.execute(text("DROP TRIGGER IF EXISTS audit_log_append_only ON audit_log"))
+            conn.execute(text(
+                "CREATE TRIGGER audit_log_append_only BEFORE UPDATE OR DELETE ON audit_log "
+                "FOR EACH ROW EXECUTE FUNCTION audit_log_append_only()"
+            ))
+        elif conn.dialect.name == "sqlite":
+            for operation in ("UPDATE", "DELETE"):
+                conn.execute(text(
+                    f"CREATE TRIGGER IF NOT EXISTS audit_log_no_{operation.lower()} "
+                    f"BEFORE {operation} ON audit_log "
+                    f"BEGIN SELECT RAISE(ABORT, 'audit_log is append-only'); END"
+                ))
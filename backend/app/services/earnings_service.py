@@ -0,0 +1,98 @@
+"""
+Earnings Service
+Maintains the per-user, per-month MonthlyEarnings rollup used for SGA tracking
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import select, func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import upsert
+from app.models.user import User
+from app.models.timesheet import Timesheet, TimesheetEntry
+from app.models.earnings import MonthlyEarnings
+
+
+def apply_timesheet_earnings(db: Session, timesheet_ids: Iterable[int], sign: int = 1) -> None:
+    """
+    Add (sign=1, on approval) or remove (sign=-1, when an approved timesheet
+    is reopened) the given timesheets' hours in the monthly rollup.
+
+    Hours are attributed to the month of each entry's date, so weeks that
+    straddle a month boundary are split correctly. Earnings use the user's
+    hourly rate, or SGA_ASSUMED_HOURLY_WAGE when none is set. Adding records
+    that rate on the timesheet and removing uses it, then clears it, so a
+    rate change in between cannot make the rollup drift. Changes are left for
+    the caller to commit.
+    """
+    timesheet_ids = list(timesheet_ids)
+    if not timesheet_ids:
+        return
+
+    if sign > 0:
+        db.execute(
+            update(Timesheet)
+            .where(Timesheet.id.in_(timesheet_ids), Timesheet.approved_hourly_rate.is_(None))
+            .values(approved_hourly_rate=func.coalesce(
+                select(User.hourly_rate).where(User.id == Timesheet.student_id).scalar_subquery(),
+                settings.SGA_ASSUMED_HOURLY_WAGE
+            ))
+            .returning(Timesheet.id)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Timesheets approved before rates were recorded fall back to the current rate
+    rows = db.execute(
+        select(
+            Timesheet.student_id, TimesheetEntry.date, TimesheetEntry.hours,
+            func.coalesce(Timesheet.approved_hourly_rate, User.hourly_rate)
+        )
+        .join(Timesheet, Timesheet.id == TimesheetEntry.timesheet_id)
+        .join(User, User.id == Timesheet.student_id)
+        .where(TimesheetEntry.timesheet_id.in_(timesheet_ids))
+    ).all()
+
+    if sign < 0:
+        db.execute(
+            update(Timesheet)
+            .where(Timesheet.id.in_(timesheet_ids))
+            .values(approved_hourly_rate=None)
+            .returning(Timesheet.id)
+            .execution_options(synchronize_session=False)
+        )
+
+    totals = defaultdict(lambda: [0.0, Decimal("0")])
+    for user_id, entry_date, hours, hourly_rate in rows:
+        hours = hours or 0.0
+        rate = Decimal(str(hourly_rate if hourly_rate is not None else settings.SGA_ASSUMED_HOURLY_WAGE))
+        bucket = totals[(user_id, entry_date.replace(day=1))]
+        bucket[0] += sign * hours
+        bucket[1] += sign * rate * Decimal(str(hours))
+
+    if not totals:
+        return
+
+    values = [
+        {
+            "user_id": user_id,
+            "month": month,
+            "hours": hours,
+            "earnings": earnings.quantize(Decimal("0.01")),
+        }
+        for (user_id, month), (hours, earnings) in totals.items()
+    ]
+    statement = upsert(db, MonthlyEarnings)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[MonthlyEarnings.user_id, MonthlyEarnings.month],
+            set_={
+                "hours": MonthlyEarnings.hours + statement.excluded.hours,
+                "earnings": MonthlyEarnings.earnings + statement.excluded.earnings,
+                "updated_at": func.now(),
+            }
+        ),
+        values
+    )
@@ -0,0 +1,181 @@
+"""
+Event Service
+Typed change events pushed to connected clients over Server-Sent Events.
+
+Endpoints publish() after their changes commit. Each worker keeps its open
+streams in one EventBroker and fans events out to them in process. On
+PostgreSQL events travel through NOTIFY on EVENT_CHANNEL and every worker,
+the publisher included, receives them on a LISTEN connection, so a stream
+sees events from all workers. Other databases deliver to the publishing
+worker only, which covers single-process deployments and development.
+"""
+import asyncio
+import json
+import select
+import threading
+import time
+from enum import Enum
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+
+EVENT_CHANNEL = "careerfocus_events"
+
+# Every role; use as roles= to reach all signed-in users
+ALL_ROLES = "*"
+
+
+class EventType(str, Enum):
+    timesheet_submitted = "timesheet_submitted"
+    timesheet_reviewed = "timesheet_reviewed"
+    document_uploaded = "document_uploaded"
+    document_reviewed = "document_reviewed"
+    announcement_created = "announcement_created"
+    notification_created = "notification_created"
+    # Sent by the stream itself: on connect, and when a slow client missed events
+    ready = "ready"
+    resync = "resync"
+
+
+def event(event_type: EventType, data: dict, user_ids: Iterable[int] = (), roles: Iterable[str] = ()) -> dict:
+    """An event for the given users plus everyone holding one of the roles"""
+    return {
+        "type": event_type.value,
+        "data": data,
+        "user_ids": sorted(set(user_ids)),
+        "roles": sorted(set(roles)),
+    }
+
+
+class Subscriber:
+    """One open stream: who it belongs to and its pending events"""
+
+    def __init__(self, user_id: int, role: str, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.role = role
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+
+    def wants(self, event: dict) -> bool:
+        return (
+            self.user_id in event["user_ids"]
+            or self.role in event["roles"]
+            or ALL_ROLES in event["roles"]
+        )
+
+    def offer(self, event: Optional[dict]) -> None:
+        """Queue an event on the subscriber's loop; None closes the stream"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind to catch up event by event; tell it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(event if event is None else {"type": EventType.resync.value, "data": {}})
+
+
+class EventBroker:
+    """The streams open on this worker"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int, role: str) -> Subscriber:
+        subscriber = Subscriber(user_id, role, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def dispatch(self, event: dict) -> None:
+        """Hand an event to every matching stream; safe to call from any thread"""
+        with self._lock:
+            targets = [subscriber for subscriber in self._subscribers if subscriber.wants(event)]
+        for subscriber in targets:
+            subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+
+    def close(self) -> None:
+        """End every open stream, e.g. on shutdown"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.offer, None)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+broker = EventBroker()
+
+
+def _uses_notify() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def publish(*events: dict) -> None:
+    """
+    Send events to every worker's streams. Call after the change commits.
+    Delivery is best effort: a failure is logged and never fails the request.
+    """
+    if not events:
+        return
+    try:
+        if _uses_notify():
+            with engine.connect() as conn:
+                for item in events:
+                    conn.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": EVENT_CHANNEL, "payload": json.dumps(item)}
+                    )
+                conn.commit()
+        else:
+            for item in events:
+                broker.dispatch(item)
+    except Exception as e:
+        print(f"Error publishing events: {e}")
+
+
+def _listen(stop: threading.Event) -> None:
+    """Relay NOTIFY payloads to this worker's broker, reconnecting on failure"""
+    while not stop.is_set():
+        connection = None
+        try:
+            connection = engine.raw_connection()
+            driver = connection.driver_connection
+            driver.autocommit = True
+            with driver.cursor() as cursor:
+                cursor.execute(f"LISTEN {EVENT_CHANNEL}")
+            while not stop.is_set():
+                if select.select([driver], [], [], 1.0)[0]:
+                    driver.poll()
+                    while driver.notifies:
+                        notify = driver.notifies.pop(0)
+                        broker.dispatch(json.loads(notify.payload))
+        except Exception as e:
+            print(f"Event listener error, reconnecting: {e}")
+            time.sleep(settings.EVENTS_RECONNECT_SECONDS)
+        finally:
+            if connection is not None:
+                connection.invalidate()
+
+
+def start_listener() -> Optional[threading.Event]:
+    """Start the LISTEN thread where NOTIFY is used; returns its stop flag"""
+    if not _uses_notify():
+        return None
+    stop = threading.Event()
+    threading.Thread(target=_listen, args=(stop,), name="event-listener", daemon=True).start()
+    return stop
+
+
+def format_event(item: dict) -> str:
+    """An event as an SSE message"""
+    return f"event: {item['type']}\ndata: {json.dumps(item['data'])}\n\n"
@@ -0,0 +1,218 @@
+"""
+Learning Analytics Service
+Daily rollups of Learning Hub activity per lesson, role and program, and the
+funnel and completion-rate reports built from them.
+
+Progress writes update the rollups incrementally, so reports read a table
+whose size depends on lessons, cohorts and days rather than on the number
+of progress rows. A learner is counted under their role and their most
+recent active program at the time of the write.
+
+Active learners are learner-days: a learner counts once per lesson per day,
+so summing over a window counts a learner again on every day they return.
+Completion rates are therefore net completions per 100 learner-days, a
+per-day average, not the share of distinct learners who completed. Distinct
+learners over a window would need the per-learner rows the rollups avoid.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.database import upsert
+from app.models.user import User
+from app.models.program import Program, Enrollment, EnrollmentStatus
+from app.models.learning import LearningDailyRollup, LearningActivity
+from app.services.lesson_service import get_catalog, lessons_for_role
+
+# Reporting window when no start date is given
+DEFAULT_WINDOW_DAYS = 30
+
+GROUP_COLUMNS = {
+    "lesson": LearningDailyRollup.lesson_id,
+    "role": LearningDailyRollup.role,
+    "program": LearningDailyRollup.program_id,
+    "day": LearningDailyRollup.day,
+}
+
+
+def current_program_id(db: Session, student_id: int) -> int:
+    """The learner's most recent non-withdrawn program, or 0"""
+    return db.execute(
+        select(Enrollment.program_id).where(
+            Enrollment.student_id == student_id,
+            Enrollment.status != EnrollmentStatus.withdrawn.value
+        ).order_by(Enrollment.enrolled_at.desc(), Enrollment.id.desc()).limit(1)
+    ).scalar() or 0
+
+
+def record_learning_activity(
+    db: Session,
+    user: User,
+    lesson_ids: Iterable[int],
+    changes: Dict[int, bool],
+    day: Optional[date] = None
+) -> None:
+    """
+    Fold one progress write into today's rollups. lesson_ids are the lessons
+    the learner touched; changes are the completion transitions returned by
+    apply_completion_changes. Changes are left for the caller to commit.
+    """
+    day = day or datetime.utcnow().date()
+    lesson_ids = sorted(set(lesson_ids))
+    if not lesson_ids:
+        return
+
+    # Lessons this learner has not touched yet today
+    statement = upsert(db, LearningActivity).values([
+        {"day": day, "student_id": user.id, "lesson_id": lesson_id} for lesson_id in lesson_ids
+    ])
+    first_today = set(db.scalars(
+        statement.on_conflict_do_nothing().returning(LearningActivity.lesson_id)
+    ))
+
+    program_id = current_program_id(db, user.id)
+    deltas = []
+    for lesson_id in lesson_ids:
+        completions = {True: 1, False: -1}.get(changes.get(lesson_id), 0)
+        active = 1 if lesson_id in first_today else 0
+        if completions or active:
+            deltas.append({
+                "day": day,
+                "lesson_id": lesson_id,
+                "role": user.role,
+                "program_id": program_id,
+                "completions": completions,
+                "active_learners": active,
+            })
+    if not deltas:
+        return
+
+    statement = upsert(db, LearningDailyRollup).values(deltas)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[
+            LearningDailyRollup.day, LearningDailyRollup.lesson_id,
+            LearningDailyRollup.role, LearningDailyRollup.program_id
+        ],
+        set_={
+            "completions": LearningDailyRollup.completions + statement.excluded.completions,
+            "active_learners": LearningDailyRollup.active_learners + statement.excluded.active_learners,
+        }
+    ))
+
+
+def _filtered(statement, role: Optional[str], program_id: Optional[int],
+              start: Optional[date], end: Optional[date]):
+    if role:
+        statement = statement.where(LearningDailyRollup.role == role)
+    if program_id is not None:
+        statement = statement.where(LearningDailyRollup.program_id == program_id)
+    if start:
+        statement = statement.where(LearningDailyRollup.day >= start)
+    if end:
+        statement = statement.where(LearningDailyRollup.day <= end)
+    return statement
+
+
+def _rate(completions: int, learners: int) -> float:
+    """Per 100 of learners; with learner-days, a per-day average"""
+    return round(100.0 * completions / learners, 1) if learners else 0.0
+
+
+def lesson_funnel(
+    db: Session,
+    role: Optional[str] = None,
+    program_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None
+) -> List[dict]:
+    """
+    One step per lesson in catalog order: active learner-days and net
+    completions, with the share of the first step's completions reached
+    at each lesson and the conversion from the step before. Without dates
+    the funnel covers all time.
+    """
+    totals = {
+        lesson_id: (learners or 0, completions or 0)
+        for lesson_id, learners, completions in db.execute(_filtered(
+            select(
+                LearningDailyRollup.lesson_id,
+                func.sum(LearningDailyRollup.active_learners),
+                func.sum(LearningDailyRollup.completions)
+            ).group_by(LearningDailyRollup.lesson_id),
+            role, program_id, start, end
+        ))
+    }
+
+    _, catalog = get_catalog(db)
+    lessons = lessons_for_role(catalog, role) if role else [lesson for lesson in catalog if lesson["is_active"]]
+
+    steps = []
+    first = previous = None
+    for lesson in lessons:
+        learners, completions = totals.get(lesson["id"], (0, 0))
+        completions = max(completions, 0)
+        if first is None:
+            first = completions
+        steps.append({
+            "lesson_id": lesson["id"],
+            "title": lesson["title"],
+            "category": lesson["category"],
+            "active_learners": learners,
+            "completions": completions,
+            "completion_rate": _rate(completions, learners),
+            "percent_of_first": _rate(completions, first),
+            "conversion_from_previous": _rate(completions, previous) if previous is not None else 100.0,
+        })
+        previous = completions
+    return steps
+
+
+def completion_rates(
+    db: Session,
+    group_by: str = "lesson",
+    role: Optional[str] = None,
+    program_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None
+) -> List[dict]:
+    """
+    Active learner-days, net completions and completion rate grouped by
+    lesson, role, program or day. Defaults to the last DEFAULT_WINDOW_DAYS
+    days. Completions marked incomplete again can make a group's net
+    negative; it is reported as 0.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    column = GROUP_COLUMNS[group_by]
+
+    rows = db.execute(_filtered(
+        select(
+            column,
+            func.sum(LearningDailyRollup.active_learners),
+            func.sum(LearningDailyRollup.completions)
+        ).group_by(column).order_by(column),
+        role, program_id, start, end
+    )).all()
+
+    labels = {}
+    if group_by == "lesson":
+        labels = {lesson["id"]: lesson["title"] for lesson in get_catalog(db)[1]}
+    elif group_by == "program":
+        program_ids = [key for key, _, _ in rows if key]
+        if program_ids:
+            labels = dict(db.execute(select(Program.id, Program.name).where(Program.id.in_(program_ids))).all())
+        labels[0] = "No program"
+
+    results = []
+    for key, learners, completions in rows:
+        completions = max(completions or 0, 0)
+        results.append({
+            "key": str(key),
+            "label": labels.get(key, str(key)),
+            "active_learners": learners or 0,
+            "completions": completions,
+            "completion_rate": _rate(completions, learners or 0),
+        })
+    return results
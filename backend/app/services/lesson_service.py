@@ -0,0 +1,184 @@
+"""
+Lesson Service
+The Learning Hub catalog, role-based lesson assignment and per-user
+completion bitmaps.
+
+The catalog is small and changes rarely, so it is cached in process and
+versioned by a hash of its content. Completion is stored as one bitmap per
+user (bit n = lesson n), so counts, percentages and the next lesson come
+from integer operations instead of scanning progress rows.
+"""
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, func, text
+from sqlalchemy.orm import Session
+
+from app.core.database import upsert
+from app.models.user import UserRole
+from app.models.learning import Lesson, LessonCompletion
+
+# Roles that see every active lesson regardless of assignment
+FULL_ACCESS_ROLES = {UserRole.wble_participant.value}
+
+# The lessons that shipped in the frontend bundle, seeded into an empty catalog
+DEFAULT_LESSONS = [
+    {"id": 1, "title": "Understanding Your Paycheck", "category": "Getting Started", "duration_minutes": 3,
+     "description": "Your paycheck is the money you earn for your work. Let's break down what it means and why it matters."},
+    {"id": 2, "title": "How Getting Paid Works", "category": "Getting Started", "duration_minutes": 4,
+     "description": "Getting paid involves a few steps between working your hours and seeing money in your account. Here's how it works."},
+    {"id": 3, "title": "Reading a Pay Stub", "category": "Paychecks", "duration_minutes": 5,
+     "description": "A pay stub is a detailed breakdown of your paycheck. Learning to read it helps you verify you're being paid correctly."},
+    {"id": 4, "title": "Timesheets Made Simple", "category": "Timesheets", "duration_minutes": 4,
+     "description": "Timesheets track the hours you work. Submitting them correctly and on time ensures you get paid accurately."},
+    {"id": 5, "title": "Why Taxes Come Out", "category": "Paychecks", "duration_minutes": 4,
+     "description": "Seeing money taken from your paycheck for taxes can be surprising. Here's why it happens and where that money goes."},
+    {"id": 6, "title": "When You Get Paid", "category": "Paychecks", "duration_minutes": 3,
+     "description": "Knowing when to expect your pay helps you plan your budget and avoid surprises."},
+    {"id": 7, "title": "What to Do If Something Looks Wrong", "category": "Problem Solving", "duration_minutes": 4,
+     "description": "Mistakes happen. If something looks wrong with your pay, don't panic - there's a clear process to fix it."},
+    {"id": 8, "title": "Who to Contact for Help", "category": "Problem Solving", "duration_minutes": 3,
+     "description": "Knowing who to ask for help makes solving problems faster and less stressful."},
+]
+
+# The last catalog loaded: {"marker": ..., "version": ..., "lessons": [...]}
+_catalog_cache: dict = {}
+
+
+def seed_lesson_catalog(db: Session) -> None:
+    """Fill an empty catalog with the default lessons"""
+    if not db.query(Lesson.id).first():
+        for order, lesson in enumerate(DEFAULT_LESSONS):
+            db.add(Lesson(**lesson, sort_order=order, is_active=True))
+        db.commit()
+    _sync_lesson_id_sequence(db)
+
+
+def _sync_lesson_id_sequence(db: Session) -> None:
+    """
+    Default lessons keep their fixed ids (the frontend's lesson ids), so on
+    PostgreSQL move the id sequence past them; it never moves backwards.
+    Also repairs databases seeded before this ran.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text(
+        "SELECT setval(pg_get_serial_sequence('lessons', 'id'), MAX(id)) FROM lessons "
+        "HAVING MAX(id) > COALESCE(pg_sequence_last_value(CAST(pg_get_serial_sequence('lessons', 'id') AS regclass)), 0)"
+    ))
+    db.commit()
+
+
+def _catalog_marker(db: Session) -> tuple:
+    """Cheap check for catalog changes: lesson count and latest edit"""
+    return tuple(db.execute(select(func.count(Lesson.id), func.max(Lesson.updated_at))).one())
+
+
+def invalidate_catalog() -> None:
+    """Drop the cached catalog; call after editing lessons"""
+    _catalog_cache.clear()
+
+
+def get_catalog(db: Session) -> tuple:
+    """
+    (version, every lesson as a dict in display order). The catalog is
+    reloaded only when the lessons table changes; the version is a hash of
+    its content, so it is stable across processes and usable as an ETag.
+    """
+    marker = _catalog_marker(db)
+    if _catalog_cache.get("marker") != marker:
+        lessons = [
+            {
+                "id": lesson.id,
+                "title": lesson.title,
+                "description": lesson.description,
+                "category": lesson.category,
+                "duration_minutes": lesson.duration_minutes,
+                "sort_order": lesson.sort_order,
+                "assigned_roles": json.loads(lesson.assigned_roles) if lesson.assigned_roles else [],
+                "is_active": lesson.is_active,
+            }
+            for lesson in db.query(Lesson).order_by(Lesson.sort_order, Lesson.id)
+        ]
+        version = hashlib.sha1(json.dumps(lessons, sort_keys=True).encode()).hexdigest()[:16]
+        _catalog_cache.update(marker=marker, version=version, lessons=lessons)
+    return _catalog_cache["version"], _catalog_cache["lessons"]
+
+
+def lessons_for_role(catalog: List[dict], role: str) -> List[dict]:
+    """Active lessons assigned to a role, in display order"""
+    return [
+        lesson for lesson in catalog
+        if lesson["is_active"] and (
+            role in FULL_ACCESS_ROLES or not lesson["assigned_roles"] or role in lesson["assigned_roles"]
+        )
+    ]
+
+
+def lesson_mask(lessons: Iterable[dict]) -> int:
+    mask = 0
+    for lesson in lessons:
+        mask |= 1 << lesson["id"]
+    return mask
+
+
+def _from_bytes(bits: Optional[bytes]) -> int:
+    return int.from_bytes(bits or b"", "little")
+
+
+def _to_bytes(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def completion_bits(db: Session, user_ids: Iterable[int]) -> Dict[int, int]:
+    """user id -> completion bitmap, by primary key"""
+    return {
+        user_id: _from_bytes(bits) for user_id, bits in db.execute(
+            select(LessonCompletion.user_id, LessonCompletion.completed_bits)
+            .where(LessonCompletion.user_id.in_(list(user_ids)))
+        )
+    }
+
+
+def apply_completion_changes(db: Session, user_id: int, lessons: Dict[int, bool]) -> Dict[int, bool]:
+    """
+    Set or clear lesson bits for a user and return the lessons whose state
+    actually changed. The bitmap row is locked while it is rewritten, so
+    concurrent updates for the same user do not lose bits.
+    Changes are left for the caller to commit.
+    """
+    db.execute(
+        upsert(db, LessonCompletion).values(user_id=user_id, completed_bits=b"").on_conflict_do_nothing()
+    )
+    completion = db.execute(
+        select(LessonCompletion).where(LessonCompletion.user_id == user_id)
+        .with_for_update().execution_options(populate_existing=True)
+    ).scalar_one()
+
+    before = bits = _from_bytes(completion.completed_bits)
+    for lesson_id, completed in lessons.items():
+        if completed:
+            bits |= 1 << lesson_id
+        else:
+            bits &= ~(1 << lesson_id)
+    completion.completed_bits = _to_bytes(bits)
+    db.flush()
+    return {lesson_id: bool(bits >> lesson_id & 1) for lesson_id in lessons if (before ^ bits) >> lesson_id & 1}
+
+
+def completion_summary(db: Session, user_id: int, role: str) -> dict:
+    """Counts, percentage and next lesson for a user, from the cached catalog and one bitmap"""
+    _, catalog = get_catalog(db)
+    assigned = lessons_for_role(catalog, role)
+    bits = completion_bits(db, [user_id]).get(user_id, 0) & lesson_mask(assigned)
+
+    completed = bits.bit_count()
+    next_lesson = next((lesson for lesson in assigned if not bits >> lesson["id"] & 1), None)
+    return {
+        "total_lessons": len(assigned),
+        "completed_lessons": completed,
+        "percent_complete": round(100.0 * completed / len(assigned), 1) if assigned else 0.0,
+        "completed_lesson_ids": [lesson["id"] for lesson in assigned if bits >> lesson["id"] & 1],
+        "next_lesson": next_lesson,
+    }
@@ -0,0 +1,318 @@
+"""
+Notification Service
+Transactional outbox, the dispatcher that drains it, and the SMTP backend.
+
+Reviews call enqueue() before they commit, so a notification is owed exactly
+when the review happened and the admin request does no delivery work. The
+dispatcher claims pending messages in batches and turns each review into an
+in-app notification plus an increment of the user's unread counter, all in
+one transaction. When SMTP is configured it also queues an email message.
+
+Emails are sent outside any transaction: a short one claims a batch by
+counting the attempt and leasing the rows, the batch goes out over one SMTP
+session, and another short one records the outcome, retrying with backoff.
+An email whose outcome never gets recorded is retried once its lease expires.
+"""
+import asyncio
+import json
+import smtplib
+from collections import Counter
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, upsert
+from app.models.user import User
+from app.models.notification import OutboxMessage, Notification, NotificationCounter
+from app.services.event_service import EventType, event, publish
+
+EMAIL_TOPIC = "email"
+
+
+def enqueue(db: Session, topic: str, payloads: Iterable[dict]) -> None:
+    """Record outbox messages in the caller's transaction"""
+    now = datetime.utcnow()
+    values = [
+        {"topic": topic, "payload": json.dumps(payload, default=str), "available_at": now}
+        for payload in payloads
+    ]
+    if values:
+        db.execute(insert(OutboxMessage), values)
+
+
+def _timesheet_notification(payload: dict) -> tuple:
+    week = payload.get("week_start")
+    subject = f"Your timesheet for the week of {week}" if week else "Your timesheet"
+    if payload["status"] == "approved":
+        return "Timesheet approved", f"{subject} was approved.", "/timesheet"
+    if payload["status"] == "rejected":
+        reason = payload.get("rejection_reason")
+        return (
+            "Timesheet needs changes",
+            f"{subject} was rejected{': ' + reason if reason else ''}. Update it and submit it again.",
+            "/timesheet"
+        )
+    return "Timesheet reopened", f"{subject} was sent back to draft for corrections.", "/timesheet"
+
+
+def _document_notification(payload: dict) -> tuple:
+    name = payload.get("file_name") or "Your document"
+    if payload["status"] == "approved":
+        return "Document approved", f"{name} was approved.", "/documents"
+    reason = payload.get("rejection_reason")
+    return (
+        "Document needs attention",
+        f"{name} was rejected{': ' + reason if reason else ''}. Please upload a new copy.",
+        "/documents"
+    )
+
+
+# topic -> payload -> (title, message, link)
+RENDERERS = {
+    "timesheet_reviewed": _timesheet_notification,
+    "document_reviewed": _document_notification,
+}
+
+
+class SMTPBackend:
+    """Sends email over one SMTP session per batch"""
+
+    def __init__(self, host: str, port: int, username: str = "", password: str = "",
+                 use_tls: bool = True, sender: str = ""):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.sender = sender
+
+    def send_many(self, messages: List[dict]) -> List[Optional[str]]:
+        """Send {to, subject, body} dicts; returns an error or None per message"""
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+        except (OSError, smtplib.SMTPException) as e:
+            return [str(e)] * len(messages)
+
+        errors = []
+        with smtp:
+            try:
+                if self.use_tls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password)
+            except (OSError, smtplib.SMTPException) as e:
+                return [str(e)] * len(messages)
+
+            for message in messages:
+                email = EmailMessage()
+                email["From"] = self.sender
+                email["To"] = message["to"]
+                email["Subject"] = message["subject"]
+                email.set_content(message["body"])
+                try:
+                    smtp.send_message(email)
+                    errors.append(None)
+                except (OSError, smtplib.SMTPException) as e:
+                    errors.append(str(e))
+        return errors
+
+
+def email_backend() -> Optional[SMTPBackend]:
+    """The configured SMTP backend, or None when email is disabled"""
+    if not settings.SMTP_HOST:
+        return None
+    return SMTPBackend(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT,
+        settings.SMTP_USERNAME,
+        settings.SMTP_PASSWORD,
+        settings.SMTP_USE_TLS,
+        settings.EMAIL_FROM,
+    )
+
+
+def _deliver_in_app(db: Session, messages: List[OutboxMessage], backend: Optional[SMTPBackend]) -> dict:
+    """Create notifications and bump counters; returns user id -> unread count"""
+    rows = []
+    for message in messages:
+        render = RENDERERS.get(message.topic)
+        if render is None:
+            message.last_error = f"Unknown topic: {message.topic}"
+            continue
+        payload = json.loads(message.payload)
+        title, text, link = render(payload)
+        rows.append({
+            "user_id": payload["user_id"], "kind": message.topic,
+            "title": title, "message": text, "link": link,
+        })
+    if not rows:
+        return {}
+
+    db.execute(insert(Notification), rows)
+    per_user = Counter(row["user_id"] for row in rows)
+    statement = upsert(db, NotificationCounter).values([
+        {"user_id": user_id, "unread": count} for user_id, count in per_user.items()
+    ])
+    unread = dict(db.execute(statement.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={"unread": NotificationCounter.unread + statement.excluded.unread}
+    ).returning(NotificationCounter.user_id, NotificationCounter.unread)).all())
+
+    if backend is not None:
+        addresses = dict(db.execute(
+            select(User.id, User.email).where(User.id.in_(list(per_user)), User.is_active == True)
+        ).all())
+        enqueue(db, EMAIL_TOPIC, (
+            {"to": addresses[row["user_id"]], "subject": row["title"], "body": row["message"]}
+            for row in rows if row["user_id"] in addresses
+        ))
+    return unread
+
+
+def _claim(db: Session, email: bool, now: datetime) -> List[OutboxMessage]:
+    """Pending email or in-app messages, oldest first, locked where supported"""
+    statement = select(OutboxMessage).where(
+        (OutboxMessage.topic == EMAIL_TOPIC) if email else (OutboxMessage.topic != EMAIL_TOPIC),
+        OutboxMessage.dispatched_at == None,
+        OutboxMessage.available_at <= now
+    ).order_by(OutboxMessage.id).limit(settings.NOTIFICATIONS_BATCH_SIZE)
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent dispatchers take different batches
+        statement = statement.with_for_update(skip_locked=True)
+    return db.scalars(statement).all()
+
+
+def dispatch_outbox(db: Session, backend: Optional[SMTPBackend] = None) -> int:
+    """
+    Deliver one batch of pending in-app messages and commit. Returns the
+    number of messages claimed; 0 means they are drained.
+    """
+    now = datetime.utcnow()
+    messages = _claim(db, False, now)
+    if not messages:
+        db.rollback()
+        return 0
+
+    unread = _deliver_in_app(db, messages, backend)
+    for message in messages:
+        message.dispatched_at = now
+    db.commit()
+
+    publish(*(
+        event(EventType.notification_created, {"unread": count}, user_ids=[user_id])
+        for user_id, count in unread.items()
+    ))
+    return len(messages)
+
+
+def dispatch_emails(db: Session, backend: Optional[SMTPBackend] = None) -> int:
+    """
+    Send one batch of pending emails. No transaction or row lock is held
+    while talking to the SMTP server. Returns the number of emails claimed;
+    0 means they are drained.
+    """
+    now = datetime.utcnow()
+    messages = _claim(db, True, now)
+    if not messages:
+        db.rollback()
+        return 0
+
+    # Count the attempt up front so an email that crashes the dispatcher
+    # still runs out of attempts
+    lease = now + timedelta(seconds=settings.NOTIFICATIONS_EMAIL_LEASE_SECONDS)
+    claimed = [(message.id, message.attempts + 1, json.loads(message.payload)) for message in messages]
+    for message in messages:
+        message.attempts += 1
+        message.available_at = lease
+    db.commit()
+
+    if backend is None:
+        errors = ["Email is not configured"] * len(claimed)
+    else:
+        errors = backend.send_many([payload for _, _, payload in claimed])
+
+    now = datetime.utcnow()
+    sent = [message_id for (message_id, _, _), error in zip(claimed, errors) if error is None]
+    if sent:
+        db.execute(
+            update(OutboxMessage).where(OutboxMessage.id.in_(sent)).values(dispatched_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    for (message_id, attempts, _), error in zip(claimed, errors):
+        if error is None:
+            continue
+        values = {"last_error": error}
+        if attempts >= settings.NOTIFICATIONS_MAX_ATTEMPTS:
+            values["dispatched_at"] = now  # Give up
+        else:
+            values["available_at"] = now + timedelta(
+                seconds=settings.NOTIFICATIONS_RETRY_SECONDS * 2 ** (attempts - 1)
+            )
+        db.execute(
+            update(OutboxMessage).where(OutboxMessage.id == message_id).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return len(claimed)
+
+
+def dispatch_pending() -> int:
+    """Drain the outbox on its own session; returns messages handled"""
+    db = SessionLocal()
+    backend = email_backend()
+    handled = 0
+    try:
+        while True:
+            # In-app notifications are committed before any email is sent
+            count = dispatch_outbox(db, backend) + dispatch_emails(db, backend)
+            if not count:
+                return handled
+            handled += count
+    except Exception as e:
+        print(f"Error dispatching notifications: {e}")
+        db.rollback()
+        return handled
+    finally:
+        db.close()
+
+
+async def run_dispatcher() -> None:
+    """Drain the outbox every NOTIFICATIONS_POLL_SECONDS"""
+    while True:
+        await asyncio.to_thread(dispatch_pending)
+        await asyncio.sleep(settings.NOTIFICATIONS_POLL_SECONDS)
+
+
+def mark_read(db: Session, user_id: int, notification_ids: Optional[List[int]] = None) -> int:
+    """
+    Mark the user's unread notifications read, all of them when
+    notification_ids is None, and take them off the unread counter.
+    Returns the number marked. Changes are left for the caller to commit.
+    """
+    statement = update(Notification).where(
+        Notification.user_id == user_id,
+        Notification.is_read == False
+    )
+    if notification_ids is not None:
+        statement = statement.where(Notification.id.in_(notification_ids))
+    marked = len(db.execute(
+        statement.values(is_read=True, read_at=datetime.utcnow())
+        .returning(Notification.id).execution_options(synchronize_session=False)
+    ).all())
+    if marked:
+        db.execute(
+            update(NotificationCounter).where(NotificationCounter.user_id == user_id)
+            .values(unread=NotificationCounter.unread - marked)
+            .execution_options(synchronize_session=False)
+        )
+    return marked
+
+
+def unread_count(db: Session, user_id: int) -> int:
+    return db.execute(
+        select(NotificationCounter.unread).where(NotificationCounter.user_id == user_id)
+    ).scalar() or 0
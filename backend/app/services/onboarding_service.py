@@ -0,0 +1,50 @@
+"""
+Onboarding Service
+Keeps ContractorOnboarding.documents_complete in step with approved documents
+"""
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.document import Document, DocumentStatus, REQUIRED_DOCUMENTS
+from app.models.contractor import ContractorOnboarding
+
+
+def _required_type_keys(role: str) -> list:
+    """Each required document as the set of names it may be stored under"""
+    # Uploads use either the enum name ("w9") or its label ("W-9 Form")
+    return [{doc_type.name, doc_type.value} for doc_type in REQUIRED_DOCUMENTS.get(role, [])]
+
+
+def refresh_documents_complete(db: Session, user_ids: Iterable[int]) -> None:
+    """
+    Recompute documents_complete for the given users' onboarding records.
+    Issues one query for the onboarding rows and one for approved documents,
+    regardless of how many users are passed. Changes are left for the caller
+    to commit.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    onboardings = db.query(ContractorOnboarding, User.role).join(
+        User, User.id == ContractorOnboarding.user_id
+    ).filter(ContractorOnboarding.user_id.in_(user_ids)).all()
+    if not onboardings:
+        return
+
+    approved = {}
+    rows = db.query(Document.student_id, Document.document_type).filter(
+        Document.student_id.in_([onboarding.user_id for onboarding, _ in onboardings]),
+        Document.status == DocumentStatus.approved.value
+    ).distinct()
+    for student_id, document_type in rows:
+        approved.setdefault(student_id, set()).add(document_type)
+
+    for onboarding, role in onboardings:
+        required = _required_type_keys(role)
+        have = approved.get(onboarding.user_id, set())
+        onboarding.documents_complete = bool(required) and all(
+            keys & have for keys in required
+        )
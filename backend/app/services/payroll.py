@@ -0,0 +1,194 @@
+"""
+Payroll Service
+Pay-period totals from approved timesheet entries, computed with array math
+"""
+import csv
+import io
+from datetime import date, timedelta
+from typing import Iterator, List
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User, EmploymentType
+from app.models.timesheet import Timesheet, TimesheetEntry, TimesheetStatus
+
+
+def compute_payroll(
+    entry_user_ids: np.ndarray,
+    entry_days: np.ndarray,
+    entry_hours: np.ndarray,
+    n_days: int,
+    rates_by_user: dict,
+    overtime_exempt: set = frozenset(),
+    week_offset: int = 0,
+) -> dict:
+    """
+    Aggregate entry-level hours into per-person daily, weekly and period totals.
+
+    entry_days holds each entry's offset in days from the period start, and
+    week_offset how many days into its workweek the period starts; weeks
+    are 7-day blocks aligned to the workweek, so a period starting midweek
+    begins with a partial week. Hours over the weekly threshold are
+    overtime; people in overtime_exempt (1099 contractors) are paid
+    straight time for them. People without a rate get NaN gross pay.
+    """
+    user_ids, person = np.unique(entry_user_ids, return_inverse=True)
+    n_people = len(user_ids)
+    n_weeks = (week_offset + n_days + 6) // 7
+    week = (entry_days + week_offset) // 7
+
+    daily = np.bincount(
+        person * n_days + entry_days, weights=entry_hours, minlength=n_people * n_days
+    ).reshape(n_people, n_days)
+    weekly = np.bincount(
+        person * n_weeks + week, weights=entry_hours, minlength=n_people * n_weeks
+    ).reshape(n_people, n_weeks)
+
+    weekly_overtime = np.maximum(weekly - settings.PAYROLL_OVERTIME_WEEKLY_HOURS, 0.0)
+    total = weekly.sum(axis=1)
+    overtime = weekly_overtime.sum(axis=1)
+    regular = total - overtime
+
+    rates = np.array([rates_by_user.get(user_id, np.nan) for user_id in user_ids.tolist()], dtype=float)
+    multiplier = np.where(
+        np.isin(user_ids, list(overtime_exempt)), 1.0, settings.PAYROLL_OVERTIME_MULTIPLIER
+    )
+    gross = np.round(regular * rates + overtime * rates * multiplier, 2)
+
+    return {
+        "user_ids": user_ids,
+        "daily": daily,
+        "weekly": weekly,
+        "weekly_overtime": weekly_overtime,
+        "total": total,
+        "regular": regular,
+        "overtime": overtime,
+        "gross": gross,
+    }
+
+
+def _load_entries(db: Session, period_start: date, period_end: date):
+    """All approved entries in the period as three parallel arrays, in one query"""
+    rows = db.execute(
+        select(Timesheet.student_id, TimesheetEntry.date, TimesheetEntry.hours)
+        .join(Timesheet, Timesheet.id == TimesheetEntry.timesheet_id)
+        .where(
+            Timesheet.status == TimesheetStatus.approved.value,
+            TimesheetEntry.date >= period_start,
+            TimesheetEntry.date <= period_end
+        )
+    ).all()
+
+    count = len(rows)
+    user_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+    days = np.fromiter(((row[1] - period_start).days for row in rows), dtype=np.int64, count=count)
+    hours = np.fromiter((row[2] or 0.0 for row in rows), dtype=float, count=count)
+    return user_ids, days, hours
+
+
+def run_payroll(
+    db: Session,
+    period_start: date,
+    period_end: date,
+    include_days: bool = False
+) -> dict:
+    """
+    Payroll for every person with approved hours between the two dates
+    (inclusive). Overtime weeks follow the workweek, not the period start;
+    a workweek cut by either end of the period only counts its days inside it.
+    """
+    n_days = (period_end - period_start).days + 1
+    week_offset = (period_start.weekday() - settings.PAYROLL_WORKWEEK_START) % 7
+    user_ids, days, hours = _load_entries(db, period_start, period_end)
+
+    people = {}
+    if len(user_ids):
+        people = {
+            user.id: user for user in db.execute(
+                select(
+                    User.id, User.first_name, User.last_name, User.email,
+                    User.employment_type, User.hourly_rate
+                ).where(User.id.in_(np.unique(user_ids).tolist()))
+            )
+        }
+
+    rates = {
+        user_id: float(user.hourly_rate)
+        for user_id, user in people.items() if user.hourly_rate is not None
+    }
+    exempt = {
+        user_id for user_id, user in people.items()
+        if user.employment_type == EmploymentType.c1099.value
+    }
+    result = compute_payroll(user_ids, days, hours, n_days, rates, exempt, week_offset)
+
+    first_week = period_start - timedelta(days=week_offset)
+    week_starts = [first_week + timedelta(days=7 * w) for w in range(result["weekly"].shape[1])]
+    day_dates = [period_start + timedelta(days=d) for d in range(n_days)]
+
+    lines = []
+    for i, user_id in enumerate(result["user_ids"].tolist()):
+        user = people.get(user_id)
+        gross = result["gross"][i]
+        line = {
+            "user_id": user_id,
+            "name": f"{user.first_name} {user.last_name}" if user else None,
+            "email": user.email if user else None,
+            "employment_type": user.employment_type if user else None,
+            "hourly_rate": rates.get(user_id),
+            "total_hours": float(result["total"][i]),
+            "regular_hours": float(result["regular"][i]),
+            "overtime_hours": float(result["overtime"][i]),
+            "gross_pay": None if np.isnan(gross) else float(gross),
+            "weeks": [
+                {
+                    "week_start": week_start,
+                    "hours": float(result["weekly"][i, w]),
+                    "overtime_hours": float(result["weekly_overtime"][i, w]),
+                }
+                for w, week_start in enumerate(week_starts)
+            ],
+        }
+        if include_days:
+            line["days"] = {
+                day: float(result["daily"][i, d])
+                for d, day in enumerate(day_dates) if result["daily"][i, d]
+            }
+        lines.append(line)
+
+    return {
+        "period_start": period_start,
+        "period_end": period_end,
+        "people": len(lines),
+        "total_hours": float(result["total"].sum()),
+        "total_overtime_hours": float(result["overtime"].sum()),
+        "total_gross_pay": float(np.nansum(result["gross"]).round(2)),
+        "lines": lines,
+    }
+
+
+CSV_COLUMNS = [
+    "user_id", "name", "email", "employment_type", "hourly_rate",
+    "total_hours", "regular_hours", "overtime_hours", "gross_pay",
+]
+
+
+def payroll_csv_rows(payroll: dict, chunk_size: int = 1000) -> Iterator[str]:
+    """Yield the payroll as CSV text in chunks, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+
+    lines: List[dict] = payroll["lines"]
+    for start in range(0, len(lines), chunk_size):
+        for line in lines[start:start + chunk_size]:
+            writer.writerow(["" if line[column] is None else line[column] for column in CSV_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
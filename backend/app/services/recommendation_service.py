@@ -0,0 +1,320 @@
+"""
+Recommendation Service
+Scores every active opportunity for every participant in batched array passes
+and stores each user's best matches in opportunity_recommendations.
+
+A score blends four signals, each in [0, 1]:
+  role      how well the opportunity type suits the user's role
+  program   the user has been enrolled in a program run by the same organization
+  location  overlap between the opportunity location and the user's address
+            and program locations
+  lessons   Learning Hub completion, applied to paid opportunities
+plus a small bonus for featured opportunities.
+
+Reads only ever see stored rows. Refreshes run in one place at a time: a
+PostgreSQL advisory lock (a process lock elsewhere) admits one refresh across
+every worker, and the scheduler on each worker only refreshes when the stored
+rows are older than the refresh interval or than an opportunity change.
+"""
+import asyncio
+import re
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import select, delete, insert, exists, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.user import User, UserRole
+from app.models.program import Program, Enrollment, EnrollmentStatus
+from app.models.opportunity import Opportunity, OpportunityRecommendation
+from app.services.lesson_service import get_catalog, lessons_for_role, lesson_mask, completion_bits
+
+WEIGHTS = {
+    "role": 0.40,
+    "program": 0.25,
+    "location": 0.20,
+    "lessons": 0.10,
+    "featured": 0.05,
+}
+
+# role -> opportunity type (lowercased) -> fit; unlisted types get NEUTRAL_FIT
+ROLE_TYPE_AFFINITY = {
+    UserRole.wble_participant.value: {
+        "internship": 1.0, "pathway": 0.8, "apprenticeship": 0.7, "part-time": 0.5, "contract": 0.1,
+    },
+    UserRole.ttw_participant.value: {
+        "part-time": 1.0, "pathway": 0.7, "apprenticeship": 0.6, "internship": 0.5, "contract": 0.3,
+    },
+    UserRole.contractor.value: {
+        "contract": 1.0, "part-time": 0.6, "apprenticeship": 0.4, "pathway": 0.3, "internship": 0.1,
+    },
+    UserRole.employee.value: {
+        "pathway": 0.8, "apprenticeship": 0.6, "part-time": 0.3, "contract": 0.3, "internship": 0.2,
+    },
+}
+# Accounts created before the participant roles were split
+ROLE_ALIASES = {"student": UserRole.wble_participant.value}
+NEUTRAL_FIT = 0.5
+
+# Location words that say nothing about where the work is
+LOCATION_STOPWORDS = {"various", "locations", "location", "area", "campus", "remote", "the", "and", "of"}
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Users scored per pass; bounds the size of the score matrix
+USER_BATCH_SIZE = 2000
+
+
+def _location_tokens(*texts: Optional[str]) -> set:
+    tokens = set()
+    for text in texts:
+        if text:
+            tokens.update(WORD_PATTERN.findall(text.lower()))
+    return tokens - LOCATION_STOPWORDS
+
+
+class _OpportunityFeatures:
+    """Per-opportunity arrays shared by every user batch"""
+
+    def __init__(self, rows: list):
+        self.ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.types = sorted({(row.opportunity_type or "").lower() for row in rows})
+        type_index = {name: i for i, name in enumerate(self.types)}
+        self.type_idx = np.array([type_index[(row.opportunity_type or "").lower()] for row in rows], dtype=np.int64)
+
+        self.org_index = {}
+        for row in rows:
+            self.org_index.setdefault(row.organization.strip().lower(), len(self.org_index))
+        self.org_idx = np.array([self.org_index[row.organization.strip().lower()] for row in rows], dtype=np.int64)
+
+        self.vocabulary = {}
+        token_sets = [_location_tokens(row.location) for row in rows]
+        for tokens in token_sets:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+        self.location = np.zeros((len(rows), max(len(self.vocabulary), 1)))
+        for i, tokens in enumerate(token_sets):
+            self.location[i, [self.vocabulary[token] for token in tokens]] = 1.0
+        self.location_size = np.maximum(self.location.sum(axis=1), 1.0)
+
+        self.paid = np.array([1.0 if row.compensation else 0.0 for row in rows])
+        self.featured = np.array([1.0 if row.is_featured else 0.0 for row in rows])
+
+    def role_matrix(self) -> dict:
+        """role -> fit of each opportunity"""
+        by_type = {
+            role: np.array([affinity.get(name, NEUTRAL_FIT) for name in self.types])
+            for role, affinity in ROLE_TYPE_AFFINITY.items()
+        }
+        return {role: fits[self.type_idx] for role, fits in by_type.items()}
+
+
+def score_users(users: list, history: dict, lessons: dict, opportunities: _OpportunityFeatures) -> np.ndarray:
+    """
+    Score matrix of shape (len(users), number of opportunities).
+    history maps user id -> list of (program organization, program location);
+    lessons maps user id -> share of assigned lessons completed.
+    """
+    n_users = len(users)
+    n_opps = len(opportunities.ids)
+
+    role_fits = opportunities.role_matrix()
+    neutral = np.full(n_opps, NEUTRAL_FIT)
+    role = np.stack([
+        role_fits.get(ROLE_ALIASES.get(user.role, user.role), neutral) for user in users
+    ]) if n_users else np.zeros((0, n_opps))
+
+    user_orgs = np.zeros((n_users, max(len(opportunities.org_index), 1)))
+    user_location = np.zeros((n_users, opportunities.location.shape[1]))
+    for i, user in enumerate(users):
+        places = [user.address]
+        for organization, location in history.get(user.id, []):
+            org = opportunities.org_index.get(organization.strip().lower())
+            if org is not None:
+                user_orgs[i, org] = 1.0
+            places.append(location)
+        columns = [
+            opportunities.vocabulary[token] for token in _location_tokens(*places)
+            if token in opportunities.vocabulary
+        ]
+        user_location[i, columns] = 1.0
+
+    program = user_orgs[:, opportunities.org_idx]
+    location = (user_location @ opportunities.location.T) / opportunities.location_size
+    readiness = np.array([lessons.get(user.id, 0.0) for user in users], dtype=float)
+    lesson_fit = np.outer(readiness, opportunities.paid)
+
+    return (
+        WEIGHTS["role"] * role
+        + WEIGHTS["program"] * program
+        + WEIGHTS["location"] * location
+        + WEIGHTS["lessons"] * lesson_fit
+        + WEIGHTS["featured"] * opportunities.featured
+    )
+
+
+def _top_k(scores: np.ndarray, k: int):
+    """(row, column) index arrays of each row's k highest positive scores"""
+    if scores.shape[1] > k:
+        columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        columns = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    rows = np.repeat(np.arange(scores.shape[0]), columns.shape[1])
+    columns = columns.ravel()
+    keep = scores[rows, columns] > 0
+    return rows[keep], columns[keep]
+
+
+def _eligible_users():
+    return select(User.id, User.role, User.address).where(
+        User.is_active == True,
+        User.role != UserRole.admin.value
+    )
+
+
+def refresh_recommendations(db: Session, user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute and store recommendations for the given users, or for every
+    active non-admin user when user_ids is None. Commits after each batch of
+    users and returns the number of rows written.
+    """
+    opportunity_rows = db.execute(
+        select(
+            Opportunity.id, Opportunity.organization, Opportunity.location,
+            Opportunity.opportunity_type, Opportunity.compensation, Opportunity.is_featured
+        ).where(Opportunity.is_active == True).order_by(Opportunity.id)
+    ).all()
+    opportunities = _OpportunityFeatures(opportunity_rows)
+
+    statement = _eligible_users().order_by(User.id)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        statement = statement.where(User.id.in_(user_ids))
+        db.execute(delete(OpportunityRecommendation).where(OpportunityRecommendation.user_id.in_(user_ids)))
+    else:
+        db.execute(delete(OpportunityRecommendation).where(
+            OpportunityRecommendation.user_id.not_in(_eligible_users().with_only_columns(User.id))
+        ))
+    users = db.execute(statement).all()
+
+    # role -> (assigned lesson bitmask, number of assigned lessons)
+    _, catalog = get_catalog(db)
+    role_lessons = {}
+    for role in {user.role for user in users}:
+        assigned = lessons_for_role(catalog, role)
+        role_lessons[role] = (lesson_mask(assigned), len(assigned))
+
+    written = 0
+    for start in range(0, len(users), USER_BATCH_SIZE):
+        batch = users[start:start + USER_BATCH_SIZE]
+        batch_ids = [user.id for user in batch]
+
+        history = {}
+        for student_id, organization, location in db.execute(
+            select(Enrollment.student_id, Program.organization, Program.location)
+            .join(Program, Program.id == Enrollment.program_id)
+            .where(
+                Enrollment.student_id.in_(batch_ids),
+                Enrollment.status != EnrollmentStatus.withdrawn.value
+            )
+        ):
+            history.setdefault(student_id, []).append((organization, location))
+
+        bits = completion_bits(db, batch_ids)
+        lessons = {}
+        for user in batch:
+            mask, assigned = role_lessons[user.role]
+            if assigned:
+                lessons[user.id] = (bits.get(user.id, 0) & mask).bit_count() / assigned
+
+        db.execute(delete(OpportunityRecommendation).where(OpportunityRecommendation.user_id.in_(batch_ids)))
+        if len(opportunities.ids):
+            scores = score_users(batch, history, lessons, opportunities)
+            rows, columns = _top_k(scores, settings.RECOMMENDATIONS_PER_USER)
+            values = [
+                {"user_id": batch_ids[row], "opportunity_id": int(opportunities.ids[column]), "score": float(score)}
+                for row, column, score in zip(rows.tolist(), columns.tolist(), scores[rows, columns].tolist())
+            ]
+            if values:
+                db.execute(insert(OpportunityRecommendation), values)
+            written += len(values)
+        db.commit()
+
+    db.commit()
+    return written
+
+
+# Advisory lock key shared by every worker; any constant unique to this job
+REFRESH_LOCK_KEY = 7_301_002
+_refresh_lock = threading.Lock()
+
+
+@contextmanager
+def _single_refresh():
+    """Yields whether this caller holds the one refresh slot"""
+    if not _refresh_lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        if engine.dialect.name != "postgresql":
+            yield True
+            return
+        # Session-level lock on its own connection, held across the batch commits
+        with engine.connect() as conn:
+            acquired = conn.execute(select(func.pg_try_advisory_lock(REFRESH_LOCK_KEY))).scalar()
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute(select(func.pg_advisory_unlock(REFRESH_LOCK_KEY)))
+    finally:
+        _refresh_lock.release()
+
+
+def refresh_all_recommendations(db: Session) -> Optional[int]:
+    """Full refresh unless one is already running anywhere; None when skipped"""
+    with _single_refresh() as acquired:
+        if not acquired:
+            return None
+        return refresh_recommendations(db)
+
+
+def refresh_due(db: Session) -> bool:
+    """
+    Whether the stored recommendations are older than the refresh interval
+    or than the latest opportunity change. Every batch of a refresh is
+    stamped, so the oldest stamp is when the last full refresh started.
+    """
+    oldest, now = db.execute(select(func.min(OpportunityRecommendation.computed_at), func.now())).one()
+    if oldest is None:
+        return True
+    if now - oldest >= timedelta(minutes=settings.RECOMMENDATIONS_REFRESH_MINUTES):
+        return True
+    return db.scalar(select(exists().where(
+        func.coalesce(Opportunity.updated_at, Opportunity.created_at) >= oldest
+    )))
+
+
+def refresh_recommendations_if_due() -> None:
+    """Scheduled refresh on its own session; a no-op when nothing is due"""
+    db = SessionLocal()
+    try:
+        if refresh_due(db):
+            db.rollback()
+            refresh_all_recommendations(db)
+    except Exception as e:
+        print(f"Error refreshing recommendations: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+async def run_scheduled_refresh() -> None:
+    """Check every RECOMMENDATIONS_POLL_SECONDS whether a refresh is due and run it"""
+    while True:
+        await asyncio.to_thread(refresh_recommendations_if_due)
+        await asyncio.sleep(settings.RECOMMENDATIONS_POLL_SECONDS)
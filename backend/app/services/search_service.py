@@ -0,0 +1,211 @@
+"""
+Full-Text Search Service
+Weighted, prefix-matching search over opportunities and programs, and
+typeahead search over users.
+
+PostgreSQL uses a generated tsvector column with a GIN index; SQLite uses an
+FTS5 table kept in sync by triggers. Either way the index follows every
+insert and update without application code. User typeahead is backed by
+pg_trgm GIN indexes on PostgreSQL and lower() expression indexes on SQLite.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import (
+    text, column, literal_column, literal, select, union, func, case, Integer, Float, String
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+# table -> searchable columns with their weight class (A ranks highest)
+SEARCHABLE_TABLES = {
+    "opportunities": {
+        "title": "A",
+        "organization": "B",
+        "description": "C",
+        "requirements": "C",
+    },
+    "programs": {
+        "name": "A",
+        "organization": "B",
+        "location": "C",
+        "description": "C",
+    },
+}
+
+# bm25 column weights for SQLite, matching the PostgreSQL weight classes
+FTS5_WEIGHTS = {"A": 10.0, "B": 5.0, "C": 1.0, "D": 0.5}
+
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _postgres_setup(table: str, columns: dict) -> list:
+    document = " || ".join(
+        f"setweight(to_tsvector('english'::regconfig, coalesce({name}, '')), '{weight}')"
+        for name, weight in columns.items()
+    )
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({document}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)",
+    ]
+
+
+def _sqlite_setup(table: str, columns: dict) -> list:
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{name}" for name in columns)
+    old_values = ", ".join(f"old.{name}" for name in columns)
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{names}, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        # Catch up with rows written while the triggers did not exist
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+# name -> lowercased SQL expression over users; each gets its own index
+USER_SEARCH_EXPRESSIONS = {
+    "name": "lower(first_name || ' ' || last_name)",
+    "last_name": "lower(last_name)",
+    "email": "lower(email)",
+    "case_id": "lower(case_id)",
+    "phone": "lower(phone)",
+}
+
+
+# Prefix candidates taken from each index before ranking; bounds the work for
+# short queries like "jo" that match a large share of users
+USER_SEARCH_CANDIDATES = 100
+
+
+def _prefix_expression(expression: str, dialect: str) -> str:
+    # Byte-order collation makes a half-open range a prefix match on PostgreSQL,
+    # as SQLite's default BINARY collation already does
+    return f'({expression}) COLLATE "C"' if dialect == "postgresql" else expression
+
+
+def _user_index_setup(dialect: str) -> list:
+    # B-tree expression indexes serve the prefix range scans in sorted order
+    statements = [
+        f"CREATE INDEX IF NOT EXISTS ix_users_{name}_prefix ON users (({_prefix_expression(expression, dialect)}))"
+        for name, expression in USER_SEARCH_EXPRESSIONS.items()
+    ]
+    if dialect == "postgresql":
+        # Trigram GIN indexes serve the fuzzy (%) lookups for typos
+        statements += ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+            f"CREATE INDEX IF NOT EXISTS ix_users_{name}_trgm ON users USING GIN (({expression}) gin_trgm_ops)"
+            for name, expression in USER_SEARCH_EXPRESSIONS.items()
+        ]
+    return statements
+
+
+def ensure_search_indexes(engine: Engine) -> None:
+    """Create the full-text and typeahead indexes if missing; safe to run on every startup"""
+    dialect = engine.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return
+    with engine.begin() as conn:
+        for table, columns in SEARCHABLE_TABLES.items():
+            if dialect == "postgresql":
+                statements = _postgres_setup(table, columns)
+            else:
+                statements = _sqlite_setup(table, columns)
+            for sql in statements:
+                conn.execute(text(sql))
+        for sql in _user_index_setup(dialect):
+            conn.execute(text(sql))
+
+
+def _terms(query: str) -> list:
+    return TERM_PATTERN.findall(query.lower())
+
+
+def search_rank_subquery(db: Session, table: str, query: str):
+    """
+    Subquery of (id, rank) for rows of table matching every term of query,
+    each term as a prefix so partial words match while typing.
+    Higher rank is a better match. Returns None when the query has no terms.
+    """
+    terms = _terms(query)
+    if not terms:
+        return None
+
+    if db.get_bind().dialect.name == "postgresql":
+        ts_query = " & ".join(f"{term}:*" for term in terms)
+        statement = text(
+            f"SELECT id, ts_rank_cd(search_vector, query) AS rank "
+            f"FROM {table}, to_tsquery('english', :query) query "
+            f"WHERE search_vector @@ query"
+        ).bindparams(query=ts_query)
+    else:
+        fts = f"{table}_fts"
+        weights = ", ".join(str(FTS5_WEIGHTS[w]) for w in SEARCHABLE_TABLES[table].values())
+        match = " ".join(f'"{term}"*' for term in terms)
+        # bm25 is lower-is-better, so negate it
+        statement = text(
+            f"SELECT rowid AS id, -bm25({fts}, {weights}) AS rank "
+            f"FROM {fts} WHERE {fts} MATCH :query"
+        ).bindparams(query=match)
+
+    return statement.columns(column("id", Integer), column("rank", Float)).subquery()
+
+
+def search_users(db: Session, query: str, limit: int = 10, role: Optional[str] = None) -> list:
+    """
+    Top matches for a typeahead over name, email, case ID and phone.
+    Returns lightweight rows, best match first: exact matches, then prefix
+    matches (closest in length first), then on PostgreSQL fuzzy trigram
+    matches. Admins are excluded unless role asks for them.
+    """
+    needle = " ".join(query.lower().split())
+    if not needle:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    role_filter = User.role == role if role else User.role != "admin"
+
+    # Candidate ids: the first few prefix matches from each index, in index
+    # order, plus the closest trigram matches on PostgreSQL
+    candidates = []
+    scores = []
+    for expression in USER_SEARCH_EXPRESSIONS.values():
+        value = literal_column(expression, String)
+        prefix_value = literal_column(_prefix_expression(expression, dialect), String)
+        is_prefix = (prefix_value >= needle) & (prefix_value < needle + "\U0010ffff")
+        candidates.append(
+            select(User.id).where(is_prefix, role_filter)
+            .order_by(prefix_value).limit(USER_SEARCH_CANDIDATES).subquery()
+        )
+        # 2 for an exact match, 1 + length coverage for a prefix match
+        scores.append(case(
+            (value == needle, 2.0),
+            (is_prefix, 1.0 + func.length(literal(needle)) * 1.0 / func.length(value)),
+            else_=0.0,
+        ))
+        if dialect == "postgresql":
+            candidates.append(
+                select(User.id).where(value.op("%")(needle), role_filter)
+                .order_by(func.similarity(value, needle).desc()).limit(USER_SEARCH_CANDIDATES).subquery()
+            )
+            scores.append(func.similarity(value, needle))
+
+    candidate_ids = union(*[select(candidate.c.id) for candidate in candidates])
+    rank = func.greatest(*scores) if dialect == "postgresql" else func.max(*scores)
+
+    statement = select(
+        User.id, User.first_name, User.last_name, User.email, User.phone,
+        User.case_id, User.role, User.is_active, User.created_at, rank.label("rank")
+    ).where(User.id.in_(candidate_ids)).order_by(
+        rank.desc(), User.last_name, User.first_name
+    ).limit(limit)
+    return db.execute(statement).all()
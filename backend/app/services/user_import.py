@@ -0,0 +1,304 @@
+"""
+Bulk User Import Service
+Loads cohorts of users from partner-agency spreadsheets (CSV or XLSX)
+"""
+import csv
+import io
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.user import User, UserRole
+from app.models.program import Program, ProgramStatus, Enrollment, EnrollmentStatus
+from app.models.contractor import ContractorOnboarding
+from app.schemas.user import UserImportRow
+from app.services.waitlist_service import join_waitlist
+
+# Below this many passwords, spinning up worker processes costs more than it saves
+PROCESS_POOL_THRESHOLD = 16
+
+# Rows per INSERT statement
+INSERT_BATCH_SIZE = 500
+
+# One pool shared by every import, started on first use. Workers are spawned
+# rather than forked so they never inherit the server's sockets, threads or
+# database connections.
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
+IMPORTABLE_ROLES = {role.value for role in UserRole} - {UserRole.admin.value}
+
+
+class ImportFileError(ValueError):
+    """The uploaded file could not be read as a spreadsheet"""
+
+
+def _normalize_header(header) -> str:
+    return str(header or "").strip().lower().replace(" ", "_")
+
+
+def _clean(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def read_rows(filename: str, content: bytes) -> List[dict]:
+    """Parse a CSV or XLSX upload into a list of dicts keyed by normalized header"""
+    if filename.lower().endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("XLSX import requires openpyxl to be installed")
+        try:
+            workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        except Exception as e:
+            raise ImportFileError(f"Could not read spreadsheet: {e}")
+        sheet_rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalize_header(h) for h in next(sheet_rows, [])]
+        rows = [dict(zip(headers, values)) for values in sheet_rows]
+        workbook.close()
+    else:
+        try:
+            text = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ImportFileError("CSV files must be UTF-8 encoded")
+        reader = csv.DictReader(io.StringIO(text))
+        reader.fieldnames = [_normalize_header(h) for h in (reader.fieldnames or [])]
+        rows = list(reader)
+
+    # Drop blank spreadsheet lines
+    return [
+        {key: _clean(value) for key, value in row.items() if key}
+        for row in rows
+        if any(_clean(value) is not None for value in row.values())
+    ]
+
+
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    """bcrypt is deliberately slow, so large batches are spread across processes"""
+    if len(passwords) < PROCESS_POOL_THRESHOLD:
+        return [get_password_hash(password) for password in passwords]
+    return list(_get_hash_pool().map(get_password_hash, passwords, chunksize=8))
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=settings.IMPORT_HASH_WORKERS or min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    """Stop the password hashing workers, if any were started"""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(cancel_futures=True)
+            _hash_pool = None
+
+
+def import_users(db: Session, rows: List[dict], dry_run: bool = False) -> dict:
+    """
+    Validate every row up front, then insert the valid ones in batches.
+    Returns a per-row report; row numbers match the spreadsheet (header is row 1).
+    """
+    report = []
+    valid = []
+
+    # Per-row validation
+    for index, raw in enumerate(rows, start=2):
+        entry = {"row": index, "email": raw.get("email"), "status": "error", "errors": []}
+        report.append(entry)
+        try:
+            # Blank cells fall back to the schema defaults
+            row = UserImportRow(**{key: value for key, value in raw.items() if value is not None})
+        except ValidationError as e:
+            entry["errors"] = [
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+                for err in e.errors()
+            ]
+            continue
+        entry["email"] = row.email
+        if row.role not in IMPORTABLE_ROLES:
+            entry["errors"].append(f"role: '{row.role}' cannot be imported")
+            continue
+        valid.append((entry, row))
+
+    # Duplicates within the file
+    seen_emails = {}
+    seen_case_ids = {}
+    for entry, row in valid:
+        email_key = row.email.lower()
+        if email_key in seen_emails:
+            entry["errors"].append(f"email: duplicate of row {seen_emails[email_key]}")
+        else:
+            seen_emails[email_key] = entry["row"]
+        if row.case_id:
+            if row.case_id in seen_case_ids:
+                entry["errors"].append(f"case_id: duplicate of row {seen_case_ids[row.case_id]}")
+            else:
+                seen_case_ids[row.case_id] = entry["row"]
+
+    # Duplicates against the database, in one query
+    taken_emails = set()
+    taken_case_ids = set()
+    if seen_emails or seen_case_ids:
+        conditions = []
+        if seen_emails:
+            conditions.append(func.lower(User.email).in_(list(seen_emails)))
+        if seen_case_ids:
+            conditions.append(User.case_id.in_(list(seen_case_ids)))
+        for email, case_id in db.query(User.email, User.case_id).filter(or_(*conditions)):
+            taken_emails.add(email.lower())
+            if case_id:
+                taken_case_ids.add(case_id)
+
+    # Program references, in one query
+    program_ids = {row.program_id for _, row in valid if row.program_id}
+    known_programs = {}
+    if program_ids:
+        known_programs = {
+            program_id: (spots, status)
+            for program_id, spots, status in db.query(
+                Program.id, Program.spots_available, Program.status
+            ).filter(Program.id.in_(program_ids))
+        }
+
+    for entry, row in valid:
+        if row.email.lower() in taken_emails:
+            entry["errors"].append("email: already registered")
+        if row.case_id and row.case_id in taken_case_ids:
+            entry["errors"].append("case_id: already in use")
+        if row.program_id and row.program_id not in known_programs:
+            entry["errors"].append(f"program_id: program {row.program_id} not found")
+
+    valid = [(entry, row) for entry, row in valid if not entry["errors"]]
+
+    if dry_run:
+        spots = {program_id: available or 0 for program_id, (available, _) in known_programs.items()}
+        for entry, row in valid:
+            entry["status"] = "valid"
+            if row.program_id:
+                # Seats go to rows in file order; the rest would be waitlisted,
+                # unless the program is not open to join its waitlist
+                if spots[row.program_id] > 0:
+                    entry["enrollment"] = "active"
+                elif known_programs[row.program_id][1] == ProgramStatus.open.value:
+                    entry["enrollment"] = "waitlisted"
+                else:
+                    entry["enrollment"] = "full"
+                spots[row.program_id] -= 1
+        return _summarize(report)
+
+    # Accounts without a password get a one-time temporary password
+    passwords = []
+    for entry, row in valid:
+        if row.password:
+            passwords.append(row.password)
+        else:
+            temporary = secrets.token_urlsafe(9)
+            entry["temporary_password"] = temporary
+            passwords.append(temporary)
+    hashes = _hash_passwords(passwords)
+
+    user_values = []
+    for (entry, row), hashed_password in zip(valid, hashes):
+        values = row.model_dump(exclude={"password", "program_id"})
+        values["hashed_password"] = hashed_password
+        values["is_active"] = True
+        user_values.append(values)
+
+    # Batched multi-row INSERT ... RETURNING for the users themselves
+    user_ids = []
+    for start in range(0, len(user_values), INSERT_BATCH_SIZE):
+        user_ids.extend(db.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            user_values[start:start + INSERT_BATCH_SIZE]
+        ).scalars())
+
+    onboarding_values = []
+    enrollments = {}
+    for (entry, row), user_id in zip(valid, user_ids):
+        entry["user_id"] = user_id
+        entry["status"] = "created"
+        if row.role == UserRole.contractor.value:
+            onboarding_values.append({
+                "user_id": user_id,
+                "onboarding_status": "pending",
+                "documents_complete": False,
+                "training_complete": False,
+                "ready_for_assignment": False,
+            })
+        if row.program_id:
+            enrollments.setdefault(row.program_id, []).append((entry, user_id))
+
+    enrollment_values = _claim_seats(db, enrollments)
+
+    for model, values in ((ContractorOnboarding, onboarding_values), (Enrollment, enrollment_values)):
+        for start in range(0, len(values), INSERT_BATCH_SIZE):
+            db.execute(insert(model), values[start:start + INSERT_BATCH_SIZE])
+
+    db.commit()
+    return _summarize(report)
+
+
+def _claim_seats(db: Session, enrollments: dict) -> List[dict]:
+    """
+    Take seats for imported enrollments, in file order, the way enrolling
+    does: under the program row's lock and never below zero. Users beyond a
+    program's capacity join its waitlist instead. Returns the enrollments to
+    insert.
+    """
+    values = []
+    for program_id, entries in enrollments.items():
+        spots = db.execute(
+            select(Program.spots_available).where(Program.id == program_id).with_for_update()
+        ).scalar()
+        granted = max(0, min(spots or 0, len(entries)))
+        if granted:
+            db.execute(
+                update(Program).where(Program.id == program_id).values(
+                    spots_available=Program.spots_available - granted
+                ).execution_options(synchronize_session=False)
+            )
+        for index, (entry, user_id) in enumerate(entries):
+            if index < granted:
+                entry["enrollment"] = "active"
+                values.append({
+                    "student_id": user_id,
+                    "program_id": program_id,
+                    "status": EnrollmentStatus.active.value,
+                    "hours_completed": 0,
+                })
+            elif join_waitlist(db, program_id, user_id) is not None:
+                entry["enrollment"] = "waitlisted"
+            else:
+                entry["enrollment"] = "full"
+    return values
+
+
+def _summarize(report: List[dict]) -> dict:
+    failed = sum(1 for entry in report if entry["status"] == "error")
+    return {
+        "total_rows": len(report),
+        "created": sum(1 for entry in report if entry["status"] == "created"),
+        "failed": failed,
+        "rows": report,
+    }
@@ -0,0 +1,134 @@
+"""
+Waitlist Service
+Per-program queues for full programs, promoted into enrollments as seats open.
+
+Entries of a program always hold the contiguous sequences
+[program.waitlist_head, program.waitlist_tail), so a position is simple
+arithmetic and the queue length is tail - head. Every operation touches the
+program row first, which serializes changes to one program's seats and queue.
+Changes are left for the caller to commit.
+"""
+from typing import List, Optional
+
+from sqlalchemy import select, update, insert, delete, func
+from sqlalchemy.orm import Session
+
+from app.models.program import Program, Enrollment, WaitlistEntry, ProgramStatus, EnrollmentStatus
+
+
+def join_waitlist(db: Session, program_id: int, student_id: int) -> Optional[int]:
+    """
+    Append the student to the program's queue and return their sequence, or
+    None if the program is not open. A student already on the queue raises
+    IntegrityError from the unique constraint.
+    """
+    tail = db.execute(
+        update(Program).where(
+            Program.id == program_id,
+            Program.status == ProgramStatus.open.value
+        ).values(
+            waitlist_tail=Program.waitlist_tail + 1
+        ).returning(Program.waitlist_tail).execution_options(synchronize_session=False)
+    ).scalar()
+    if tail is None:
+        return None
+
+    sequence = tail - 1
+    db.execute(insert(WaitlistEntry).values(
+        program_id=program_id,
+        student_id=student_id,
+        sequence=sequence
+    ))
+    return sequence
+
+
+def leave_waitlist(db: Session, program_id: int, student_id: int) -> bool:
+    """Remove the student from the queue, closing the gap behind them"""
+    db.execute(select(Program.id).where(Program.id == program_id).with_for_update())
+
+    sequence = db.execute(
+        delete(WaitlistEntry).where(
+            WaitlistEntry.program_id == program_id,
+            WaitlistEntry.student_id == student_id
+        ).returning(WaitlistEntry.sequence).execution_options(synchronize_session=False)
+    ).scalar()
+    if sequence is None:
+        return False
+
+    db.execute(
+        update(WaitlistEntry).where(
+            WaitlistEntry.program_id == program_id,
+            WaitlistEntry.sequence > sequence
+        ).values(sequence=WaitlistEntry.sequence - 1).execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(Program).where(Program.id == program_id).values(
+            waitlist_tail=Program.waitlist_tail - 1
+        ).execution_options(synchronize_session=False)
+    )
+    return True
+
+
+def promote_waitlist(db: Session, program_id: int) -> List[int]:
+    """
+    Move people from the front of the queue into pending enrollments while
+    the program is open and has spots. Returns the promoted student ids.
+    """
+    promoted = []
+    while True:
+        # Claim a seat and the head of the queue together
+        head = db.execute(
+            update(Program).where(
+                Program.id == program_id,
+                Program.status == ProgramStatus.open.value,
+                Program.spots_available > 0,
+                Program.waitlist_head < Program.waitlist_tail
+            ).values(
+                spots_available=Program.spots_available - 1,
+                waitlist_head=Program.waitlist_head + 1
+            ).returning(Program.waitlist_head).execution_options(synchronize_session=False)
+        ).scalar()
+        if head is None:
+            break
+
+        student_id = db.execute(
+            delete(WaitlistEntry).where(
+                WaitlistEntry.program_id == program_id,
+                WaitlistEntry.sequence == head - 1
+            ).returning(WaitlistEntry.student_id).execution_options(synchronize_session=False)
+        ).scalar_one()
+
+        current = db.execute(
+            select(Enrollment.status).where(
+                Enrollment.student_id == student_id,
+                Enrollment.program_id == program_id
+            )
+        ).scalar()
+        if current is None:
+            db.execute(insert(Enrollment).values(
+                student_id=student_id,
+                program_id=program_id,
+                status=EnrollmentStatus.pending.value
+            ))
+        elif current == EnrollmentStatus.withdrawn.value:
+            db.execute(
+                update(Enrollment).where(
+                    Enrollment.student_id == student_id,
+                    Enrollment.program_id == program_id
+                ).values(
+                    status=EnrollmentStatus.pending.value,
+                    enrolled_at=func.now(),
+                    completed_at=None
+                ).execution_options(synchronize_session=False)
+            )
+        else:
+            # Already holds a seat; hand this one to the next person
+            db.execute(
+                update(Program).where(Program.id == program_id).values(
+                    spots_available=Program.spots_available + 1
+                ).execution_options(synchronize_session=False)
+            )
+            continue
+        promoted.append(student_id)
+
+    return promoted
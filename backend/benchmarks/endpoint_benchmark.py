@@ -0,0 +1,337 @@
+"""
+Endpoint benchmark suite.
+Drives the read endpoints of every router (auth, dashboard, timesheets,
+documents, programs, opportunities, learning, users) through the ASGI app
+in process, or against a running server with --url. For each endpoint and
+concurrency level it reports throughput and p50/p95/p99 latency.
+
+Results are written as JSON (--output). Pass a saved result as --baseline
+to compare: an endpoint regresses when its p95 grows, or its throughput
+drops, by more than --threshold (a fraction, 0.2 = 20%). The exit status is
+1 when anything regressed, so the suite can gate a change.
+
+Usage:
+    python benchmarks/generate_dataset.py --users 20000 --database-url sqlite:///./bench.db --reset
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/endpoint_benchmark.py \\
+        [--concurrency 1,8,32] [--requests 200] [--only timesheets,documents] \\
+        [--output results.json] [--baseline baseline.json] [--threshold 0.2] [--url http://127.0.0.1:8000]
+
+Sample users and ids are read from DATABASE_URL, which must be the database
+the app (or the server at --url) uses; tokens are signed with SECRET_KEY,
+which the server must share. Every endpoint is a read. Login checks the
+sampled users' password, --password, which defaults to the generator's.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.security import create_access_token
+from app.models.user import User, UserRole
+from app.models.timesheet import Timesheet
+from app.models.program import Program, Enrollment
+from app.models.document import Document
+
+PARTICIPANT_ROLES = [UserRole.wble_participant.value, UserRole.ttw_participant.value]
+
+# Users sampled per role; requests rotate through them so no single row stays hot
+SAMPLE_USERS = 50
+
+
+@dataclass
+class Endpoint:
+    group: str  # Router, for --only
+    path: str  # Formatted with the sample context, e.g. {timesheet_id}
+    role: str = "participant"  # participant, admin or none
+    method: str = "GET"
+    form: Optional[dict] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+ENDPOINTS = [
+    Endpoint("auth", "/auth/login", role="none", method="POST",
+             form={"username": "{email}", "password": "{password}"}),
+    Endpoint("auth", "/auth/me"),
+    Endpoint("dashboard", "/dashboard/student"),
+    Endpoint("dashboard", "/dashboard/admin", role="admin"),
+    Endpoint("dashboard", "/dashboard/admin/sga", role="admin"),
+    Endpoint("timesheets", "/timesheets/"),
+    Endpoint("timesheets", "/timesheets/{timesheet_id}"),
+    Endpoint("timesheets", "/timesheets/?status=submitted", role="admin"),
+    Endpoint("timesheets", "/timesheets/pending", role="admin"),
+    Endpoint("documents", "/documents/"),
+    Endpoint("documents", "/documents/pending", role="admin"),
+    Endpoint("programs", "/programs/"),
+    Endpoint("programs", "/programs/available"),
+    Endpoint("programs", "/programs/search?q=skills"),
+    Endpoint("programs", "/programs/{program_id}"),
+    Endpoint("programs", "/programs/enrollments/my"),
+    Endpoint("opportunities", "/opportunities/"),
+    Endpoint("opportunities", "/opportunities/featured"),
+    Endpoint("opportunities", "/opportunities/recommended"),
+    Endpoint("opportunities", "/opportunities/search?q=retail"),
+    Endpoint("learning", "/learning/progress"),
+    Endpoint("learning", "/learning/summary"),
+    Endpoint("learning", "/learning/lessons"),
+    Endpoint("learning", "/learning/announcements"),
+    Endpoint("learning", "/learning/analytics/funnel", role="admin"),
+    Endpoint("learning", "/learning/analytics/completion-rates?group_by=role", role="admin"),
+    Endpoint("users", "/users/?limit=50", role="admin"),
+    Endpoint("users", "/users/search?q=mar", role="admin"),
+    Endpoint("users", "/users/{student_id}", role="admin"),
+    Endpoint("users", "/users/students/{student_id}/profile", role="admin"),
+]
+
+
+@dataclass
+class Sample:
+    """One signed-in user and the ids their requests refer to"""
+    headers: dict
+    context: dict = field(default_factory=dict)
+
+
+def load_samples(seed: int, password: str) -> Dict[str, List[Sample]]:
+    """Participants with timesheets, admins, and anonymous callers, from DATABASE_URL"""
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        participants = db.execute(
+            select(User.id, User.email, func.max(Timesheet.id))
+            .join(Timesheet, Timesheet.student_id == User.id)
+            .where(User.role.in_(PARTICIPANT_ROLES), User.is_active == True)
+            .group_by(User.id, User.email)
+            .order_by(User.id)
+            .limit(SAMPLE_USERS * 20)
+        ).all()
+        admins = db.execute(
+            select(User.id).where(User.role == UserRole.admin.value, User.is_active == True).limit(SAMPLE_USERS)
+        ).scalars().all()
+        program_ids = db.execute(select(Program.id).limit(1000)).scalars().all()
+        enrolled = set(db.execute(select(Enrollment.student_id)).scalars())
+        has_documents = db.execute(select(func.count(Document.id))).scalar()
+    finally:
+        db.close()
+
+    if not participants or not admins or not program_ids:
+        raise SystemExit(
+            "The database needs participants with timesheets, an admin and programs; "
+            "create them with benchmarks/generate_dataset.py"
+        )
+    if not has_documents:
+        print("warning: no documents in the database")
+
+    participants = rng.sample(participants, min(SAMPLE_USERS, len(participants)))
+    # Prefer enrolled participants, as the dashboards are mostly opened by them
+    participants.sort(key=lambda row: row[0] not in enrolled)
+
+    def context(user_id: int, email: str, timesheet_id: int) -> dict:
+        return {
+            "user_id": user_id, "email": email, "password": password, "timesheet_id": timesheet_id,
+            "program_id": rng.choice(program_ids), "student_id": user_id,
+        }
+
+    participant_samples = [
+        Sample({"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"},
+               context(user_id, email, timesheet_id))
+        for user_id, email, timesheet_id in participants
+    ]
+    admin_samples = [
+        Sample({"Authorization": f"Bearer {create_access_token(data={'sub': str(admin_id)})}"},
+               dict(rng.choice(participant_samples).context))
+        for admin_id in admins
+    ]
+    return {
+        "participant": participant_samples,
+        "admin": admin_samples,
+        "none": [Sample({}, sample.context) for sample in participant_samples],
+    }
+
+
+def percentile(sorted_timings: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, min(len(sorted_timings) - 1, int(round(fraction * len(sorted_timings) + 0.5)) - 1))
+    return sorted_timings[index]
+
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, samples: List[Sample],
+                       concurrency: int, requests: int, warmup: int) -> dict:
+    """Send `requests` calls from `concurrency` concurrent workers"""
+    async def call(index: int) -> tuple:
+        sample = samples[index % len(samples)]
+        url = settings.API_V1_PREFIX + endpoint.path.format(**sample.context)
+        form = {key: value.format(**sample.context) for key, value in (endpoint.form or {}).items()}
+        started = time.perf_counter()
+        response = await client.request(endpoint.method, url, headers=sample.headers, data=form or None)
+        return time.perf_counter() - started, response.status_code
+
+    for index in range(warmup):
+        await call(index)
+
+    timings, errors, statuses = [], 0, {}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            elapsed, status_code = await call(index)
+            timings.append(elapsed * 1000)
+            if status_code >= 400:
+                errors += 1
+                statuses[status_code] = statuses.get(status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "error_statuses": statuses,
+        "throughput": round(len(timings) / wall, 2),
+        "p50_ms": round(percentile(timings, 0.50), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+        "p99_ms": round(percentile(timings, 0.99), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+    }
+
+
+async def run_suite(args, endpoints: List[Endpoint], samples: Dict[str, List[Sample]]) -> dict:
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120)
+        lifespan = None
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://benchmark",
+                                   limits=limits, timeout=120)
+        # Run startup as a server would, so hooks and background tasks are live
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    results = {}
+    try:
+        async with client:
+            for endpoint in endpoints:
+                results[endpoint.name] = {}
+                for concurrency in args.concurrency:
+                    row = await run_endpoint(
+                        client, endpoint, samples[endpoint.role], concurrency, args.requests, args.warmup
+                    )
+                    results[endpoint.name][str(concurrency)] = row
+                    print(f"{endpoint.name:<55} c={concurrency:<4} {row['throughput']:>9.1f} req/s  "
+                          f"p50 {row['p50_ms']:>8.2f}  p95 {row['p95_ms']:>8.2f}  p99 {row['p99_ms']:>8.2f} ms"
+                          + (f"  errors {row['errors']} {row['error_statuses']}" if row["errors"] else ""))
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Regressions against a baseline: slower p95 or lower throughput beyond the threshold"""
+    regressions = []
+    for name, levels in results.items():
+        for concurrency, row in levels.items():
+            before = baseline.get("results", {}).get(name, {}).get(concurrency)
+            if before is None:
+                continue
+            if row["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{name} c={concurrency}: p95 {before['p95_ms']:.2f} -> {row['p95_ms']:.2f} ms "
+                    f"(+{(row['p95_ms'] / before['p95_ms'] - 1) * 100:.0f}%)"
+                )
+            if row["throughput"] < before["throughput"] * (1 - threshold):
+                regressions.append(
+                    f"{name} c={concurrency}: throughput {before['throughput']:.1f} -> {row['throughput']:.1f} req/s "
+                    f"(-{(1 - row['throughput'] / before['throughput']) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def dataset_summary() -> dict:
+    db = SessionLocal()
+    try:
+        return {
+            model.__tablename__: db.execute(select(func.count()).select_from(model)).scalar()
+            for model in (User, Timesheet, Document, Program, Enrollment)
+        }
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")],
+                        default=[1, 8, 32], help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and level")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", help="Comma-separated routers to run, e.g. timesheets,documents")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--password", default="benchmark123", help="Password of the sampled users, for login")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier with --output")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown as a fraction")
+    args = parser.parse_args()
+
+    endpoints = ENDPOINTS
+    if args.only:
+        groups = set(args.only.split(","))
+        endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.group in groups]
+
+    samples = load_samples(args.seed, args.password)
+    meta = {
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "target": args.url or "asgi",
+        "database": engine.dialect.name,
+        "dataset": dataset_summary(),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    print(f"{len(endpoints)} endpoints on {meta['target']} ({meta['database']}), dataset {meta['dataset']}\n")
+
+    results = asyncio.run(run_suite(args, endpoints, samples))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("  no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Load test for enrollment under a registration burst.
+Creates one open program and a cohort of users, fires concurrent
+POST /programs/{id}/enroll requests through the app, then checks that no
+seat was oversold and no one was enrolled twice.
+
+Usage:
+    python benchmarks/enrollment_load_test.py [--users 400] [--spots 50] [--workers 32] [--repeat 2]
+
+Runs against DATABASE_URL; use PostgreSQL to exercise real row locking.
+The program and users it creates are removed afterwards.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, delete, func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal, create_tables
+from app.core.security import create_access_token
+from app.main import app
+from app.models.user import User, UserRole
+from app.models.program import Program, Enrollment, ProgramStatus
+
+
+def setup(db, users: int, spots: int):
+    tag = uuid.uuid4().hex[:8]
+    program_id = db.execute(insert(Program).values(
+        name=f"Load test {tag}",
+        organization="Load Test",
+        start_date=date.today(),
+        end_date=date.today() + timedelta(days=30),
+        spots_available=spots,
+        status=ProgramStatus.open.value,
+    ).returning(Program.id)).scalar_one()
+    user_ids = list(db.execute(insert(User).returning(User.id), [
+        {
+            "email": f"load-{tag}-{i}@example.org",
+            "hashed_password": "x",
+            "first_name": "Load",
+            "last_name": f"Test {i}",
+            "role": UserRole.wble_participant.value,
+            "is_active": True,
+        }
+        for i in range(users)
+    ]).scalars())
+    db.commit()
+    return program_id, user_ids
+
+
+def teardown(db, program_id: int, user_ids: list):
+    db.execute(delete(Enrollment).where(Enrollment.program_id == program_id))
+    db.execute(delete(Program).where(Program.id == program_id))
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=400)
+    parser.add_argument("--spots", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=2, help="requests per user, to provoke duplicates")
+    args = parser.parse_args()
+
+    create_tables()
+    db = SessionLocal()
+    program_id, user_ids = setup(db, args.users, args.spots)
+    headers = [
+        {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+        for user_id in user_ids
+    ]
+    requests = headers * args.repeat
+
+    client = TestClient(app)
+    url = f"{settings.API_V1_PREFIX}/programs/{program_id}/enroll"
+
+    def enroll(request_headers):
+        response = client.post(url, headers=request_headers)
+        return response.status_code, response.json().get("detail")
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            outcomes = Counter(executor.map(enroll, requests))
+        elapsed = time.perf_counter() - start
+
+        db.expire_all()
+        spots_left = db.execute(select(Program.spots_available).where(Program.id == program_id)).scalar_one()
+        enrolled = db.execute(
+            select(func.count()).select_from(Enrollment).where(Enrollment.program_id == program_id)
+        ).scalar_one()
+        distinct_students = db.execute(
+            select(func.count(func.distinct(Enrollment.student_id))).where(Enrollment.program_id == program_id)
+        ).scalar_one()
+    finally:
+        teardown(db, program_id, user_ids)
+        db.close()
+
+    print(f"{len(requests)} enroll requests from {args.users} users for {args.spots} spots "
+          f"on {args.workers} workers")
+    for (code, detail), count in sorted(outcomes.items(), key=lambda item: str(item[0])):
+        print(f"  {code} {detail or 'enrolled'}: {count}")
+    print(f"throughput: {len(requests) / elapsed:8.1f} requests/s ({elapsed:.2f} s)")
+    print(f"enrolled: {enrolled}, spots left: {spots_left}")
+
+    expected = min(args.users, args.spots)
+    assert enrolled == expected, f"expected {expected} enrollments, found {enrolled}"
+    assert distinct_students == enrolled, "a student was enrolled twice"
+    assert spots_left == args.spots - enrolled, "spots_available does not match enrollments"
+    assert outcomes[(200, None)] == enrolled, "successful responses do not match enrollments"
+    print("OK: no oversold seats and no duplicate enrollments")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,572 @@
+"""
+Synthetic data generator for benchmarks.
+Builds a realistic dataset at any scale: users in all five roles, programs
+and enrollments, weekly timesheets with daily entries, the documents each
+role requires, learning progress, and the rollups derived from them
+(lesson completion bitmaps, daily learning rollups, monthly earnings).
+
+The same --seed and arguments against an empty database produce the same
+rows, apart from password salts and server-default timestamps. Dates are
+relative to --today, so pin it as well to reproduce a dataset exactly.
+
+Rows are written with COPY on PostgreSQL and batched executemany inserts on
+SQLite. IDs are assigned here, after the existing maximum, so a run can add
+to a database that already has data. Enrollments are drawn against each
+program's capacity before programs are written, so spots_available is the
+capacity left after the seats pending and active enrollments hold.
+
+Generated users all share one password (--password); the first one created
+is an admin.
+
+Usage:
+    python benchmarks/generate_dataset.py [--users 1000] [--weeks 4] [--seed 42]
+        [--database-url sqlite:///./bench.db] [--reset]
+
+--database-url defaults to DATABASE_URL. --reset drops and recreates every
+table first.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+from array import array
+from collections import Counter
+from datetime import date, datetime, time as clock, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.security import get_password_hash
+from app.models.user import User, UserRole, EmploymentType
+from app.models.program import Program, Enrollment, ProgramStatus, EnrollmentStatus
+from app.models.timesheet import Timesheet, TimesheetEntry, TimesheetStatus
+from app.models.document import Document, DocumentStatus, REQUIRED_DOCUMENTS
+from app.models.learning import Lesson, LearningProgress, LessonCompletion, LearningDailyRollup
+from app.models.earnings import MonthlyEarnings
+from app.services.earnings_service import apply_timesheet_earnings
+from app.services.lesson_service import DEFAULT_LESSONS, seed_lesson_catalog
+from app.services.search_service import ensure_search_indexes
+
+ROLE_WEIGHTS = {
+    UserRole.wble_participant.value: 45,
+    UserRole.ttw_participant.value: 25,
+    UserRole.contractor.value: 15,
+    UserRole.employee.value: 13,
+    UserRole.admin.value: 2,
+}
+ROLES = list(ROLE_WEIGHTS)
+PARTICIPANT_ROLES = {UserRole.wble_participant.value, UserRole.ttw_participant.value}
+TIMESHEET_ROLES = PARTICIPANT_ROLES | {UserRole.contractor.value}
+
+FIRST_NAMES = [
+    "James", "Maria", "John", "Emily", "Marcus", "Sarah", "David", "Aisha", "Carlos", "Mei",
+    "Robert", "Priya", "Michael", "Fatima", "William", "Sofia", "Daniel", "Grace", "Jose", "Hannah",
+    "Anthony", "Olivia", "Kevin", "Chloe", "Brian", "Zoe", "Luis", "Nora", "Andre", "Lily",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Chen",
+]
+ORGANIZATIONS = [
+    "TechCorp Solutions Inc.", "Community Health Partners", "Riverside Logistics", "Greenfield Retail Group",
+    "Metro Public Library", "Harbor Hospitality", "Summit Manufacturing", "City Parks Department",
+]
+TRACKS = ["Summer Internship", "Job Readiness", "Retail Skills", "Healthcare Support", "Warehouse Operations",
+          "Customer Service", "Office Skills", "Hospitality"]
+DEPARTMENTS = ["Operations", "Finance", "Programs", "Outreach", "Human Resources"]
+
+LESSON_IDS = [lesson["id"] for lesson in DEFAULT_LESSONS]
+
+
+def _weighted(rng: random.Random, choices: dict):
+    return rng.choices(list(choices), weights=list(choices.values()))[0]
+
+
+def _moment(day: date, rng: random.Random) -> datetime:
+    """A time during the working day; random() is several times cheaper than randint()"""
+    return datetime.combine(day, clock(8)) + timedelta(seconds=int(rng.random() * 36000))
+
+
+class Loader:
+    """Streams rows into tables: COPY on PostgreSQL, batched executemany otherwise"""
+
+    def __init__(self, engine, batch_size: int):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.counts = Counter()
+
+    def next_id(self, model) -> int:
+        with self.engine.connect() as conn:
+            return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def load(self, model, columns: list, rows) -> int:
+        table = model.__table__
+        loaded = 0
+        batch = []
+        with self.engine.begin() as conn:
+            for row in rows:
+                batch.append(row)
+                if len(batch) == self.batch_size:
+                    self._write(conn, table, columns, batch)
+                    loaded += len(batch)
+                    batch = []
+            if batch:
+                self._write(conn, table, columns, batch)
+                loaded += len(batch)
+        self.counts[table.name] += loaded
+        return loaded
+
+    def _write(self, conn, table, columns: list, batch: list) -> None:
+        if conn.dialect.name == "postgresql":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                writer.writerow([
+                    "\\x" + value.hex() if isinstance(value, bytes) else value for value in row
+                ])
+            buffer.seek(0)
+            with conn.connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+        elif conn.dialect.name == "sqlite":
+            # The column types' own conversions, so values are stored as the ORM stores them
+            processors = [
+                table.c[name].type.dialect_impl(conn.dialect).bind_processor(conn.dialect) for name in columns
+            ]
+            if any(processors):
+                batch = [
+                    tuple(value if process is None else process(value) for process, value in zip(processors, row))
+                    for row in batch
+                ]
+            placeholders = ", ".join("?" for _ in columns)
+            conn.exec_driver_sql(f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})", batch)
+        else:
+            conn.execute(insert(table), [dict(zip(columns, row)) for row in batch])
+
+    def reset_sequences(self, models) -> None:
+        """Move PostgreSQL id sequences past ids assigned explicitly"""
+        if self.engine.dialect.name != "postgresql":
+            return
+        with self.engine.begin() as conn:
+            for model in models:
+                name = model.__tablename__
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE(MAX(id), 1)) FROM {name}"
+                ))
+
+
+class Dataset:
+    """Generates the rows, phase by phase so parents are loaded before children"""
+
+    def __init__(self, loader: Loader, users: int, weeks: int, seed: int, today: date, password: str):
+        self.loader = loader
+        self.users = users
+        self.weeks = weeks
+        self.rng = random.Random(seed)
+        self.today = today
+        self.password_hash = get_password_hash(password)
+        self.first_user = loader.next_id(User)
+        # Per generated user, by offset from first_user
+        self.roles = bytearray()
+        self.programs = array("i")  # Current program id, 0 for none
+        self.enrollment_rows = []  # Drawn with the programs, written after them
+        self.admin_ids = []
+        self.approved_timesheets = array("i")
+
+    def user_id(self, offset: int) -> int:
+        return self.first_user + offset
+
+    def generate(self) -> None:
+        for phase in (self.load_users, self.load_programs, self.load_enrollments,
+                      self.load_timesheets, self.load_documents, self.load_learning):
+            started = time.perf_counter()
+            counts = phase()
+            elapsed = time.perf_counter() - started
+            detail = ", ".join(f"{count} {name}" for name, count in counts.items())
+            print(f"  {phase.__name__[5:]:<12} {detail} in {elapsed:.1f}s")
+
+    def load_users(self) -> dict:
+        columns = [
+            "id", "email", "hashed_password", "first_name", "last_name", "phone", "role", "is_active",
+            "created_at", "employment_type", "department", "hourly_rate", "company_start_date",
+            "case_id", "job_title", "sga_monthly_limit",
+        ]
+
+        def rows():
+            rng = self.rng
+            for offset in range(self.users):
+                user_id = self.user_id(offset)
+                role = UserRole.admin.value if offset == 0 else _weighted(rng, ROLE_WEIGHTS)
+                self.roles.append(ROLES.index(role))
+                if role == UserRole.admin.value:
+                    self.admin_ids.append(user_id)
+
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                joined = self.today - timedelta(days=rng.randint(0, 730))
+                rate = None
+                if role == UserRole.contractor.value:
+                    rate = round(rng.uniform(18, 35), 2)
+                elif role in (UserRole.employee.value, UserRole.admin.value):
+                    rate = round(rng.uniform(16, 40), 2)
+                elif rng.random() < 0.7:
+                    rate = round(rng.uniform(12, 20), 2)
+
+                if role in PARTICIPANT_ROLES:
+                    employment_type = EmploymentType.participant.value
+                elif role == UserRole.contractor.value:
+                    employment_type = EmploymentType.c1099.value
+                else:
+                    employment_type = EmploymentType.w2.value
+
+                yield (
+                    user_id,
+                    f"{first.lower()}.{last.lower()}.{user_id}@example.org",
+                    self.password_hash,
+                    first,
+                    last,
+                    f"({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+                    role,
+                    rng.random() > 0.03,
+                    _moment(joined, rng),
+                    employment_type,
+                    rng.choice(DEPARTMENTS) if role in (UserRole.employee.value, UserRole.admin.value) else None,
+                    rate,
+                    joined,
+                    f"CF-{user_id:08d}" if role in PARTICIPANT_ROLES else None,
+                    rng.choice(TRACKS) + " Associate" if role != UserRole.admin.value else "Administrator",
+                    settings.SGA_DEFAULT_MONTHLY_LIMIT if role == UserRole.ttw_participant.value else None,
+                )
+
+        return {"users": self.loader.load(User, columns, rows())}
+
+    def plan_enrollments(self) -> list:
+        """
+        Draw every enrollment against per-program capacities; returns the
+        seats left per program offset. A participant drawn into a full
+        program for a pending or active seat is left unenrolled.
+        """
+        statuses = {EnrollmentStatus.active.value: 70, EnrollmentStatus.completed.value: 15,
+                    EnrollmentStatus.pending.value: 10, EnrollmentStatus.withdrawn.value: 5}
+        rng = self.rng
+        participants = sum(1 for role_index in self.roles if ROLES[role_index] in PARTICIPANT_ROLES)
+        demand = participants * 0.9 * 0.8 / self.program_count  # Held seats per program on average
+        spots = [max(1, round(demand * rng.uniform(0.8, 1.5))) for _ in range(self.program_count)]
+
+        for offset, role_index in enumerate(self.roles):
+            program_id = 0
+            if ROLES[role_index] in PARTICIPANT_ROLES and rng.random() < 0.9:
+                program_offset = rng.randrange(self.program_count)
+                status = _weighted(rng, statuses)
+                enrolled = _moment(self.today - timedelta(days=rng.randint(1, 180)), rng)
+                completed = status == EnrollmentStatus.completed.value
+                holds_seat = status in (EnrollmentStatus.pending.value, EnrollmentStatus.active.value)
+                if not holds_seat or spots[program_offset] > 0:
+                    spots[program_offset] -= holds_seat
+                    program_id = self.first_program + program_offset
+                    self.enrollment_rows.append((
+                        self.user_id(offset),
+                        program_id,
+                        status,
+                        float(rng.randint(0, 320)) if status != EnrollmentStatus.pending.value else 0.0,
+                        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                        enrolled,
+                        enrolled + timedelta(weeks=rng.randint(8, 16)) if completed else None,
+                        f"({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+                    ))
+                if status == EnrollmentStatus.withdrawn.value:
+                    program_id = 0
+            self.programs.append(program_id)
+        return spots
+
+    def load_programs(self) -> dict:
+        self.program_count = max(5, self.users // 200)
+        self.first_program = self.loader.next_id(Program)
+        spots = self.plan_enrollments()
+        statuses = {ProgramStatus.open.value: 30, ProgramStatus.in_progress.value: 50,
+                    ProgramStatus.completed.value: 20}
+        columns = [
+            "id", "name", "description", "organization", "location", "start_date", "end_date",
+            "total_hours", "spots_available", "application_deadline", "status", "created_at",
+            "waitlist_head", "waitlist_tail",
+        ]
+
+        def rows():
+            rng = self.rng
+            for offset in range(self.program_count):
+                status = _weighted(rng, statuses)
+                if status == ProgramStatus.open.value:
+                    start = self.today + timedelta(days=rng.randint(7, 90))
+                elif status == ProgramStatus.in_progress.value:
+                    start = self.today - timedelta(days=rng.randint(7, 60))
+                else:
+                    start = self.today - timedelta(days=rng.randint(120, 365))
+                track = rng.choice(TRACKS)
+                organization = rng.choice(ORGANIZATIONS)
+                yield (
+                    self.first_program + offset,
+                    f"{track} Program {offset + 1}",
+                    f"{track} placement with {organization}: paid work experience with a dedicated mentor.",
+                    organization,
+                    f"{rng.choice(['Downtown', 'Northside', 'Eastside', 'Harbor'])} Campus",
+                    start,
+                    start + timedelta(weeks=rng.choice([8, 10, 12, 16])),
+                    rng.choice([80, 120, 160, 240, 320]),
+                    spots[offset],
+                    start - timedelta(days=14),
+                    status,
+                    _moment(start - timedelta(days=rng.randint(30, 90)), rng),
+                    0,
+                    0,
+                )
+
+        return {"programs": self.loader.load(Program, columns, rows())}
+
+    def load_enrollments(self) -> dict:
+        columns = [
+            "student_id", "program_id", "status", "hours_completed", "supervisor_name",
+            "enrolled_at", "completed_at", "worksite_phone",
+        ]
+        return {"enrollments": self.loader.load(Enrollment, columns, iter(self.enrollment_rows))}
+
+    def load_timesheets(self) -> dict:
+        first_timesheet = self.loader.next_id(Timesheet)
+        this_monday = self.today - timedelta(days=self.today.weekday())
+        entries = []
+        timesheet_columns = [
+            "id", "student_id", "week_start", "week_end", "total_hours", "status", "submitted_at",
+            "reviewed_at", "reviewed_by", "rejection_reason", "created_at", "signature_date",
+        ]
+        entry_columns = [
+            "timesheet_id", "date", "start_time", "end_time", "lunch_out", "lunch_in", "break_minutes", "hours",
+        ]
+
+        def timesheets():
+            rng = self.rng
+            timesheet_id = first_timesheet
+            for offset, role_index in enumerate(self.roles):
+                if ROLES[role_index] not in TIMESHEET_ROLES:
+                    continue
+                for week in range(self.weeks):
+                    if rng.random() > 0.85:
+                        continue
+                    week_start = this_monday - timedelta(weeks=week)
+                    if week == 0:
+                        status = rng.choice([TimesheetStatus.draft.value, TimesheetStatus.submitted.value])
+                    else:
+                        status = _weighted(rng, {TimesheetStatus.approved.value: 85,
+                                                 TimesheetStatus.rejected.value: 5,
+                                                 TimesheetStatus.submitted.value: 10})
+
+                    total = 0.0
+                    for day in sorted(rng.sample(range(5), rng.randint(3, 5))):
+                        hours = rng.randint(8, 32) / 4
+                        start = rng.choice([8, 9, 10])
+                        lunch = hours >= 6
+                        end_minutes = start * 60 + int(hours * 60) + (30 if lunch else 0)
+                        entries.append((
+                            timesheet_id,
+                            week_start + timedelta(days=day),
+                            clock(start),
+                            clock(end_minutes // 60, end_minutes % 60),
+                            clock(12) if lunch else None,
+                            clock(12, 30) if lunch else None,
+                            0,
+                            hours,
+                        ))
+                        total += hours
+
+                    submitted = reviewed = reviewer = None
+                    if status != TimesheetStatus.draft.value:
+                        submitted = _moment(week_start + timedelta(days=rng.randint(4, 6)), rng)
+                    if status in (TimesheetStatus.approved.value, TimesheetStatus.rejected.value):
+                        reviewed = submitted + timedelta(hours=rng.randint(2, 72))
+                        reviewer = rng.choice(self.admin_ids)
+                    if status == TimesheetStatus.approved.value:
+                        self.approved_timesheets.append(timesheet_id)
+                    yield (
+                        timesheet_id,
+                        self.user_id(offset),
+                        week_start,
+                        week_start + timedelta(days=6),
+                        total,
+                        status,
+                        submitted,
+                        reviewed,
+                        reviewer,
+                        "Hours do not match the schedule" if status == TimesheetStatus.rejected.value else None,
+                        _moment(week_start, rng),
+                        submitted.date() if submitted else None,
+                    )
+                    timesheet_id += 1
+
+        # Entries reference their timesheets, so each batch of timesheets is
+        # written before the entries generated with it
+        timesheet_total = entry_total = 0
+        batch = []
+        for row in timesheets():
+            batch.append(row)
+            if len(batch) == self.loader.batch_size:
+                timesheet_total += self.loader.load(Timesheet, timesheet_columns, batch)
+                entry_total += self.loader.load(TimesheetEntry, entry_columns, entries)
+                batch = []
+                entries.clear()
+        if batch:
+            timesheet_total += self.loader.load(Timesheet, timesheet_columns, batch)
+            entry_total += self.loader.load(TimesheetEntry, entry_columns, entries)
+            entries.clear()
+
+        earnings = self.load_earnings()
+        return {"timesheets": timesheet_total, "entries": entry_total, "monthly earnings": earnings}
+
+    def load_earnings(self) -> int:
+        """Roll approved hours into monthly_earnings with the same code reviews use"""
+        db = sessionmaker(bind=self.loader.engine)()
+        try:
+            for start in range(0, len(self.approved_timesheets), 5000):
+                apply_timesheet_earnings(db, self.approved_timesheets[start:start + 5000])
+            db.commit()
+            return db.query(func.count(MonthlyEarnings.id)).scalar()
+        finally:
+            db.close()
+
+    def load_documents(self) -> dict:
+        statuses = {DocumentStatus.approved.value: 75, DocumentStatus.pending.value: 20,
+                    DocumentStatus.rejected.value: 5}
+        columns = [
+            "student_id", "document_type", "file_name", "file_url", "file_size", "mime_type", "status",
+            "uploaded_at", "reviewed_at", "reviewed_by", "rejection_reason",
+        ]
+
+        def rows():
+            rng = self.rng
+            for offset, role_index in enumerate(self.roles):
+                user_id = self.user_id(offset)
+                for document_type in REQUIRED_DOCUMENTS.get(ROLES[role_index], []):
+                    if rng.random() > 0.9:
+                        continue
+                    status = _weighted(rng, statuses)
+                    uploaded = _moment(self.today - timedelta(days=rng.randint(0, 365)), rng)
+                    reviewed = status != DocumentStatus.pending.value
+                    yield (
+                        user_id,
+                        document_type.value,
+                        f"{document_type.name}.pdf",
+                        f"https://storage.example.org/documents/{user_id}/{document_type.name}.pdf",
+                        rng.randint(40_000, 2_000_000),
+                        "application/pdf",
+                        status,
+                        uploaded,
+                        uploaded + timedelta(hours=rng.randint(1, 96)) if reviewed else None,
+                        rng.choice(self.admin_ids) if reviewed else None,
+                        "Image is unreadable" if status == DocumentStatus.rejected.value else None,
+                    )
+
+        return {"documents": self.loader.load(Document, columns, rows())}
+
+    def load_learning(self) -> dict:
+        db = sessionmaker(bind=self.loader.engine)()
+        try:
+            seed_lesson_catalog(db)
+        finally:
+            db.close()
+
+        bitmaps = []
+        rollups = Counter()
+        progress_columns = ["student_id", "lesson_id", "completed", "completed_at", "created_at"]
+
+        def rows():
+            rng = self.rng
+            for offset, role_index in enumerate(self.roles):
+                role = ROLES[role_index]
+                if role == UserRole.admin.value or rng.random() > 0.7:
+                    continue
+                user_id = self.user_id(offset)
+                # Learners work through the catalog in order, so later lessons thin out
+                started = rng.randint(1, len(LESSON_IDS))
+                completed = rng.randint(0, started)
+                day = self.today - timedelta(days=rng.randint(0, 90))
+                bits = 0
+                for position, lesson_id in enumerate(LESSON_IDS[:started]):
+                    created = _moment(day, rng)
+                    if position < completed:
+                        completed_at = created + timedelta(minutes=rng.randint(3, 30))
+                        bits |= 1 << lesson_id
+                        rollups[(completed_at.date(), lesson_id, role, self.programs[offset])] += 1
+                        yield (user_id, lesson_id, True, completed_at, created)
+                    else:
+                        yield (user_id, lesson_id, False, None, created)
+                    day = min(day + timedelta(days=rng.randint(0, 3)), self.today)
+                if bits:
+                    bitmaps.append((user_id, bits.to_bytes((bits.bit_length() + 7) // 8, "little"), self.today))
+
+        progress = self.loader.load(LearningProgress, progress_columns, rows())
+        completions = self.loader.load(
+            LessonCompletion, ["user_id", "completed_bits", "updated_at"], bitmaps
+        )
+        # Same shape as migrations/backfill_learning_rollups.py
+        rollup_rows = self.loader.load(
+            LearningDailyRollup,
+            ["day", "lesson_id", "role", "program_id", "completions", "active_learners"],
+            ((day, lesson_id, role, program_id, count, count)
+             for (day, lesson_id, role, program_id), count in rollups.items())
+        )
+        return {"progress": progress, "completion bitmaps": completions, "rollups": rollup_rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--weeks", type=int, default=4, help="Weeks of timesheets per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today(),
+                        help="Date the data is generated relative to (YYYY-MM-DD)")
+    parser.add_argument("--password", default="benchmark123", help="Password of every generated user")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql://", 1)
+    engine = create_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        # Bulk load speed; a generated dataset can simply be regenerated
+        @event.listens_for(engine, "connect")
+        def _fast_sqlite(connection, record):
+            connection.execute("PRAGMA synchronous = OFF")
+            connection.execute("PRAGMA journal_mode = MEMORY")
+
+    if args.reset:
+        print("Dropping all tables...")
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    ensure_search_indexes(engine)
+
+    print(f"Generating {args.users} users, {args.weeks} week(s) of timesheets, seed {args.seed}")
+    started = time.perf_counter()
+    loader = Loader(engine, args.batch_size)
+    Dataset(loader, args.users, args.weeks, args.seed, args.today, args.password).generate()
+    loader.reset_sequences([User, Program, Timesheet, Lesson])
+
+    # Fresh planner statistics, so benchmarks see the plans production would
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    elapsed = time.perf_counter() - started
+    total = sum(loader.counts.values())
+    print(f"\n{total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for the learning analytics reports.
+Loads a year of daily rollups for many programs into a scratch database,
+the shape millions of progress writes fold into, and reports latency of the
+funnel and completion-rate queries for common filters.
+
+Usage:
+    python benchmarks/learning_analytics_benchmark.py [--days 365] [--programs 50] [--database-url sqlite://]
+
+Point --database-url at an empty PostgreSQL database to measure it there;
+the tables are created there and left in place.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.learning import LearningDailyRollup
+from app.services.lesson_service import DEFAULT_LESSONS, seed_lesson_catalog
+from app.services.learning_analytics_service import lesson_funnel, completion_rates
+
+ROLES = ["wble_participant", "ttw_participant", "contractor", "employee"]
+
+
+def load(session, days: int, programs: int, batch: int = 10000) -> tuple:
+    rng = random.Random(42)
+    today = date.today()
+    rows, total, progress = [], 0, 0
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        for lesson in DEFAULT_LESSONS:
+            for role in ROLES:
+                for program_id in range(programs + 1):
+                    learners = rng.randint(0, 20)
+                    completions = rng.randint(0, learners)
+                    progress += learners
+                    rows.append({
+                        "day": day, "lesson_id": lesson["id"], "role": role, "program_id": program_id,
+                        "completions": completions, "active_learners": learners,
+                    })
+                    if len(rows) == batch:
+                        session.execute(insert(LearningDailyRollup), rows)
+                        total += len(rows)
+                        rows = []
+    if rows:
+        session.execute(insert(LearningDailyRollup), rows)
+        total += len(rows)
+    session.commit()
+    return total, progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--programs", type=int, default=50)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    seed_lesson_catalog(session)
+
+    start = time.perf_counter()
+    rows, progress = load(session, args.days, args.programs)
+    print(f"loaded {rows} rollup rows ({progress} progress writes) in {time.perf_counter() - start:.1f} s")
+
+    today = date.today()
+    scenarios = {
+        "funnel, all time": lambda: lesson_funnel(session),
+        "funnel, one program": lambda: lesson_funnel(session, program_id=7),
+        "funnel, role, last 90 days": lambda: lesson_funnel(
+            session, role="ttw_participant", start=today - timedelta(days=89)
+        ),
+        "rates by lesson, 30 days": lambda: completion_rates(session),
+        "rates by program, 30 days": lambda: completion_rates(session, group_by="program"),
+        "rates by day, one program": lambda: completion_rates(session, group_by="day", program_id=7),
+    }
+
+    print(f"{args.repeat} runs each on {engine.dialect.name}")
+    for name, run in scenarios.items():
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"  {name:28s} p50 {statistics.median(timings):8.2f} ms  max {max(timings):8.2f} ms")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark for the payroll engine at pay-period scale.
+Times compute_payroll on synthetic entries (no database) against a
+straightforward per-row Python loop doing the same aggregation.
+
+Usage:
+    python benchmarks/payroll_benchmark.py [--people 10000] [--days 14]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.payroll import compute_payroll
+
+
+def make_entries(people: int, days: int, seed: int = 42):
+    """One entry per person per workday (weekends skipped), 4-12 hours each"""
+    rng = np.random.default_rng(seed)
+    workdays = np.array([d for d in range(days) if d % 7 < 5])
+    user_ids = np.repeat(np.arange(1, people + 1), len(workdays))
+    entry_days = np.tile(workdays, people)
+    hours = rng.uniform(4, 12, size=len(user_ids)).round(2)
+    rates = {user_id: float(rate) for user_id, rate in zip(range(1, people + 1), rng.uniform(14, 30, people))}
+    exempt = set(range(1, people + 1, 3))
+    return user_ids, entry_days, hours, rates, exempt
+
+
+def python_loop(user_ids, entry_days, hours, rates, exempt):
+    """Reference implementation: the per-row loop the engine replaces"""
+    weekly = defaultdict(float)
+    for user_id, day, h in zip(user_ids.tolist(), entry_days.tolist(), hours.tolist()):
+        weekly[(user_id, day // 7)] += h
+    gross = defaultdict(float)
+    for (user_id, _), week_hours in weekly.items():
+        overtime = max(week_hours - settings.PAYROLL_OVERTIME_WEEKLY_HOURS, 0.0)
+        multiplier = 1.0 if user_id in exempt else settings.PAYROLL_OVERTIME_MULTIPLIER
+        gross[user_id] += (week_hours - overtime) * rates[user_id] + overtime * rates[user_id] * multiplier
+    return gross
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    user_ids, entry_days, hours, rates, exempt = make_entries(args.people, args.days)
+    print(f"{args.people} people x {args.days} days = {len(user_ids)} entries")
+
+    engine_time, result = best_of(
+        lambda: compute_payroll(user_ids, entry_days, hours, args.days, rates, exempt), args.repeat
+    )
+    loop_time, reference = best_of(
+        lambda: python_loop(user_ids, entry_days, hours, rates, exempt), args.repeat
+    )
+
+    expected = np.array([reference[user_id] for user_id in result["user_ids"].tolist()])
+    assert np.allclose(result["gross"], expected, atol=0.01), "engine and reference disagree"
+
+    print(f"compute_payroll: {engine_time * 1000:8.2f} ms")
+    print(f"python loop:     {loop_time * 1000:8.2f} ms ({loop_time / engine_time:.1f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
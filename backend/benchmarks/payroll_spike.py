@@ -0,0 +1,687 @@
+"""
+Pay-deadline spike load scenario.
+Reproduces the hour before the payroll cut-off from the "Payroll Processing
+Update" announcement. Participants keep arriving, log in and open the
+dashboard. They then create the week's timesheet, correct it, and sign and
+submit it. Some download the timesheet document or check their documents.
+Meanwhile admins keep the approvals page open and bulk-approve whatever has
+been submitted. Users pause between pages (think times).
+
+The participant arrival rate steps up through --rates (arrivals per
+second). Each step reports per-action error rate and latency. It also
+reports the saturation of the resources a request can queue for: the
+threadpool that runs sync endpoints, the database connection pool, bcrypt
+on login, and, in process, the event loop itself.
+
+A step is sustainable when the participants' error rate and p95 latency
+stay within --max-error-rate and --p95-ms. The highest sustainable step is
+the maximum sustainable arrival rate.
+
+Usage:
+    python benchmarks/generate_dataset.py --users 20000 --database-url sqlite:///./bench.db --reset
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/payroll_spike.py \\
+        [--rates 0.5,1,2,4,8] [--step-seconds 60] [--admins 3] [--think-scale 1.0] \\
+        [--url http://127.0.0.1:8000] [--output spike.json]
+
+For numbers that resemble production, start a local server
+(uvicorn app.main:app --workers N) on the same DATABASE_URL and pass --url.
+Without --url the app runs in this process and shares its CPU with the load
+generator. Saturation is read from the app's /metrics. Each step uses its
+own week after the latest one in the database. The run removes those weeks'
+timesheets, their earnings, and the documents it uploaded; notifications and
+audit entries remain.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.metrics import WAIT_BUCKETS, render_metrics
+from app.core.security import TIMESHEET_ROLES, create_access_token, pwd_context
+from app.models.user import User, UserRole
+from app.models.timesheet import Timesheet, TimesheetEntry, TimesheetStatus
+from app.models.document import Document
+from app.services.earnings_service import apply_timesheet_earnings
+from endpoint_benchmark import percentile
+
+# Mean pause, in seconds, before the user's next step
+THINK_SECONDS = {
+    "login": 3,
+    "dashboard": 8,  # Reading the payroll warning
+    "fill_in": 30,  # Entering the week's hours
+    "correct": 12,
+    "review": 6,
+    "sign": 8,
+    "documents": 5,
+    "approvals": 20,  # Admin looking through the pending list
+    "batch": 10,
+}
+
+# Share of participants who take each optional step, and of admin batches rejected
+MIX = {
+    "correct": 0.6,  # Rewrite the week after a first pass
+    "correct_day": 0.3,  # Then fix a single day
+    "download": 0.3,  # Download the timesheet document before signing
+    "documents": 0.4,  # Check their documents after submitting
+    "upload": 0.1,  # And upload one
+    "reject": 0.1,
+}
+
+REVIEW_BATCH = 25
+
+# Shift start, end, and end when leaving an hour early
+SHIFTS = [
+    ("08:00:00", "16:00:00", "15:00:00"),
+    ("08:30:00", "16:30:00", "15:30:00"),
+    ("09:00:00", "17:00:00", "16:00:00"),
+]
+
+# Uploads carry this URL prefix, plus the run tag, so the run can remove them
+DOCUMENT_URL = "https://storage.example.org/payroll-spike/"
+
+# Saturation thresholds
+THREADPOOL_WAIT_SATURATED_MS = 50  # p95 wait for a worker thread
+FULL_SAMPLES_SATURATED = 0.1  # Share of samples with every thread or connection in use
+BCRYPT_SLOWDOWN_SATURATED = 2.0  # Mean verify time against uncontended
+LOOP_LAG_SATURATED_MS = 100  # p95 delay of a timer on the event loop
+
+PARTICIPANT_ACTIONS = {
+    "login", "me", "dashboard", "announcements", "featured", "timesheets", "create",
+    "correct", "correct_day", "download", "submit", "documents", "document", "upload",
+}
+
+
+@dataclass
+class StepLog:
+    """Requests, sessions and resource samples of one arrival-rate step"""
+    requests: List[tuple] = field(default_factory=list)  # (action, ms, status)
+    arrivals: int = 0
+    completed: int = 0
+    samples: List[dict] = field(default_factory=list)
+
+
+class Spike:
+    def __init__(self, args, client: httpx.AsyncClient, participants: List[str], admin_ids: List[int]):
+        self.args = args
+        self.client = client
+        self.rng = random.Random(args.seed)
+        self.participants = participants
+        self.admin_headers = [
+            {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin_id)})}"}
+            for admin_id in admin_ids
+        ]
+        self.tag = f"{datetime.utcnow():%Y%m%d%H%M%S}"
+        # A canvas signature as the frontend sends it, about 6 KB
+        self.signature = "data:image/png;base64," + base64.b64encode(self.rng.randbytes(4500)).decode()
+        self.log = StepLog()
+        self.submitted = deque()
+        self.uploaded = deque()
+
+    async def call(self, action: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """Send one request and record it; None when it failed"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, settings.API_V1_PREFIX + path, **kwargs)
+        except httpx.HTTPError:
+            # Timeouts and refused connections count as errors, status 0
+            self.log.requests.append((action, (time.perf_counter() - started) * 1000, 0))
+            return None
+        self.log.requests.append((action, (time.perf_counter() - started) * 1000, response.status_code))
+        return response if response.status_code < 400 else None
+
+    async def think(self, kind: str, stop: Optional[asyncio.Event] = None) -> None:
+        mean = THINK_SECONDS[kind] * self.args.think_scale
+        if mean <= 0:
+            return
+        # Exponential pauses, capped so one idle user cannot stall a step
+        delay = min(self.rng.expovariate(1 / mean), mean * 4)
+        if stop is None:
+            await asyncio.sleep(delay)
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    def chance(self, step: str) -> bool:
+        return self.rng.random() < MIX[step]
+
+    def week_entries(self, week_start: date, shift: tuple) -> List[dict]:
+        return [
+            {
+                "date": (week_start + timedelta(days=day)).isoformat(),
+                "start_time": shift[0], "end_time": shift[1],
+                "lunch_out": "12:00:00", "lunch_in": "12:30:00",
+                "hours": 7.5,
+            }
+            for day in range(5)
+        ]
+
+    async def participant(self, email: str, week_start: date) -> None:
+        self.log.arrivals += 1
+        response = await self.call("login", "POST", "/auth/login",
+                                   data={"username": email, "password": self.args.password})
+        if response is None:
+            return
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        if await self.call("me", "GET", "/auth/me", headers=headers) is None:
+            return
+        await self.think("login")
+
+        # The dashboard loads these together
+        await asyncio.gather(
+            self.call("dashboard", "GET", "/dashboard/student", headers=headers),
+            self.call("announcements", "GET", "/learning/announcements", headers=headers),
+            self.call("featured", "GET", "/opportunities/featured", headers=headers),
+        )
+        await self.think("dashboard")
+
+        if await self.call("timesheets", "GET", "/timesheets/", headers=headers) is None:
+            return
+        await self.think("fill_in")
+
+        shift = self.rng.choice(SHIFTS)
+        entries = self.week_entries(week_start, shift)
+        response = await self.call("create", "POST", "/timesheets/", headers=headers, json={
+            "week_start": week_start.isoformat(),
+            "week_end": (week_start + timedelta(days=6)).isoformat(),
+            "entries": entries[:self.rng.randint(3, 5)],
+        })
+        if response is None:
+            return
+        timesheet_id = response.json()["id"]
+
+        if self.chance("correct"):
+            await self.think("correct")
+            entries[-1].update(end_time=shift[2], hours=6.5)
+            if await self.call("correct", "PUT", f"/timesheets/{timesheet_id}", headers=headers,
+                               json={"entries": entries, "notes": "Left early Friday"}) is None:
+                return
+            if self.chance("correct_day"):
+                await self.think("correct")
+                day = self.rng.choice(entries)
+                if await self.call("correct_day", "PATCH", f"/timesheets/{timesheet_id}/entries", headers=headers,
+                                   json={"entries": [{"date": day["date"], "break_minutes": 15, "hours": 7.25}]}) is None:
+                    return
+        await self.think("review")
+
+        if self.chance("download"):
+            if await self.call("download", "GET", f"/timesheets/{timesheet_id}/pdf", headers=headers) is None:
+                return
+            await self.think("documents")
+
+        await self.think("sign")
+        if await self.call("submit", "POST", f"/timesheets/{timesheet_id}/submit", headers=headers,
+                           json={"signature": self.signature}) is None:
+            return
+        self.submitted.append(timesheet_id)
+
+        if self.chance("documents"):
+            await self.think("documents")
+            response = await self.call("documents", "GET", "/documents/", headers=headers)
+            if response is None:
+                return
+            documents = response.json()
+            if documents:
+                if await self.call("document", "GET", f"/documents/{self.rng.choice(documents)['id']}",
+                                   headers=headers) is None:
+                    return
+            if self.chance("upload"):
+                await self.think("documents")
+                response = await self.call("upload", "POST", "/documents/", headers=headers, json={
+                    "document_type": "pay_stub",
+                    "file_name": f"pay-stub-{week_start.isoformat()}.pdf",
+                    "file_url": f"{DOCUMENT_URL}{self.tag}/{timesheet_id}.pdf",
+                    "file_size": 48213,
+                    "mime_type": "application/pdf",
+                })
+                if response is None:
+                    return
+                self.uploaded.append(response.json()["id"])
+        self.log.completed += 1
+
+    def take(self, pending: deque) -> List[int]:
+        return [pending.popleft() for _ in range(min(REVIEW_BATCH, len(pending)))]
+
+    async def admin(self, headers: dict, stop: asyncio.Event) -> None:
+        """The approvals page, reviewed in batches until the step ends"""
+        while not stop.is_set():
+            await asyncio.gather(
+                self.call("pending_timesheets", "GET", "/timesheets/pending", headers=headers),
+                self.call("pending_documents", "GET", "/documents/pending", headers=headers),
+            )
+            await self.think("approvals", stop)
+
+            timesheet_ids = self.take(self.submitted)
+            if timesheet_ids:
+                approved = not self.chance("reject")
+                await self.call("review_timesheets", "POST", "/timesheets/review/bulk", headers=headers, json={
+                    "timesheet_ids": timesheet_ids, "approved": approved,
+                    "rejection_reason": None if approved else "Hours do not match the schedule",
+                })
+            document_ids = self.take(self.uploaded)
+            if document_ids:
+                await self.call("review_documents", "POST", "/documents/review/bulk", headers=headers,
+                                json={"document_ids": document_ids, "approved": True})
+            await self.think("batch", stop)
+
+    async def sample(self, stop: asyncio.Event) -> None:
+        """Resource usage every --sample-interval seconds until the step ends"""
+        limiter = None
+        if not self.args.url:
+            import anyio.to_thread
+            limiter = anyio.to_thread.current_default_thread_limiter()
+        while not stop.is_set():
+            values = await self.read_metrics()
+            sample = {
+                "pool_checked_out": values.get(("db_pool_connections_checked_out", None)),
+                "pool_capacity": values.get(("db_pool_connections_capacity", None)),
+                "hashes_in_progress": values.get(("password_hashes_in_progress", None)),
+            }
+            if limiter is not None:
+                sample["threads_busy"] = limiter.borrowed_tokens
+                sample["threads_total"] = limiter.total_tokens
+                sample["threads_waiting"] = limiter.statistics().tasks_waiting
+            self.log.samples.append(sample)
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(stop.wait(), self.args.sample_interval)
+            except asyncio.TimeoutError:
+                # Anything past the interval is time the loop was blocked
+                if limiter is not None:
+                    sample["loop_lag_ms"] = (time.perf_counter() - started - self.args.sample_interval) * 1000
+
+    async def read_metrics(self) -> Dict[tuple, float]:
+        """
+        The watched metrics, summed over routes and workers:
+        {(sample name, le): value}. Empty when /metrics is unavailable.
+        """
+        if self.args.url:
+            headers = {"Authorization": f"Bearer {self.args.metrics_token}"} if self.args.metrics_token else {}
+            try:
+                response = await self.client.get("/metrics", headers=headers, timeout=10)
+            except httpx.HTTPError:
+                return {}
+            if response.status_code != 200:
+                return {}
+            text = response.text
+        else:
+            text = render_metrics()[0].decode()
+
+        totals = defaultdict(float)
+        for family in text_string_to_metric_families(text):
+            if not family.name.startswith(("http_request_threadpool_wait", "password_hash", "db_pool")):
+                continue
+            for sample in family.samples:
+                if sample.labels.get("operation", "verify") != "verify" or sample.name.endswith("_created"):
+                    continue
+                totals[(sample.name, sample.labels.get("le"))] += sample.value
+        return totals
+
+    async def run_step(self, rate: float, week_start: date) -> StepLog:
+        self.log = StepLog()
+        self.submitted.clear()
+        self.uploaded.clear()
+        emails = iter(self.rng.sample(self.participants, len(self.participants)))
+
+        stop = asyncio.Event()
+        background = [asyncio.create_task(self.sample(stop))] + [
+            asyncio.create_task(self.admin(headers, stop)) for headers in self.admin_headers
+        ]
+
+        # Open-loop Poisson arrivals: newcomers do not wait for a slow server
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.args.step_seconds
+        next_arrival = loop.time()
+        sessions = []
+        while True:
+            next_arrival += self.rng.expovariate(rate)
+            if next_arrival >= deadline:
+                break
+            await asyncio.sleep(max(0.0, next_arrival - loop.time()))
+            email = next(emails, None)
+            if email is None:
+                print(f"  ran out of participants after {len(sessions)} arrivals")
+                break
+            sessions.append(asyncio.create_task(self.participant(email, week_start)))
+        await asyncio.gather(*sessions)
+
+        # Let the admins review the last submissions before stopping them
+        drain_deadline = loop.time() + (THINK_SECONDS["approvals"] + THINK_SECONDS["batch"]) * 4 * self.args.think_scale + 30
+        while self.admin_headers and (self.submitted or self.uploaded) and loop.time() < drain_deadline:
+            await asyncio.sleep(0.5)
+        stop.set()
+        await asyncio.gather(*background)
+        return self.log
+
+
+def bucket_percentile(before: dict, after: dict, name: str, fraction: float) -> Optional[float]:
+    """Upper bound of the histogram bucket holding the percentile, over an interval"""
+    buckets = sorted(
+        (float(le), value - before.get((sample, le), 0))
+        for (sample, le), value in after.items() if sample == f"{name}_bucket"
+    )
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    for bound, count in buckets:
+        if count >= fraction * buckets[-1][1]:
+            return bound
+    return None
+
+
+def interval_mean(before: dict, after: dict, name: str) -> Optional[float]:
+    count = after.get((f"{name}_count", None), 0) - before.get((f"{name}_count", None), 0)
+    if count <= 0:
+        return None
+    return (after.get((f"{name}_sum", None), 0) - before.get((f"{name}_sum", None), 0)) / count
+
+
+def full_fraction(samples: List[dict], used: str, capacity: str) -> Optional[float]:
+    measured = [s for s in samples if s.get(used) is not None and s.get(capacity)]
+    if not measured:
+        return None
+    return sum(s[used] >= s[capacity] for s in measured) / len(measured)
+
+
+def peak(samples: List[dict], key: str) -> Optional[float]:
+    values = [s[key] for s in samples if s.get(key) is not None]
+    return max(values) if values else None
+
+
+def summarize(rate: float, log: StepLog, seconds: float, before: dict, after: dict,
+              uncontended_verify: float, args) -> dict:
+    by_action = defaultdict(list)
+    for action, elapsed, status in log.requests:
+        by_action[action].append((elapsed, status))
+
+    actions = {}
+    for action, calls in by_action.items():
+        timings = sorted(elapsed for elapsed, _ in calls)
+        statuses = defaultdict(int)
+        for _, status in calls:
+            if status == 0 or status >= 400:
+                statuses[status] += 1
+        actions[action] = {
+            "requests": len(calls),
+            "errors": sum(statuses.values()),
+            "error_statuses": dict(statuses),
+            "p50_ms": round(percentile(timings, 0.50), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "p99_ms": round(percentile(timings, 0.99), 2),
+        }
+
+    participant_calls = [call for call in log.requests if call[0] in PARTICIPANT_ACTIONS]
+    errors = sum(1 for _, _, status in participant_calls if status == 0 or status >= 400)
+    error_rate = errors / len(participant_calls) if participant_calls else 0.0
+
+    wait_p95 = bucket_percentile(before, after, "http_request_threadpool_wait_seconds", 0.95)
+    wait_mean = interval_mean(before, after, "http_request_threadpool_wait_seconds")
+    verify_mean = interval_mean(before, after, "password_hash_seconds")
+    threads_full = full_fraction(log.samples, "threads_busy", "threads_total")
+    pool_full = full_fraction(log.samples, "pool_checked_out", "pool_capacity")
+    lags = sorted(sample["loop_lag_ms"] for sample in log.samples if "loop_lag_ms" in sample)
+    loop_lag_p95 = percentile(lags, 0.95) if lags else None
+    saturation = {
+        "threadpool": {
+            # Beyond the largest bucket the histogram only says "more than"
+            "wait_p95_ms": None if wait_p95 is None or wait_p95 > WAIT_BUCKETS[-1] else wait_p95 * 1000,
+            "wait_p95_over_buckets": wait_p95 is not None and wait_p95 > WAIT_BUCKETS[-1],
+            "wait_mean_ms": None if wait_mean is None else round(wait_mean * 1000, 2),
+            "busy_max": peak(log.samples, "threads_busy"),
+            "capacity": peak(log.samples, "threads_total"),
+            "waiting_max": peak(log.samples, "threads_waiting"),
+            "full_fraction": threads_full,
+            "saturated": bool(
+                (wait_p95 is not None and wait_p95 * 1000 > THREADPOOL_WAIT_SATURATED_MS)
+                or (threads_full or 0) >= FULL_SAMPLES_SATURATED
+            ),
+        },
+        "db_pool": {
+            "checked_out_max": peak(log.samples, "pool_checked_out"),
+            "capacity": peak(log.samples, "pool_capacity"),
+            "full_fraction": pool_full,
+            "saturated": (pool_full or 0) >= FULL_SAMPLES_SATURATED,
+        },
+        "bcrypt": {
+            "verify_mean_ms": None if verify_mean is None else round(verify_mean * 1000, 2),
+            "uncontended_ms": round(uncontended_verify * 1000, 2),
+            "in_progress_max": peak(log.samples, "hashes_in_progress"),
+            "saturated": verify_mean is not None and verify_mean >= uncontended_verify * BCRYPT_SLOWDOWN_SATURATED,
+        },
+        "event_loop": {
+            "lag_p95_ms": None if loop_lag_p95 is None else round(loop_lag_p95, 1),
+            "lag_max_ms": round(lags[-1], 1) if lags else None,
+            "saturated": loop_lag_p95 is not None and loop_lag_p95 > LOOP_LAG_SATURATED_MS,
+        },
+    }
+
+    reasons = []
+    if error_rate > args.max_error_rate:
+        reasons.append(f"error rate {error_rate:.1%}")
+    slow = [
+        f"{action} p95 {row['p95_ms']:.0f} ms" for action, row in actions.items()
+        if action in PARTICIPANT_ACTIONS and row["p95_ms"] > args.p95_ms
+    ]
+    reasons.extend(slow)
+    return {
+        "rate": rate,
+        "arrivals": log.arrivals,
+        "completed_sessions": log.completed,
+        "seconds": round(seconds, 1),
+        "requests": len(log.requests),
+        "throughput": round(len(log.requests) / seconds, 2),
+        "participant_error_rate": round(error_rate, 4),
+        "actions": actions,
+        "saturation": saturation,
+        "sustainable": not reasons,
+        "reasons": reasons,
+    }
+
+
+def print_step(row: dict) -> None:
+    print(f"\n{row['rate']:g} arrivals/s: {row['arrivals']} participants, {row['completed_sessions']} completed, "
+          f"{row['requests']} requests in {row['seconds']} s ({row['throughput']} req/s), "
+          f"participant error rate {row['participant_error_rate']:.2%}")
+    for action, stats in sorted(row["actions"].items()):
+        print(f"  {action:<20} {stats['requests']:>6}  p50 {stats['p50_ms']:>9.1f}  p95 {stats['p95_ms']:>9.1f}  "
+              f"p99 {stats['p99_ms']:>9.1f} ms" + (f"  errors {stats['error_statuses']}" if stats["errors"] else ""))
+    threadpool, pool, bcrypt, loop = (
+        row["saturation"][key] for key in ("threadpool", "db_pool", "bcrypt", "event_loop")
+    )
+    wait_p95 = (f"> {WAIT_BUCKETS[-1] * 1000:g}" if threadpool["wait_p95_over_buckets"]
+                else f"<= {threadpool['wait_p95_ms']}")
+    busy = (f", busy max {threadpool['busy_max']}/{threadpool['capacity']}, waiting max {threadpool['waiting_max']}"
+            if threadpool["capacity"] else "")
+    print(f"  threadpool: wait p95 {wait_p95} ms, mean {threadpool['wait_mean_ms']} ms{busy}"
+          + ("  SATURATED" if threadpool["saturated"] else ""))
+    print(f"  db pool:    checked out max {pool['checked_out_max']}/{pool['capacity']}, "
+          f"full in {pool['full_fraction'] or 0:.0%} of samples" + ("  SATURATED" if pool["saturated"] else ""))
+    print(f"  bcrypt:     verify mean {bcrypt['verify_mean_ms']} ms (uncontended {bcrypt['uncontended_ms']} ms), "
+          f"in progress max {bcrypt['in_progress_max']}" + ("  SATURATED" if bcrypt["saturated"] else ""))
+    if loop["lag_p95_ms"] is not None:
+        print(f"  event loop: lag p95 {loop['lag_p95_ms']} ms, max {loop['lag_max_ms']} ms"
+              + ("  SATURATED" if loop["saturated"] else ""))
+    print("  sustainable" if row["sustainable"] else f"  NOT sustainable: {', '.join(row['reasons'])}")
+
+
+def load_users(password: str) -> tuple:
+    """Active participants' emails, admin ids, and the time of one uncontended login check"""
+    db = SessionLocal()
+    try:
+        participants = db.execute(
+            select(User.email).where(User.role.in_(TIMESHEET_ROLES), User.is_active == True).order_by(User.id)
+        ).scalars().all()
+        admin_ids = db.execute(
+            select(User.id).where(User.role == UserRole.admin.value, User.is_active == True).order_by(User.id)
+        ).scalars().all()
+        hashed = db.execute(
+            select(User.hashed_password).where(User.role.in_(TIMESHEET_ROLES), User.is_active == True).limit(1)
+        ).scalar()
+        latest_week = db.execute(select(func.max(Timesheet.week_start))).scalar()
+    finally:
+        db.close()
+
+    if not participants or not admin_ids:
+        raise SystemExit("The database needs participants and an admin; create them with benchmarks/generate_dataset.py")
+    if not pwd_context.verify(password, hashed):
+        raise SystemExit("--password does not match the participants' password")
+
+    # The same work as one login, on the same hash, with nothing else running
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        pwd_context.verify(password, hashed)
+        timings.append(time.perf_counter() - started)
+
+    today = date.today()
+    first_week = (latest_week or today - timedelta(days=today.weekday())) + timedelta(weeks=1)
+    return participants, admin_ids, min(timings), first_week
+
+
+def cleanup(weeks: List[date], tag: str) -> None:
+    """Remove the spike weeks' timesheets, and their earnings, and the run's uploads"""
+    db = SessionLocal()
+    try:
+        spike = select(Timesheet.id).where(Timesheet.week_start.in_(weeks))
+        approved = db.execute(spike.where(Timesheet.status == TimesheetStatus.approved.value)).scalars().all()
+        apply_timesheet_earnings(db, approved, sign=-1)
+        db.execute(delete(TimesheetEntry).where(TimesheetEntry.timesheet_id.in_(spike)))
+        removed = db.execute(delete(Timesheet).where(Timesheet.week_start.in_(weeks))).rowcount
+        uploads = db.execute(delete(Document).where(Document.file_url.like(f"{DOCUMENT_URL}{tag}/%"))).rowcount
+        db.commit()
+    finally:
+        db.close()
+    print(f"\nRemoved {removed} timesheets ({len(approved)} approved) and {uploads} uploaded documents")
+
+
+async def run(args, participants: List[str], admin_ids: List[int], uncontended_verify: float,
+              first_week: date) -> List[dict]:
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout)
+        lifespan = None
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                                   base_url="http://spike", limits=limits, timeout=timeout)
+        # Run startup as a server would, so hooks and background tasks are live
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    spike = Spike(args, client, participants, admin_ids[:args.admins])
+    weeks = []
+    steps = []
+    try:
+        async with client:
+            for step, rate in enumerate(args.rates):
+                week_start = first_week + timedelta(weeks=step)
+                weeks.append(week_start)
+                print(f"\nStep {step + 1}/{len(args.rates)}: {rate:g} arrivals/s for {args.step_seconds} s "
+                      f"(week of {week_start})", flush=True)
+                before = await spike.read_metrics()
+                started = time.perf_counter()
+                log = await spike.run_step(rate, week_start)
+                seconds = time.perf_counter() - started
+                after = await spike.read_metrics()
+                row = summarize(rate, log, seconds, before, after, uncontended_verify, args)
+                steps.append(row)
+                print_step(row)
+                if not row["sustainable"] and not args.keep_going:
+                    break
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        if not args.keep_data:
+            cleanup(weeks, spike.tag)
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=lambda value: [float(rate) for rate in value.split(",")],
+                        default=[0.5, 1, 2, 4, 8], help="Comma-separated participant arrival rates per second")
+    parser.add_argument("--step-seconds", type=float, default=60, help="How long arrivals continue in each step")
+    parser.add_argument("--admins", type=int, default=3, help="Admins reviewing concurrently")
+    parser.add_argument("--think-scale", type=float, default=1.0,
+                        help="Multiplies every think time; 0 sends each session's requests back to back")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="Highest participant error rate a sustainable step may have")
+    parser.add_argument("--p95-ms", type=float, default=2000,
+                        help="Highest p95 latency of any participant action in a sustainable step")
+    parser.add_argument("--keep-going", action="store_true", help="Run every rate even after one is not sustainable")
+    parser.add_argument("--url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--metrics-token", default=settings.METRICS_TOKEN, help="Bearer token for the server's /metrics")
+    parser.add_argument("--password", default="benchmark123", help="Password of the participants, for login")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="Seconds between resource samples")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds before a request counts as failed")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep-data", action="store_true", help="Leave the spike's timesheets and uploads in place")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    participants, admin_ids, uncontended_verify, first_week = load_users(args.password)
+    meta = {
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "target": args.url or "asgi",
+        "database": engine.dialect.name,
+        "participants": len(participants),
+        "admins": min(args.admins, len(admin_ids)),
+        "rates": args.rates,
+        "step_seconds": args.step_seconds,
+        "think_scale": args.think_scale,
+        "think_seconds": THINK_SECONDS,
+        "mix": MIX,
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    print(f"Pay-deadline spike on {meta['target']} ({meta['database']}): {meta['participants']} participants, "
+          f"{meta['admins']} admins, uncontended bcrypt verify {uncontended_verify * 1000:.0f} ms, "
+          f"{meta['cpus']} CPUs")
+
+    steps = asyncio.run(run(args, participants, admin_ids, uncontended_verify, first_week))
+
+    sustainable = None
+    for row in steps:
+        if not row["sustainable"]:
+            break
+        sustainable = row["rate"]
+    print("\nMaximum sustainable arrival rate: " + (
+        f"{sustainable:g} participants/s ({sustainable * 3600:,.0f} per hour)" if sustainable is not None
+        else f"below {args.rates[0]:g} participants/s"
+    ))
+    for resource in ("threadpool", "db_pool", "bcrypt", "event_loop"):
+        if resource == "event_loop" and args.url:
+            print(f"  {resource:<11} not measured (in process only)")
+            continue
+        first = next((row["rate"] for row in steps if row["saturation"][resource]["saturated"]), None)
+        print(f"  {resource:<11} " + (f"saturated from {first:g} arrivals/s" if first is not None else "not saturated"))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "steps": steps, "max_sustainable_rate": sustainable}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
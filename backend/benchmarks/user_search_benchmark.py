@@ -0,0 +1,114 @@
+"""
+Benchmark for the admin user typeahead at scale.
+Loads synthetic users into a scratch database, builds the search indexes
+and reports latency percentiles of search_users for typical keystrokes.
+
+Usage:
+    python benchmarks/user_search_benchmark.py [--users 100000] [--database-url sqlite://]
+
+Point --database-url at an empty PostgreSQL database to measure the trigram
+indexes; the tables are created there and left in place.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.user import User
+from app.services.search_service import ensure_search_indexes, search_users
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Maria",
+    "Daniel", "Karen", "Matthew", "Nancy", "Anthony", "Lisa", "Mark", "Betty", "Luis", "Sandra",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+]
+ROLES = ["wble_participant", "ttw_participant", "contractor", "employee"]
+
+
+def make_users(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        yield {
+            "email": f"{first.lower()}.{last.lower()}{i}@example.org",
+            "hashed_password": "x",
+            "first_name": first,
+            "last_name": last,
+            "phone": f"{rng.randint(200, 999)}{rng.randint(1000000, 9999999)}",
+            "role": rng.choice(ROLES),
+            "case_id": f"CF-{i:07d}",
+            "is_active": True,
+        }
+
+
+def load(session, count: int, batch: int = 5000):
+    rows = make_users(count)
+    while True:
+        chunk = [row for _, row in zip(range(batch), rows)]
+        if not chunk:
+            break
+        session.execute(insert(User), chunk)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    load(session, args.users)
+    ensure_search_indexes(engine)
+    print(f"loaded {args.users} users and built indexes in {time.perf_counter() - start:.1f} s")
+
+    # Keystroke prefixes of real names, emails and case IDs, plus full names
+    rng = random.Random(7)
+    queries = []
+    for _ in range(args.queries):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        queries.append(rng.choice([
+            first[:rng.randint(2, len(first))],
+            last[:rng.randint(2, len(last))],
+            f"{first} {last[:rng.randint(1, len(last))]}",
+            f"{first.lower()}.{last.lower()}{rng.randint(1, args.users)}"[:rng.randint(6, 14)],
+            f"CF-{rng.randint(1, args.users):07d}"[:rng.randint(5, 10)],
+        ]))
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search_users(session, query, limit=10)
+        timings.append((time.perf_counter() - start) * 1000)
+    session.close()
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{len(queries)} queries on {engine.dialect.name}")
+    print(f"p50: {statistics.median(timings):7.2f} ms")
+    print(f"p95: {p95:7.2f} ms")
+    print(f"max: {timings[-1]:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
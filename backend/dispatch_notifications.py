@@ -0,0 +1,32 @@
+"""
+Notification dispatcher.
+Drains the outbox in a loop: in-app notifications, unread counters and
+email. Run it as its own process and set NOTIFICATIONS_DISPATCH_IN_APP=false
+on the web service, or leave the default to dispatch inside the web process.
+Run with: python dispatch_notifications.py [--once]
+"""
+import argparse
+import time
+
+from app.core.config import settings
+from app.core.database import create_tables
+from app.services.notification_service import dispatch_pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="drain the outbox once and exit")
+    args = parser.parse_args()
+
+    create_tables()
+    while True:
+        handled = dispatch_pending()
+        if handled:
+            print(f"Dispatched {handled} outbox message(s)")
+        if args.once:
+            break
+        time.sleep(settings.NOTIFICATIONS_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
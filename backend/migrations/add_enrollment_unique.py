@@ -0,0 +1,77 @@
+"""
+Migration script to enforce one enrollment per person per program.
+Removes duplicate (student_id, program_id) enrollments left behind by
+concurrent enroll requests, keeping the most advanced one, then adds the
+unique index. Seats taken by the removed duplicates are given back to
+their programs.
+
+Usage:
+    python migrations/add_enrollment_unique.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+# Duplicates are ranked so completed/active enrollments survive over pending
+# and withdrawn ones, then the oldest enrollment wins
+DUPLICATES_SQL = """
+    SELECT id, program_id, status FROM (
+        SELECT id, program_id, status, ROW_NUMBER() OVER (
+            PARTITION BY student_id, program_id
+            ORDER BY CASE status
+                WHEN 'completed' THEN 0
+                WHEN 'active' THEN 1
+                WHEN 'pending' THEN 2
+                ELSE 3
+            END, id
+        ) AS rank
+        FROM enrollments
+    ) ranked
+    WHERE rank > 1
+"""
+
+
+def run_migration():
+    """Drop duplicate enrollments, return their seats and add the unique index"""
+
+    with engine.connect() as conn:
+        duplicates = conn.execute(text(DUPLICATES_SQL)).all()
+        if duplicates:
+            conn.execute(
+                text("DELETE FROM enrollments WHERE id = :id"),
+                [{"id": row.id} for row in duplicates]
+            )
+            # Withdrawn enrollments no longer hold a seat
+            seats = {}
+            for row in duplicates:
+                if row.status != "withdrawn":
+                    seats[row.program_id] = seats.get(row.program_id, 0) + 1
+            if seats:
+                conn.execute(
+                    text("UPDATE programs SET spots_available = spots_available + :seats WHERE id = :id"),
+                    [{"id": program_id, "seats": count} for program_id, count in seats.items()]
+                )
+            print(f"OK: removed {len(duplicates)} duplicate enrollment(s), returned {sum(seats.values())} seat(s)")
+        else:
+            print("SKIP: no duplicate enrollments")
+
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_enrollment_student_program "
+            "ON enrollments (student_id, program_id)"
+        ))
+        conn.commit()
+        print("OK: unique index uq_enrollment_student_program")
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Running enrollment uniqueness migration...")
+    print("-" * 50)
+    run_migration()
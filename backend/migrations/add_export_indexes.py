@@ -0,0 +1,46 @@
+"""
+Migration script to add the indexes behind the admin export filters
+(role, status and date) and the entry/document foreign keys.
+New databases get these from the models; run this on existing ones.
+
+Usage:
+    python migrations/add_export_indexes.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+def run_migration():
+    """Create export filter indexes if they are missing"""
+
+    migrations = [
+        "CREATE INDEX IF NOT EXISTS ix_users_role ON users (role);",
+        "CREATE INDEX IF NOT EXISTS ix_users_created_at ON users (created_at);",
+        "CREATE INDEX IF NOT EXISTS ix_timesheets_status ON timesheets (status);",
+        "CREATE INDEX IF NOT EXISTS ix_timesheets_week_start ON timesheets (week_start);",
+        "CREATE INDEX IF NOT EXISTS ix_timesheet_entries_timesheet_id ON timesheet_entries (timesheet_id);",
+        "CREATE INDEX IF NOT EXISTS ix_timesheet_entries_date ON timesheet_entries (date);",
+        "CREATE INDEX IF NOT EXISTS ix_documents_student_id ON documents (student_id);",
+        "CREATE INDEX IF NOT EXISTS ix_documents_status ON documents (status);",
+        "CREATE INDEX IF NOT EXISTS ix_documents_uploaded_at ON documents (uploaded_at);",
+    ]
+
+    with engine.connect() as conn:
+        for sql in migrations:
+            conn.execute(text(sql))
+            conn.commit()
+            print(f"OK: {sql[:70]}")
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Running export index migration...")
+    print("-" * 50)
+    run_migration()
@@ -0,0 +1,63 @@
+"""
+Migration script to enforce one progress row per person per lesson.
+Collapses duplicate (student_id, lesson_id) rows left behind by concurrent
+clicks into the one that records completion earliest, then adds the unique
+index.
+
+Usage:
+    python migrations/add_learning_progress_unique.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+# Completed rows survive over incomplete ones, the earliest completion wins,
+# then the oldest row
+DUPLICATES_SQL = """
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY student_id, lesson_id
+            ORDER BY CASE WHEN completed THEN 0 ELSE 1 END,
+                CASE WHEN completed_at IS NULL THEN 1 ELSE 0 END,
+                completed_at, id
+        ) AS rank
+        FROM learning_progress
+    ) ranked
+    WHERE rank > 1
+"""
+
+
+def run_migration():
+    """Drop duplicate learning progress rows and add the unique index"""
+
+    with engine.connect() as conn:
+        duplicate_ids = [row[0] for row in conn.execute(text(DUPLICATES_SQL))]
+        if duplicate_ids:
+            conn.execute(
+                text("DELETE FROM learning_progress WHERE id = :id"),
+                [{"id": progress_id} for progress_id in duplicate_ids]
+            )
+            print(f"OK: removed {len(duplicate_ids)} duplicate progress row(s)")
+        else:
+            print("SKIP: no duplicate progress rows")
+
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_learning_progress_student_lesson "
+            "ON learning_progress (student_id, lesson_id)"
+        ))
+        conn.commit()
+        print("OK: unique index uq_learning_progress_student_lesson")
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Running learning progress uniqueness migration...")
+    print("-" * 50)
+    run_migration()
@@ -0,0 +1,52 @@
+"""
+Migration script to add program waitlists.
+Adds the queue bounds to programs; the waitlist_entries table itself is
+created by create_tables() on startup.
+
+Usage:
+    python migrations/add_program_waitlist.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+def run_migration():
+    """Add waitlist_head and waitlist_tail to programs"""
+
+    migrations = [
+        """
+        ALTER TABLE programs
+        ADD COLUMN IF NOT EXISTS waitlist_head INTEGER NOT NULL DEFAULT 0;
+        """,
+        """
+        ALTER TABLE programs
+        ADD COLUMN IF NOT EXISTS waitlist_tail INTEGER NOT NULL DEFAULT 0;
+        """,
+    ]
+
+    with engine.connect() as conn:
+        for sql in migrations:
+            try:
+                conn.execute(text(sql))
+                conn.commit()
+                print(f"OK: {sql.strip().split(chr(10))[1].strip()[:60]}...")
+            except Exception as e:
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"SKIP (already exists): {sql.strip().split(chr(10))[1].strip()[:60]}...")
+                else:
+                    print(f"ERROR: {e}")
+                    raise
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Running program waitlist migration...")
+    print("-" * 50)
+    run_migration()
@@ -0,0 +1,45 @@
+"""
+Migration script to record the hourly rate each approved timesheet was
+rolled into monthly_earnings at, so reopening it removes exactly what was
+added. Approved timesheets are stamped with their owner's current rate, the
+one the rollup was last built with.
+
+Usage:
+    python migrations/add_timesheet_approved_rate.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+
+
+def run_migration():
+    """Add timesheets.approved_hourly_rate and fill it for approved timesheets"""
+
+    with engine.connect() as conn:
+        conn.execute(text(
+            "ALTER TABLE timesheets ADD COLUMN IF NOT EXISTS approved_hourly_rate NUMERIC(10, 2)"
+        ))
+        print("OK: timesheets.approved_hourly_rate")
+
+        stamped = conn.execute(text("""
+            UPDATE timesheets SET approved_hourly_rate = COALESCE(
+                (SELECT hourly_rate FROM users WHERE users.id = timesheets.student_id), :assumed
+            )
+            WHERE status = 'approved' AND approved_hourly_rate IS NULL
+        """), {"assumed": settings.SGA_ASSUMED_HOURLY_WAGE}).rowcount
+        conn.commit()
+        print(f"OK: stamped {stamped} approved timesheet(s)")
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Running timesheet approved rate migration...")
+    print("-" * 50)
+    run_migration()
@@ -0,0 +1,66 @@
+"""
+Migration script to enforce one timesheet per person per week.
+Removes duplicate (student_id, week_start) timesheets left behind by
+double-submits, keeping the most advanced one, then adds the unique index.
+
+Usage:
+    python migrations/add_timesheet_week_unique.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+# Duplicates are ranked so approved/submitted work survives over drafts,
+# then the oldest timesheet wins
+DUPLICATES_SQL = """
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY student_id, week_start
+            ORDER BY CASE status
+                WHEN 'approved' THEN 0
+                WHEN 'submitted' THEN 1
+                WHEN 'rejected' THEN 2
+                ELSE 3
+            END, id
+        ) AS rank
+        FROM timesheets
+    ) ranked
+    WHERE rank > 1
+"""
+
+
+def run_migration():
+    """Drop duplicate weekly timesheets and add the unique index"""
+
+    with engine.connect() as conn:
+        duplicate_ids = [row[0] for row in conn.execute(text(DUPLICATES_SQL))]
+        if duplicate_ids:
+            for sql in (
+                "DELETE FROM timesheet_entries WHERE timesheet_id = :id",
+                "DELETE FROM timesheets WHERE id = :id",
+            ):
+                conn.execute(text(sql), [{"id": ts_id} for ts_id in duplicate_ids])
+            print(f"OK: removed {len(duplicate_ids)} duplicate timesheet(s)")
+        else:
+            print("SKIP: no duplicate timesheets")
+
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_timesheet_student_week "
+            "ON timesheets (student_id, week_start)"
+        ))
+        conn.commit()
+        print("OK: unique index uq_timesheet_student_week")
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Running timesheet week uniqueness migration...")
+    print("-" * 50)
+    run_migration()
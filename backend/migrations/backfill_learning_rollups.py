@@ -0,0 +1,96 @@
+"""
+Migration script to build the learning analytics daily rollups.
+Creates the rollup tables and rebuilds learning_daily_rollups from completed
+learning_progress rows: each completion counts once on the day it was
+completed, under the learner's current role and program, and seeds
+learning_daily_activity to match.
+
+Meant for a fresh deployment. Progress only records completions, so a rebuild
+drops the active-learner days and un-completions the live counters have
+recorded since; the script refuses to run over existing rollups unless
+--force is given.
+
+Usage:
+    python migrations/backfill_learning_rollups.py [--force]
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, delete, insert, exists
+from app.core.database import SessionLocal, create_tables
+from app.models.user import User
+from app.models.program import Enrollment, EnrollmentStatus
+from app.models.learning import LearningProgress, LearningDailyRollup, LearningActivity
+
+BATCH_SIZE = 5000
+
+
+def run_migration(force: bool = False):
+    """Rebuild the daily rollups from learning progress"""
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        if not force and db.scalar(select(exists().select_from(LearningDailyRollup))):
+            print("ERROR: learning_daily_rollups already has rows; rebuilding would lose")
+            print("       live activity counts. Re-run with --force to replace them.")
+            sys.exit(1)
+
+        roles = dict(db.execute(select(User.id, User.role)).all())
+
+        # Latest non-withdrawn enrollment wins
+        programs = {}
+        for student_id, program_id in db.execute(
+            select(Enrollment.student_id, Enrollment.program_id)
+            .where(Enrollment.status != EnrollmentStatus.withdrawn.value)
+            .order_by(Enrollment.enrolled_at, Enrollment.id)
+        ):
+            programs[student_id] = program_id
+
+        counts = Counter()
+        activity = []
+        for student_id, lesson_id, completed_at in db.execute(
+            select(LearningProgress.student_id, LearningProgress.lesson_id, LearningProgress.completed_at)
+            .where(LearningProgress.completed == True)
+            .execution_options(yield_per=BATCH_SIZE)
+        ):
+            day = (completed_at or datetime.utcnow()).date()
+            counts[(day, lesson_id, roles.get(student_id, ""), programs.get(student_id, 0))] += 1
+            activity.append({"day": day, "student_id": student_id, "lesson_id": lesson_id})
+
+        db.execute(delete(LearningDailyRollup))
+        db.execute(delete(LearningActivity))
+        rows = [
+            {
+                "day": day, "lesson_id": lesson_id, "role": role, "program_id": program_id,
+                "completions": count, "active_learners": count,
+            }
+            for (day, lesson_id, role, program_id), count in counts.items()
+        ]
+        for start in range(0, len(rows), BATCH_SIZE):
+            db.execute(insert(LearningDailyRollup), rows[start:start + BATCH_SIZE])
+        for start in range(0, len(activity), BATCH_SIZE):
+            db.execute(insert(LearningActivity), activity[start:start + BATCH_SIZE])
+        db.commit()
+        print(f"OK: {len(rows)} rollup row(s) from {sum(counts.values())} completion(s)")
+        print(f"OK: {len(activity)} learner activity row(s)")
+    finally:
+        db.close()
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="replace existing rollups")
+    args = parser.parse_args()
+
+    print("Running learning analytics rollup backfill...")
+    print("-" * 50)
+    run_migration(force=args.force)
@@ -0,0 +1,61 @@
+"""
+Migration script to build per-user lesson completion bitmaps.
+Creates the lessons and lesson_completions tables, seeds the default lesson
+catalog and sets one bit per completed learning_progress row. Safe to re-run:
+bitmaps are rebuilt from the progress rows each time.
+
+Usage:
+    python migrations/backfill_lesson_completions.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from app.core.database import SessionLocal, create_tables, upsert
+from app.models.learning import LearningProgress, LessonCompletion
+from app.services.lesson_service import seed_lesson_catalog
+
+BATCH_SIZE = 1000
+
+
+def run_migration():
+    """Create the catalog tables and backfill completion bitmaps"""
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        seed_lesson_catalog(db)
+        print("OK: lesson catalog")
+
+        bits = {}
+        for student_id, lesson_id in db.execute(
+            select(LearningProgress.student_id, LearningProgress.lesson_id)
+            .where(LearningProgress.completed == True)
+        ):
+            bits[student_id] = bits.get(student_id, 0) | 1 << lesson_id
+
+        rows = [
+            {"user_id": user_id, "completed_bits": value.to_bytes((value.bit_length() + 7) // 8, "little")}
+            for user_id, value in bits.items()
+        ]
+        for start in range(0, len(rows), BATCH_SIZE):
+            statement = upsert(db, LessonCompletion).values(rows[start:start + BATCH_SIZE])
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[LessonCompletion.user_id],
+                set_={"completed_bits": statement.excluded.completed_bits}
+            ))
+        db.commit()
+        print(f"OK: completion bitmaps for {len(rows)} user(s)")
+    finally:
+        db.close()
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Running lesson completion backfill migration...")
+    print("-" * 50)
+    run_migration()
@@ -0,0 +1,50 @@
+"""
+Migration script to build the monthly_earnings rollup from existing data.
+Creates the table if needed and rebuilds it from all approved timesheets.
+Safe to re-run: the rollup is cleared first.
+
+Usage:
+    python migrations/backfill_monthly_earnings.py
+"""
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine
+from app.models import Timesheet, TimesheetStatus, MonthlyEarnings
+from app.services.earnings_service import apply_timesheet_earnings
+
+BATCH_SIZE = 1000
+
+
+def run_migration():
+    """Rebuild monthly_earnings from approved timesheets"""
+    MonthlyEarnings.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        db.query(MonthlyEarnings).delete()
+        approved_ids = [
+            ts_id for (ts_id,) in db.query(Timesheet.id).filter(
+                Timesheet.status == TimesheetStatus.approved.value
+            )
+        ]
+        for start in range(0, len(approved_ids), BATCH_SIZE):
+            apply_timesheet_earnings(db, approved_ids[start:start + BATCH_SIZE])
+        db.commit()
+        print(f"OK: rolled up {len(approved_ids)} approved timesheet(s)")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print("\nMigration completed successfully!")
+
+
+if __name__ == "__main__":
+    print("Running monthly earnings backfill...")
+    print("-" * 50)
+    run_migration()